@@ -0,0 +1,102 @@
+"""
+Content-addressed store for captured command output.
+
+Each distinct text is stored once in output_blobs, compressed and keyed by
+the sha256 of its UTF-8 bytes, so the same `show running-config` captured
+on 500 targets (or re-runs) costs one row. Verification results keep only
+the hash ("output_hash") and its uncompressed size; the text is fetched on
+demand from GET /outputs/{hash}.
+
+zstd is used when the optional `zstandard` package is installed, gzip
+otherwise. Every blob records its encoding, so both kinds can be read back.
+"""
+import datetime
+import gzip
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 6
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(text: str) -> Tuple[str, bytes]:
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress(encoding: str, data: bytes) -> str:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Output is zstd-compressed; install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if encoding == "gzip":
+        return gzip.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown output encoding '{encoding}'")
+
+
+def put_many(db: Session, texts: Iterable[str]) -> List[str]:
+    """Store texts that are not stored yet; returns their hashes in order. Caller commits."""
+    from sqlalchemy.dialects.sqlite import insert
+
+    hashes, rows = [], {}
+    for text in texts:
+        key = digest(text)
+        hashes.append(key)
+        if key not in rows:
+            rows[key] = text
+    if rows:
+        known = {
+            key for (key,) in db.query(models.OutputBlob.hash).filter(models.OutputBlob.hash.in_(list(rows)))
+        }
+        now = datetime.datetime.utcnow()
+        new_rows = []
+        for key, text in rows.items():
+            if key in known:
+                continue
+            encoding, data = compress(text)
+            new_rows.append(
+                {"hash": key, "encoding": encoding, "size": len(text.encode("utf-8")), "data": data, "created_at": now}
+            )
+        if new_rows:
+            # Another worker may store the same text concurrently; either copy is fine.
+            db.execute(insert(models.OutputBlob).on_conflict_do_nothing(index_elements=["hash"]), new_rows)
+    return hashes
+
+
+def get(db: Session, key: str) -> Optional[str]:
+    blob = db.query(models.OutputBlob).filter(models.OutputBlob.hash == key).first()
+    if blob is None:
+        return None
+    return decompress(blob.encoding, blob.data)
+
+
+def externalize_outputs(db: Session, results: list) -> list:
+    """
+    Move each result's full_output into the store. The returned results carry
+    "output_hash" and "output_size" instead (results without output keep neither).
+    """
+    outputs = [r.get("full_output") for r in results]
+    hashes = iter(put_many(db, [text for text in outputs if text]))
+    stored = []
+    for result, text in zip(results, outputs):
+        result = {k: v for k, v in result.items() if k != "full_output"}
+        if text:
+            result["output_hash"] = next(hashes)
+            result["output_size"] = len(text.encode("utf-8"))
+        stored.append(result)
+    return stored
@@ -0,0 +1,176 @@
+"""
+Evaluation of verification checks against captured command output.
+
+All checks that read the same command share one OutputView of its output.
+The view splits the output into lines once and keeps the offsets of its
+line breaks, so a match offset becomes a line number with one bisect
+instead of re-splitting and re-counting the output for every evidence
+extraction. The whitespace-normalized text used by relaxed matching is
+also built once per view, together with a map back to original lines.
+Regexes are compiled once per process. The `contains` literals
+of all checks on an output are located together, each distinct literal
+once, with str.find (a C-level scan that beats a pure-Python Aho-Corasick
+automaton by more than an order of magnitude on running configs).
+"""
+import bisect
+import functools
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Evidence for a failed check: the end of the output.
+FAIL_EVIDENCE_CHARS = 500
+# Characters shown on each side of a `contains` match.
+CONTAINS_CONTEXT_CHARS = 100
+
+# A relaxed pattern without these is plain text.
+REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, flags: int = 0) -> "re.Pattern":
+    return re.compile(pattern, flags)
+
+
+def pattern_flags(pattern: str) -> int:
+    # Multi-line patterns may span lines, so "." also matches newlines there.
+    return re.MULTILINE | re.DOTALL if "\n" in pattern else re.MULTILINE
+
+
+class OutputView:
+    """One command's output with the lookups every check on it shares."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._lines: Optional[List[str]] = None
+        self._breaks: Optional[List[int]] = None
+        self._found: Dict[str, int] = {}
+        self._normalized: Optional[str] = None
+        self._normalized_lower: Optional[str] = None
+        self._norm_starts: List[int] = []  # where each non-blank line starts in `normalized`
+        self._norm_lines: List[int] = []  # ...and its index in `lines`
+
+    @property
+    def lines(self) -> List[str]:
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    def line_number(self, offset: int) -> int:
+        """0-based line of a character offset (number of "\\n" before it)."""
+        if self._breaks is None:
+            self._breaks = [m.start() for m in re.finditer("\n", self.text)]
+        return bisect.bisect_left(self._breaks, offset)
+
+    def evidence(self, offset: int, context: int) -> str:
+        """The matched line with `context` lines on either side."""
+        return self.evidence_at(self.line_number(offset), context)
+
+    def evidence_at(self, line: int, context: int) -> str:
+        lines = self.lines
+        return "\n".join(lines[max(0, line - context):min(len(lines), line + context + 1)])
+
+    def locate(self, literals: Iterable[str]):
+        """Find the first offset of every literal not looked up yet (-1 if absent)."""
+        for literal in literals:
+            if literal not in self._found:
+                self._found[literal] = self.text.find(literal)
+
+    def find(self, literal: str) -> int:
+        self.locate((literal,))
+        return self._found[literal]
+
+    @property
+    def normalized(self) -> str:
+        """
+        The output with every run of whitespace collapsed to one space, as
+        " ".join(text.split()). Built once, line by line, remembering where
+        each line starts so matches map back to their original line.
+        """
+        if self._normalized is None:
+            parts, position = [], 0
+            for index, line in enumerate(self.lines):
+                part = " ".join(line.split())
+                if part:
+                    parts.append(part)
+                    self._norm_starts.append(position)
+                    self._norm_lines.append(index)
+                    position += len(part) + 1
+            self._normalized = " ".join(parts)
+        return self._normalized
+
+    @property
+    def normalized_lower(self) -> Optional[str]:
+        """Lower-cased `normalized` for literal case-insensitive search; None if lowering shifts offsets."""
+        if self._normalized_lower is None:
+            lowered = self.normalized.lower()
+            self._normalized_lower = lowered if len(lowered) == len(self.normalized) else ""
+        return self._normalized_lower or None
+
+    def normalized_line(self, offset: int) -> int:
+        """Index in `lines` of the line an offset in `normalized` falls on."""
+        self.normalized  # builds the line table
+        if not self._norm_starts:
+            return 0
+        return self._norm_lines[max(0, bisect.bisect_right(self._norm_starts, offset) - 1)]
+
+    def tail(self) -> str:
+        return self.text[-FAIL_EVIDENCE_CHARS:]
+
+
+def relaxed_match(view: OutputView, pattern: str, evidence_lines: int) -> Optional[str]:
+    """
+    Whitespace-insensitive, case-insensitive retry of a failed regex_match.
+    This handles table spacing ("13   MGMT" vs "13 MGMT") and indentation
+    (" description" vs "description"). The normalized output is shared by
+    all checks on the view and the match maps straight back to its line for
+    evidence. Returns evidence, or None.
+    """
+    norm_pattern = " ".join(pattern.split())
+    lowered = view.normalized_lower
+    if lowered is not None and norm_pattern.isascii() and not REGEX_SPECIAL.intersection(norm_pattern):
+        # Plain text: a substring search on the lowered view, no regex needed.
+        start = lowered.find(norm_pattern.lower())
+        if start < 0:
+            return None
+    else:
+        match = compile_pattern(norm_pattern, re.IGNORECASE).search(view.normalized)
+        if not match:
+            return None
+        start = match.start()
+    return view.evidence_at(view.normalized_line(start), evidence_lines)
+
+
+def evaluate(view: OutputView, check_type: str, pattern: str, evidence_lines: int = 3) -> dict:
+    """Evaluate one check. Returns {status, evidence, message}; raises on a broken regex."""
+    if check_type == "regex_match":
+        match = compile_pattern(pattern, pattern_flags(pattern)).search(view.text)
+        if match:
+            return {"status": "pass", "evidence": view.evidence(match.start(), evidence_lines),
+                    "message": f"Pattern matched: {pattern}"}
+        try:
+            evidence = relaxed_match(view, pattern, evidence_lines)
+        except Exception:
+            # Normalizing can break a complex regex; that is a plain miss.
+            evidence = None
+        if evidence is not None:
+            return {"status": "pass", "evidence": evidence,
+                    "message": f"Pattern matched (relaxed conformance): {pattern}"}
+        return {"status": "fail", "evidence": view.tail(), "message": f"Pattern not found: {pattern}"}
+
+    if check_type == "regex_not_present":
+        match = compile_pattern(pattern, pattern_flags(pattern)).search(view.text)
+        if not match:
+            return {"status": "pass", "evidence": "", "message": f"Pattern correctly absent: {pattern}"}
+        return {"status": "fail", "evidence": view.evidence(match.start(), evidence_lines),
+                "message": f"Unwanted pattern found: {pattern}"}
+
+    if check_type == "contains":
+        index = view.find(pattern)
+        if index >= 0:
+            start = max(0, index - CONTAINS_CONTEXT_CHARS)
+            end = min(len(view.text), index + CONTAINS_CONTEXT_CHARS)
+            return {"status": "pass", "evidence": view.text[start:end], "message": f"Text found: {pattern}"}
+        return {"status": "fail", "evidence": view.tail(), "message": f"Text not found: {pattern}"}
+
+    # Unknown check types stay pending, as before.
+    return {"status": "pending", "evidence": "", "message": ""}
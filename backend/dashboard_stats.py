@@ -0,0 +1,122 @@
+"""
+Counters and cache behind GET /dashboard/summary.
+
+The worker adds every finished target to a PortStat row (one per port and
+hour) in the same commit that stores the target's final status and
+finished_at (worker.finish_target; the scheduler does the same for targets
+whose worker was lost). Success rates and throughput are then sums over a
+handful of small rows instead of a scan of job_targets. The counters count
+finished runs: a target that ever ran twice would count twice.
+
+The assembled summary is cached in the API process for DASHBOARD_CACHE_TTL
+seconds, and dropped earlier when a job changes status: invalidate() bumps a
+version file shared with the worker processes.
+"""
+import datetime
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from .version_file import VersionFile
+from serial_lib.port_lock import LOCK_DIR
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "5"))
+DASHBOARD_VERSION_FILE = os.getenv("DASHBOARD_VERSION_FILE", os.path.join(LOCK_DIR, "dashboard.version"))
+
+# Throughput is reported over this many most recent hours.
+THROUGHPUT_HOURS = 24
+
+
+def hour_of(moment: datetime.datetime) -> datetime.datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_target_result(db: Session, target: models.JobTarget):
+    """Count a finished target in its port's stats. Caller commits."""
+    if target.status not in ("success", "failed") or target.finished_at is None:
+        return
+    from sqlalchemy.dialects.sqlite import insert
+
+    duration = 0.0
+    if target.started_at is not None:
+        duration = max(0.0, (target.finished_at - target.started_at).total_seconds())
+    succeeded = 1 if target.status == "success" else 0
+    stmt = insert(models.PortStat).values(
+        port=target.port,
+        hour=hour_of(target.finished_at),
+        succeeded=succeeded,
+        failed=1 - succeeded,
+        duration_seconds=duration,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["port", "hour"],
+        set_={
+            "succeeded": models.PortStat.succeeded + stmt.excluded.succeeded,
+            "failed": models.PortStat.failed + stmt.excluded.failed,
+            "duration_seconds": models.PortStat.duration_seconds + stmt.excluded.duration_seconds,
+        },
+    )
+    db.execute(stmt)
+
+
+def port_summary(port: str, succeeded: int, failed: int, duration_seconds: float, recent: int,
+                 hours: int = THROUGHPUT_HOURS) -> dict:
+    """Dashboard figures for one port from its summed PortStat rows."""
+    succeeded, failed, recent = succeeded or 0, failed or 0, recent or 0
+    finished = succeeded + failed
+    return {
+        "port": port,
+        "succeeded": succeeded,
+        "failed": failed,
+        "success_rate": round(succeeded / finished, 4) if finished else None,
+        "average_duration_seconds": round((duration_seconds or 0) / finished, 1) if finished else None,
+        "finished_recent": recent,
+        "throughput_per_hour": round(recent / hours, 2),
+    }
+
+
+class SummaryCache:
+    """One cached value, rebuilt after `ttl` seconds or when the version file changes."""
+
+    def __init__(self, ttl: float = DASHBOARD_CACHE_TTL, version_file: str = DASHBOARD_VERSION_FILE):
+        self.ttl = ttl
+        self.version_file = VersionFile(version_file)
+        self.builds = 0
+        self._value = None
+        self._version = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, build: Callable[[], dict]) -> dict:
+        version = self.version_file.current()
+        now = time.monotonic()
+        with self._lock:
+            if self._value is not None and version == self._version and now < self._expires:
+                return self._value
+        # Build outside the lock; two concurrent rebuilds are harmless.
+        value = build()
+        with self._lock:
+            self._value, self._version, self._expires = value, version, now + self.ttl
+            self.builds += 1
+        return value
+
+    def invalidate(self):
+        self.version_file.bump()
+        with self._lock:
+            self._value = None
+
+
+summary_cache = SummaryCache()
+
+
+def invalidate(cache: Optional[SummaryCache] = None):
+    """Drop the cached summary in every process; call after a job status change is committed."""
+    try:
+        (cache or summary_cache).invalidate()
+    except OSError:
+        # A stale dashboard for one TTL is better than a failed status change.
+        pass
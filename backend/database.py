@@ -1,16 +1,74 @@
-from sqlalchemy import create_engine
+import os
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLITE_URL = "sqlite:///./app.db"
+# The engine itself accepts any DATABASE_URL: SQLite's connect args and pragmas
+# below are only applied to SQLite URLs. The app as a whole still needs SQLite,
+# because the dashboard counter upserts (dashboard_stats), the blob store and
+# the export's json_each query (job_export) use its dialect.
+SQLITE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+# How long a connection waits for another writer before "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+# Page cache per connection, in KiB.
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+
+connect_args = {}
+if make_url(SQLITE_URL).get_backend_name() == "sqlite":
+    connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+
+engine = create_engine(SQLITE_URL, connect_args=connect_args)
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    """
+    WAL lets the API read while a worker writes; with synchronous=NORMAL a
+    commit no longer waits for an fsync (durable at the next checkpoint,
+    never corrupt). Applied to every new connection.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
 
-engine = create_engine(
-    SQLITE_URL, connect_args={"check_same_thread": False}
-)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# SQLite has one writer at a time. Serializing writes inside a process means
+# threads queue here instead of spinning in SQLite's busy handler, and only
+# processes compete for the database lock.
+_write_lock = threading.Lock()
+
+@contextmanager
+def write_session():
+    """
+    Session for one short write transaction, committed on exit.
+    Not reentrant: do not open a write_session inside another.
+    """
+    with _write_lock:
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,202 @@
+"""
+Live job events.
+
+The worker publishes job status, target status, step and log events per job;
+the API relays them to any number of WebSocket viewers. Events travel over
+Redis pub/sub (the broker Celery already uses). With EVENTS_URL=memory://
+an in-process bus stands in, for setups where worker and API share a
+process, and for tests.
+
+Publishing is best effort: a lost event never fails a job, and viewers can
+always resync from the REST endpoints (log events carry their line offset).
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Set
+
+EVENTS_URL = os.getenv("EVENTS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+# Events buffered per viewer; a viewer that falls further behind loses the oldest.
+VIEWER_QUEUE_SIZE = 1000
+
+# How long a new viewer waits for the job's subscription before going on without it.
+SUBSCRIBE_TIMEOUT = float(os.getenv("EVENTS_SUBSCRIBE_TIMEOUT", "5"))
+
+
+def channel(job_id: int) -> str:
+    return f"switchconfig:job:{job_id}:events"
+
+
+def use_local_bus() -> bool:
+    return EVENTS_URL.startswith("memory://")
+
+
+class LocalBus:
+    """In-process stand-in for Redis pub/sub: callbacks per channel."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Callable[[str], None]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, name: str, message: str) -> int:
+        with self._lock:
+            callbacks = list(self._subscribers.get(name, ()))
+        for callback in callbacks:
+            callback(message)
+        return len(callbacks)
+
+    def subscribe(self, name: str, callback: Callable[[str], None]):
+        with self._lock:
+            self._subscribers[name].add(callback)
+
+    def unsubscribe(self, name: str, callback: Callable[[str], None]):
+        with self._lock:
+            self._subscribers[name].discard(callback)
+            if not self._subscribers[name]:
+                del self._subscribers[name]
+
+
+local_bus = LocalBus()
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def _redis():
+    global _redis_client
+    with _redis_lock:
+        if _redis_client is None:
+            import redis
+            _redis_client = redis.Redis.from_url(EVENTS_URL)
+        return _redis_client
+
+
+def publish(job_id: int, event_type: str, **data):
+    """Publish one event for a job. Never raises."""
+    message = json.dumps(
+        {"type": event_type, "job_id": job_id, "ts": time.time(), **data}, default=str
+    )
+    try:
+        if use_local_bus():
+            local_bus.publish(channel(job_id), message)
+        else:
+            _redis().publish(channel(job_id), message)
+    except Exception:
+        pass
+
+
+class JobEventHub:
+    """
+    Fans events out to the viewers of a job inside one API process.
+
+    Each job with viewers has a single subscription (one Redis connection),
+    no matter how many viewers it has; it is dropped with the last viewer.
+    The subscription is made by a background task, so a viewer that needs
+    every event after some point (e.g. after reading a snapshot) awaits
+    wait_subscribed() first. Must be used from the event loop thread.
+    """
+
+    def __init__(self, retry_delay: float = 1.0):
+        self.retry_delay = retry_delay
+        self._viewers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._readers: Dict[int, asyncio.Task] = {}
+        self._subscribed: Dict[int, asyncio.Event] = {}
+
+    def viewer_count(self, job_id: Optional[int] = None) -> int:
+        if job_id is not None:
+            return len(self._viewers.get(job_id, ()))
+        return sum(len(v) for v in self._viewers.values())
+
+    def subscribe(self, job_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=VIEWER_QUEUE_SIZE)
+        self._viewers[job_id].add(queue)
+        if job_id not in self._readers:
+            self._subscribed[job_id] = asyncio.Event()
+            self._readers[job_id] = asyncio.get_running_loop().create_task(self._read(job_id))
+        return queue
+
+    async def wait_subscribed(self, job_id: int, timeout: float = SUBSCRIBE_TIMEOUT) -> bool:
+        """
+        Wait until the job's bus subscription is in place, so every event
+        published from now on reaches its viewers. False if it is not after
+        `timeout` seconds (e.g. Redis is down); events stay best effort.
+        """
+        subscribed = self._subscribed.get(job_id)
+        if subscribed is None:
+            return False
+        try:
+            await asyncio.wait_for(subscribed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def unsubscribe(self, job_id: int, queue: asyncio.Queue):
+        viewers = self._viewers.get(job_id)
+        if viewers is None:
+            return
+        viewers.discard(queue)
+        if not viewers:
+            del self._viewers[job_id]
+            self._subscribed.pop(job_id, None)
+            reader = self._readers.pop(job_id, None)
+            if reader:
+                reader.cancel()
+
+    def dispatch(self, job_id: int, message: str):
+        for queue in list(self._viewers.get(job_id, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def _mark_subscribed(self, job_id: int):
+        subscribed = self._subscribed.get(job_id)
+        if subscribed is not None:
+            subscribed.set()
+
+    async def _read(self, job_id: int):
+        if use_local_bus():
+            await self._read_local(job_id)
+            return
+        while True:
+            try:
+                await self._read_redis(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Redis restarted or unreachable; resubscribe shortly.
+                await asyncio.sleep(self.retry_delay)
+
+    async def _read_local(self, job_id: int):
+        loop = asyncio.get_running_loop()
+
+        def callback(message: str):
+            loop.call_soon_threadsafe(self.dispatch, job_id, message)
+
+        local_bus.subscribe(channel(job_id), callback)
+        self._mark_subscribed(job_id)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            local_bus.unsubscribe(channel(job_id), callback)
+
+    async def _read_redis(self, job_id: int):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(EVENTS_URL)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel(job_id))
+            self._mark_subscribed(job_id)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    data = message["data"]
+                    self.dispatch(job_id, data.decode() if isinstance(data, bytes) else data)
+        finally:
+            await pubsub.close()
+            await client.close()
+
+
+hub = JobEventHub()
@@ -0,0 +1,158 @@
+"""
+Streaming parsers for bulk job inventories: one target per CSV row or NDJSON line.
+
+CSV needs a header with a "port" column (any case); every other column is a
+variable, and empty cells are left out. NDJSON lines are either
+{"port": ..., "variables": {...}} or flat {"port": ..., "<variable>": ...}.
+A bare port number ("3") means the standard symlink "~/port3", matching the
+sample CSV the job page generates.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+
+class InventoryError(ValueError):
+    """The inventory as a whole is unusable (e.g. no port column)."""
+
+
+class InventoryRow(NamedTuple):
+    row: int  # 1-based data row (header excluded)
+    port: Optional[str]
+    variables: dict
+    errors: List[str]
+
+
+def normalize_port(value) -> Optional[str]:
+    port = str(value).strip() if value is not None else ""
+    if not port:
+        return None
+    return f"~/port{port}" if port.isdigit() else port
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines as the chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class CsvInventory:
+    """Incremental CSV parser; feed() lines, get rows back once complete."""
+
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.port_index = -1
+        self.rows = 0
+        self._pending: List[str] = []
+
+    def feed(self, line: str) -> Optional[InventoryRow]:
+        self._pending.append(line)
+        record = "\n".join(self._pending)
+        # Odd quote count: a quoted cell continues on the next line.
+        if record.count('"') % 2:
+            return None
+        self._pending = []
+        if not record.strip():
+            return None
+        fields = next(csv.reader(io.StringIO(record)))
+
+        if self.header is None:
+            self.header = [h.strip() for h in fields]
+            lowered = [h.lower() for h in self.header]
+            if "port" not in lowered:
+                raise InventoryError("CSV header needs a 'port' column")
+            self.port_index = lowered.index("port")
+            return None
+
+        self.rows += 1
+        errors = []
+        if len(fields) > len(self.header):
+            errors.append(f"Row has {len(fields)} cells but the header has {len(self.header)}")
+        port = normalize_port(fields[self.port_index]) if self.port_index < len(fields) else None
+        variables = {
+            name: value.strip()
+            for i, (name, value) in enumerate(zip(self.header, fields))
+            if i != self.port_index and name and value.strip() != ""
+        }
+        if port is None:
+            errors.append("Missing port")
+        return InventoryRow(self.rows, port, variables, errors)
+
+    def finish(self) -> Optional[InventoryRow]:
+        if self.header is None:
+            raise InventoryError("CSV inventory is empty")
+        if not self._pending:
+            return None
+        self.rows += 1
+        self._pending = []
+        return InventoryRow(self.rows, None, {}, ["Unterminated quoted cell"])
+
+
+class NdjsonInventory:
+    """Parser for one JSON object per line."""
+
+    def __init__(self):
+        self.rows = 0
+
+    def feed(self, line: str) -> Optional[InventoryRow]:
+        if not line.strip():
+            return None
+        self.rows += 1
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            return InventoryRow(self.rows, None, {}, [f"Invalid JSON: {e}"])
+        if not isinstance(item, dict):
+            return InventoryRow(self.rows, None, {}, ["Line must be a JSON object"])
+
+        port = normalize_port(item.get("port"))
+        if isinstance(item.get("variables"), dict):
+            variables = dict(item["variables"])
+        else:
+            variables = {k: v for k, v in item.items() if k != "port"}
+        errors = [] if port else ["Missing port"]
+        return InventoryRow(self.rows, port, variables, errors)
+
+    def finish(self) -> Optional[InventoryRow]:
+        return None
+
+
+def make_parser(fmt: str):
+    if fmt == "csv":
+        return CsvInventory()
+    if fmt == "ndjson":
+        return NdjsonInventory()
+    raise InventoryError(f"Unsupported inventory format '{fmt}' (use csv or ndjson)")
+
+
+def detect_format(content_type: Optional[str]) -> str:
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return "csv"
+
+
+async def parse_inventory(chunks: AsyncIterator[bytes], fmt: str, max_rows: Optional[int] = None) -> List[InventoryRow]:
+    """Parse a streamed inventory into rows (with per-row errors)."""
+    parser = make_parser(fmt)
+    rows = []
+    async for line in iter_lines(chunks):
+        row = parser.feed(line)
+        if row is not None:
+            rows.append(row)
+            if max_rows is not None and len(rows) > max_rows:
+                raise InventoryError(f"Inventory has more than {max_rows} rows")
+    row = parser.finish()
+    if row is not None:
+        rows.append(row)
+    return rows
@@ -0,0 +1,155 @@
+"""
+Streaming export of a job's targets as CSV or NDJSON.
+
+Targets are read in batches of EXPORT_BATCH_SIZE and every row is encoded
+and handed to the response as soon as it is built, so memory use does not
+grow with the size of the job. With `checks`, verification_results are
+flattened into one row per check (a target without results still gets one
+row). Full command output is never exported; use the target endpoint for it.
+"""
+import csv
+import datetime
+import io
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "100"))
+
+# Number of log lines summarised per target.
+LOG_SUMMARY_LINES = 3
+LOG_SUMMARY_CHARS = 100
+
+TARGET_FIELDS = [
+    "target_id", "port", "status", "failure_category", "remediation",
+    "started_at", "finished_at", "created_at", "log_summary",
+]
+CHECK_FIELDS = ["check_index", "check_name", "check_status", "check_message", "check_evidence"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def log_summary(lines: List[str]) -> str:
+    summary = " ".join(lines)
+    return summary[:LOG_SUMMARY_CHARS] + "..." if len(summary) > LOG_SUMMARY_CHARS else summary
+
+
+def target_record(target: models.JobTarget, summary: str) -> dict:
+    return {
+        "target_id": target.id,
+        "port": target.port,
+        "status": target.status,
+        "failure_category": target.failure_category,
+        "remediation": target.remediation,
+        "started_at": target.started_at,
+        "finished_at": target.finished_at,
+        "created_at": target.created_at,
+        "log_summary": summary,
+        "variables": target.variables or {},
+    }
+
+
+def check_records(record: dict, results: list) -> Iterator[dict]:
+    """One record per verification check, repeating the target's fields."""
+    if not results:
+        yield {**record, **{field: None for field in CHECK_FIELDS}}
+        return
+    for index, result in enumerate(results, 1):
+        yield {
+            **record,
+            "check_index": index,
+            "check_name": result.get("check_name"),
+            "check_status": result.get("status"),
+            "check_message": result.get("message"),
+            "check_evidence": result.get("evidence"),
+        }
+
+
+def log_summaries(db: Session, target_ids: List[int]) -> Dict[int, str]:
+    """Log summaries of a batch of targets in one query."""
+    lines = defaultdict(list)
+    rows = (
+        db.query(models.TargetLogLine.target_id, models.TargetLogLine.line)
+        .filter(models.TargetLogLine.target_id.in_(target_ids), models.TargetLogLine.seq < LOG_SUMMARY_LINES)
+        .order_by(models.TargetLogLine.target_id, models.TargetLogLine.seq)
+    )
+    for target_id, line in rows:
+        lines[target_id].append(line)
+    return {target_id: log_summary(lines[target_id]) for target_id in target_ids}
+
+
+def iter_records(db: Session, job_id: int, checks: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    """Export records of a job's targets in id order, loaded batch by batch."""
+    from sqlalchemy import select
+
+    result = db.execute(
+        select(models.JobTarget)
+        .where(models.JobTarget.job_id == job_id)
+        .order_by(models.JobTarget.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in result.scalars().partitions():
+        summaries = log_summaries(db, [target.id for target in batch])
+        for target in batch:
+            record = target_record(target, summaries[target.id])
+            if checks:
+                yield from check_records(record, target.verification_results or [])
+            else:
+                yield record
+        # Drop the batch from the session so memory stays flat.
+        for target in batch:
+            db.expunge(target)
+
+
+def variable_keys(db: Session, job_id: int) -> List[str]:
+    """Every variable name used by the job's targets, sorted (one SQLite json_each query)."""
+    from sqlalchemy import text
+
+    rows = db.execute(
+        text(
+            "SELECT DISTINCT je.key FROM job_targets, json_each(job_targets.variables) AS je "
+            "WHERE job_targets.job_id = :job_id AND json_type(job_targets.variables) = 'object'"
+        ),
+        {"job_id": job_id},
+    )
+    return sorted(key for (key,) in rows)
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def iter_csv(records: Iterable[dict], var_keys: List[str], checks: bool = False) -> Iterator[str]:
+    """CSV text, one chunk per row; variables become one column each."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    fields = TARGET_FIELDS + (CHECK_FIELDS if checks else [])
+    writer.writerow(fields + var_keys)
+    yield take()
+    for record in records:
+        variables = record["variables"]
+        writer.writerow([_cell(record[f]) for f in fields] + [_cell(variables.get(k)) for k in var_keys])
+        yield take()
+
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, default=_cell) + "\n"
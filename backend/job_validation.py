@@ -0,0 +1,170 @@
+"""
+Render and validate a job's targets before anything is queued.
+
+Every target's variables are checked against the template's config_schema,
+and every step string the worker would render is rendered with them. A
+missing variable then fails the submission instead of failing a target
+after its switch has been half-configured.
+
+Schema validators and step templates are compiled once and reused for all
+targets of a batch (and later batches of the same template).
+"""
+import functools
+import hashlib
+import json
+import re
+from typing import Callable, List, NamedTuple
+
+from . import template_cache
+
+# Values arrive as strings from forms and CSV imports, so numeric and
+# boolean types also accept their string spellings.
+INTEGER = re.compile(r"[+-]?\d+")
+NUMBER = re.compile(r"[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?")
+BOOLEAN_STRINGS = {"true", "false"}
+
+TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, str) and INTEGER.fullmatch(v.strip()) is not None),
+    "number": lambda v: (isinstance(v, (int, float)) and not isinstance(v, bool))
+    or (isinstance(v, str) and NUMBER.fullmatch(v.strip()) is not None),
+    "boolean": lambda v: isinstance(v, bool) or (isinstance(v, str) and v.lower() in BOOLEAN_STRINGS),
+}
+
+
+class StepSource(NamedTuple):
+    step: int
+    type: str
+    field: str
+    source: str
+
+
+def is_missing(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def compile_schema(schema: dict) -> Callable[[dict], List[str]]:
+    """
+    Build a validator for the config_schema subset templates use:
+    required, and per property type, enum, pattern, minLength/maxLength and
+    minimum/maximum. Returns a function mapping variables to error messages.
+    """
+    schema = schema or {}
+    required = list(schema.get("required") or [])
+    checks = []
+    for name, prop in (schema.get("properties") or {}).items():
+        prop = prop or {}
+        label = prop.get("title") or name
+        type_check = TYPE_CHECKS.get(prop.get("type"))
+        enum = prop.get("enum")
+        try:
+            pattern = re.compile(prop["pattern"]) if prop.get("pattern") else None
+        except re.error:
+            # A broken schema pattern is the template's problem; don't block jobs on it.
+            pattern = None
+        checks.append((name, label, prop.get("type"), type_check, enum, pattern, prop))
+
+    def validate(variables: dict) -> List[str]:
+        variables = variables or {}
+        errors = [f"Missing required variable '{name}'" for name in required if is_missing(variables.get(name))]
+        for name, label, type_name, type_check, enum, pattern, prop in checks:
+            value = variables.get(name)
+            if is_missing(value):
+                continue
+            if type_check and not type_check(value):
+                errors.append(f"'{label}' must be of type {type_name}, got {value!r}")
+                continue
+            if enum is not None and value not in enum and str(value) not in [str(e) for e in enum]:
+                errors.append(f"'{label}' must be one of {enum}, got {value!r}")
+            if pattern is not None and not pattern.search(str(value)):
+                errors.append(f"'{label}' does not match pattern {prop['pattern']!r}")
+            if "minLength" in prop and len(str(value)) < prop["minLength"]:
+                errors.append(f"'{label}' is shorter than {prop['minLength']} characters")
+            if "maxLength" in prop and len(str(value)) > prop["maxLength"]:
+                errors.append(f"'{label}' is longer than {prop['maxLength']} characters")
+            if "minimum" in prop or "maximum" in prop:
+                try:
+                    number = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if "minimum" in prop and number < prop["minimum"]:
+                    errors.append(f"'{label}' must be at least {prop['minimum']}")
+                if "maximum" in prop and number > prop["maximum"]:
+                    errors.append(f"'{label}' must be at most {prop['maximum']}")
+        return errors
+
+    return validate
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_validator(template_id, schema_hash: str, schema_json: str):
+    return compile_schema(json.loads(schema_json))
+
+
+def schema_validator(template) -> Callable[[dict], List[str]]:
+    """Compiled validator for a template's config_schema, cached by id and content."""
+    schema_json = json.dumps(template.config_schema or {}, sort_keys=True)
+    schema_hash = hashlib.sha1(schema_json.encode()).hexdigest()
+    return _cached_validator(template.id, schema_hash, schema_json)
+
+
+def step_sources(steps: list) -> List[StepSource]:
+    """Every template string the worker renders, in step order (1-based)."""
+    sources = []
+    for index, step in enumerate(steps, 1):
+        step_type = step.get("type", "send")
+        if step_type in ["send", "command"]:
+            fields = [("cmd", step.get("cmd", step.get("content", "")))]
+        elif step_type == "config_diff":
+            fields = [("command", step.get("command") or "show running-config"), ("content", step.get("content", ""))]
+        elif step_type == "expect":
+            fields = [("pattern", step.get("pattern", "")), ("response", step.get("response", ""))]
+        elif step_type in ["authenticate", "login"]:
+            fields = [(name, step[name]) for name in ["username", "password"] if step.get(name)]
+        elif step_type == "verify":
+            fields = [("command", step.get("command", step.get("cmd", "show run"))), ("pattern", step.get("pattern", ""))]
+        else:
+            fields = []
+        sources.extend(StepSource(index, step_type, field, source or "") for field, source in fields)
+    return sources
+
+
+def render_target(sources: List[StepSource], variables: dict, validator: Callable, scope=None, keep_output: bool = False) -> dict:
+    """Validate and render one target. Returns {ok, errors, rendered}."""
+    variables = variables or {}
+    errors = validator(variables)
+    rendered = []
+    for item in sources:
+        try:
+            text = template_cache.render(item.source, variables, scope)
+        except Exception as e:
+            errors.append(f"Step {item.step} ({item.type} {item.field}): {e}")
+            continue
+        if keep_output:
+            rendered.append({"step": item.step, "type": item.type, "field": item.field, "text": text})
+    return {"ok": not errors, "errors": errors, "rendered": rendered if keep_output else None}
+
+
+def render_job(template, targets: list, keep_output: bool = False) -> dict:
+    """
+    Validate and render all targets of a job submission in one pass.
+    `targets` are JobTargetCreate-like objects with .port and .variables.
+    """
+    from .worker import normalize_template_steps
+
+    validator = schema_validator(template)
+    steps = normalize_template_steps(template)
+    sources = step_sources(steps)
+    results = []
+    for index, target in enumerate(targets):
+        result = render_target(sources, target.variables, validator, scope=template.id, keep_output=keep_output)
+        if not steps:
+            result["ok"] = False
+            result["errors"].append("Template has no executable steps")
+        results.append({"index": index, "port": target.port, **result})
+    return {
+        "template_id": template.id,
+        "ok": all(r["ok"] for r in results),
+        "targets": results,
+    }
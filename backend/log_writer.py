@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+# A target's pending log lines are written at most this often...
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.25"))
+# ...or as soon as this many lines are pending.
+LOG_FLUSH_LINES = int(os.getenv("LOG_FLUSH_LINES", "50"))
+
+
+class TargetLogWriter:
+    """
+    Batched, debounced log sink for one job target.
+
+    write() only appends to memory. Pending lines reach the database when
+    `flush_lines` of them have piled up, or `flush_interval` seconds after the
+    first one arrived (from a background thread), whichever comes first.
+    Callers must flush() before committing a status change and close() at
+    the end, so the stored log is never behind the target's status.
+
+    Lines are stored append-only as TargetLogLine rows numbered from 0, so a
+    flush inserts just the new lines. Flushes use their own short-lived
+    session and never touch the caller's session or its pending state.
+    With many targets in parallel, pass a shared LogFlusher instead: the
+    writer then has no timer thread of its own, and the flusher stores the
+    pending lines of all its writers in one transaction per interval.
+
+    `on_flush(offset, lines)` is called after each stored batch, with the
+    line offset of its first line.
+    """
+
+    def __init__(
+        self,
+        target_id: int,
+        session_factory: Callable,
+        flush_interval: Optional[float] = None,
+        flush_lines: Optional[int] = None,
+        on_flush: Optional[Callable[[int, List[str]], None]] = None,
+        flusher: Optional["LogFlusher"] = None,
+    ):
+        self.target_id = target_id
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        self.flusher = flusher
+        self.flush_interval = LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.flush_lines = LOG_FLUSH_LINES if flush_lines is None else flush_lines
+        self.flush_count = 0
+        self._lines = []
+        self._flushed = 0
+        # _lock guards the line list; _flush_lock makes a batch's insert and
+        # its bookkeeping atomic, so no line is stored twice.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+        if flusher is not None:
+            flusher.register(self)
+        else:
+            self._thread = threading.Thread(
+                target=self._flush_loop, name=f"target-log-{target_id}", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def text(self) -> str:
+        """Full log including lines not flushed yet."""
+        with self._lock:
+            return "\n".join(self._lines)
+
+    def write(self, msg: str):
+        line = f"[{time.strftime('%H:%M:%S')}] {msg}"
+        with self._lock:
+            self._lines.append(line)
+            full = len(self._lines) - self._flushed >= self.flush_lines
+        if full:
+            self.flush()
+        else:
+            self._dirty.set()
+
+    def flush(self):
+        with self._flush_lock:
+            rows = self._pending_rows()
+            if not rows:
+                return
+            if self.flusher is not None:
+                with self.flusher.session_scope() as db:
+                    db.bulk_insert_mappings(models.TargetLogLine, rows)
+            else:
+                db = self.session_factory()
+                try:
+                    db.bulk_insert_mappings(models.TargetLogLine, rows)
+                    db.commit()
+                finally:
+                    db.close()
+            self._mark_flushed(rows)
+
+    def close(self):
+        """Stop the timer thread and write whatever is still pending."""
+        self._closed.set()
+        self._dirty.set()
+        if self.flusher is not None:
+            self.flusher.unregister(self)
+        else:
+            self._thread.join(timeout=max(1.0, self.flush_interval * 2))
+        self.flush()
+
+    def _pending_rows(self) -> List[dict]:
+        """Rows for the lines not stored yet. Call with _flush_lock held."""
+        with self._lock:
+            return [
+                {"target_id": self.target_id, "seq": seq, "line": self._lines[seq]}
+                for seq in range(self._flushed, len(self._lines))
+            ]
+
+    def _mark_flushed(self, rows: List[dict]):
+        """Record a stored batch and notify. Call with _flush_lock held."""
+        offset = rows[0]["seq"]
+        with self._lock:
+            self._flushed = offset + len(rows)
+        self.flush_count += 1
+        if self.on_flush:
+            self.on_flush(offset, [row["line"] for row in rows])
+
+    def _flush_loop(self):
+        while not self._closed.is_set():
+            self._dirty.wait()
+            if self._closed.wait(self.flush_interval):
+                return
+            self._dirty.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the lines pending; the next flush retries them.
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LogFlusher:
+    """
+    Stores the pending lines of many TargetLogWriters together.
+
+    Every `interval` seconds one background thread collects the new lines of
+    all registered writers and inserts them in a single short transaction,
+    opened with `session_scope` (a context manager yielding a session and
+    committing on exit, such as database.write_session). A 16-port job then
+    costs a few write transactions per second instead of one per line per
+    target, and the API's readers rarely wait behind a writer.
+    """
+
+    def __init__(self, session_scope: Callable, interval: Optional[float] = None):
+        self.session_scope = session_scope
+        self.interval = LOG_FLUSH_INTERVAL if interval is None else interval
+        self.flush_count = 0
+        self._writers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, writer: TargetLogWriter):
+        with self._lock:
+            self._writers.add(writer)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._flush_loop, name="target-log-flusher", daemon=True)
+                self._thread.start()
+
+    def unregister(self, writer: TargetLogWriter):
+        with self._lock:
+            self._writers.discard(writer)
+
+    def flush_all(self):
+        """Store every registered writer's pending lines in one transaction."""
+        with self._lock:
+            writers = list(self._writers)
+        held = []
+        try:
+            batches = []
+            for writer in writers:
+                # A writer flushing itself right now is skipped; its lines
+                # are in that flush or the next one.
+                if not writer._flush_lock.acquire(blocking=False):
+                    continue
+                held.append(writer)
+                rows = writer._pending_rows()
+                if rows:
+                    batches.append((writer, rows))
+            if not batches:
+                return
+            with self.session_scope() as db:
+                db.bulk_insert_mappings(models.TargetLogLine, [row for _, rows in batches for row in rows])
+            self.flush_count += 1
+            for writer, rows in batches:
+                writer._mark_flushed(rows)
+        finally:
+            for writer in held:
+                writer._flush_lock.release()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush_all()
+            except Exception:
+                # Keep the lines pending; the next round retries them.
+                pass
+
+
+def read_log_lines(db: Session, target_id: int, after: int = 0, limit: Optional[int] = None) -> List[str]:
+    """Log lines of a target starting at line offset `after`."""
+    query = (
+        db.query(models.TargetLogLine.line)
+        .filter(models.TargetLogLine.target_id == target_id, models.TargetLogLine.seq >= after)
+        .order_by(models.TargetLogLine.seq)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [line for (line,) in query.all()]
+
+
+def clear_log(db: Session, target_id: int):
+    """Drop a target's stored log before it runs again. Caller commits."""
+    db.query(models.TargetLogLine).filter(models.TargetLogLine.target_id == target_id).delete(
+        synchronize_session=False
+    )
@@ -6,7 +6,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .database import engine, Base
-from .routers import templates, jobs, console, settings, dashboard
+from .routers import templates, jobs, console, settings, dashboard, outputs
 
 # Create DB tables
 Base.metadata.create_all(bind=engine)
@@ -26,6 +26,7 @@ app.include_router(jobs.router)
 app.include_router(console.router)
 app.include_router(settings.router)
 app.include_router(dashboard.router)
+app.include_router(outputs.router)
 
 @app.get("/")
 def read_root():
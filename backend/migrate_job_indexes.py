@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add the indexes used by the job list.
+
+- ix_jobs_created_at_id on jobs(created_at, id) for keyset pagination
+- ix_job_targets_job_status on job_targets(job_id, status) for status counts
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Database path - app.db is in the project root
+DB_PATH = Path(__file__).parent.parent / "app.db"
+
+def migrate():
+    """Create the job list indexes if they are missing."""
+    
+    if not DB_PATH.exists():
+        print(f"ERROR: Database not found at {DB_PATH}")
+        return 1
+    
+    print(f"Migrating database: {DB_PATH}")
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        print("Creating 'ix_jobs_created_at_id'...")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_jobs_created_at_id ON jobs (created_at, id)")
+        
+        print("Creating 'ix_job_targets_job_status'...")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_targets_job_status ON job_targets (job_id, status)")
+        
+        cursor.execute("ANALYZE")
+        conn.commit()
+        print("✓ Migration completed successfully")
+        return 0
+        
+    except Exception as e:
+        print(f"ERROR during migration: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(migrate())
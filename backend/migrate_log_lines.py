@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Move job target logs into the append-only target_log_lines table.
+
+Copies every job_targets.log text into one row per line. The old column is
+left in place (SQLite cannot drop it cheaply) but is no longer read or written.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Database path - app.db is in the project root
+DB_PATH = Path(__file__).parent.parent / "app.db"
+
+def migrate():
+    """Create target_log_lines and copy existing logs into it."""
+    
+    if not DB_PATH.exists():
+        print(f"ERROR: Database not found at {DB_PATH}")
+        return 1
+    
+    print(f"Migrating database: {DB_PATH}")
+    
+    # Backup first
+    backup_path = DB_PATH.with_suffix('.db.pre-log-lines')
+    if not backup_path.exists():
+        print(f"Creating backup at {backup_path}...")
+        import shutil
+        shutil.copy2(DB_PATH, backup_path)
+        print("✓ Backup created")
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS target_log_lines (
+                id INTEGER PRIMARY KEY,
+                target_id INTEGER NOT NULL REFERENCES job_targets (id),
+                seq INTEGER NOT NULL,
+                line TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_target_log_lines_target_seq
+            ON target_log_lines (target_id, seq)
+        """)
+        
+        cursor.execute("PRAGMA table_info(job_targets)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if 'log' not in columns:
+            conn.commit()
+            print("✓ No legacy log column - nothing to copy")
+            return 0
+        
+        cursor.execute("""
+            SELECT id, log FROM job_targets
+            WHERE log IS NOT NULL AND log != ''
+            AND id NOT IN (SELECT DISTINCT target_id FROM target_log_lines)
+        """)
+        copied = 0
+        for target_id, log in cursor.fetchall():
+            rows = [(target_id, seq, line) for seq, line in enumerate(log.split("\n"))]
+            conn.executemany(
+                "INSERT INTO target_log_lines (target_id, seq, line) VALUES (?, ?, ?)", rows
+            )
+            copied += 1
+        
+        conn.commit()
+        print(f"✓ Migration completed successfully ({copied} target log(s) copied)")
+        return 0
+        
+    except Exception as e:
+        print(f"ERROR during migration: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(migrate())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Move captured command output into 'output_blobs'.
+
+Verification results used to embed the complete output of every verified
+show command as "full_output". This creates the content-addressed
+output_blobs table, stores each distinct output once (compressed) and
+replaces "full_output" with "output_hash"/"output_size" in every result.
+Pass --vacuum to give the freed space back to the filesystem afterwards.
+"""
+
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.blob_store import compress, digest
+
+# Database path - app.db is in the project root
+DB_PATH = Path(__file__).parent.parent / "app.db"
+
+BATCH_SIZE = 200
+
+def migrate(vacuum=False):
+    """Create output_blobs and externalize full_output from job_targets."""
+    
+    if not DB_PATH.exists():
+        print(f"ERROR: Database not found at {DB_PATH}")
+        return 1
+    
+    print(f"Migrating database: {DB_PATH}")
+    
+    # Backup first
+    backup_path = DB_PATH.with_suffix('.db.pre-output-blobs')
+    if not backup_path.exists():
+        print(f"Creating backup at {backup_path}...")
+        import shutil
+        shutil.copy2(DB_PATH, backup_path)
+        print("✓ Backup created")
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        print("Creating 'output_blobs' table...")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS output_blobs (
+                hash VARCHAR PRIMARY KEY,
+                encoding VARCHAR NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at DATETIME
+            )
+        """)
+        
+        print("Moving full_output into output_blobs...")
+        targets = blobs = last_id = 0
+        while True:
+            rows = cursor.execute(
+                "SELECT id, verification_results FROM job_targets WHERE id > ? "
+                "AND verification_results LIKE '%\"full_output\"%' ORDER BY id LIMIT ?",
+                (last_id, BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            for target_id, raw in rows:
+                last_id = target_id
+                results = json.loads(raw) if raw else []
+                for result in results:
+                    text = result.pop("full_output", None)
+                    if not text:
+                        continue
+                    key = digest(text)
+                    encoding, data = compress(text)
+                    cursor.execute(
+                        "INSERT OR IGNORE INTO output_blobs (hash, encoding, size, data, created_at) "
+                        "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                        (key, encoding, len(text.encode("utf-8")), data),
+                    )
+                    blobs += cursor.rowcount
+                    result["output_hash"] = key
+                    result["output_size"] = len(text.encode("utf-8"))
+                cursor.execute(
+                    "UPDATE job_targets SET verification_results = ? WHERE id = ?",
+                    (json.dumps(results), target_id),
+                )
+                targets += 1
+            conn.commit()
+        
+        print(f"✓ {targets} targets rewritten, {blobs} distinct outputs stored")
+        
+        if vacuum:
+            print("Vacuuming database...")
+            cursor.execute("VACUUM")
+        
+        print("✓ Migration completed successfully")
+        return 0
+        
+    except Exception as e:
+        print(f"ERROR during migration: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(migrate(vacuum="--vacuum" in sys.argv))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Create the 'port_stats' table and backfill it.
+
+The dashboard reads per-port success rates and throughput from port_stats,
+which the worker maintains as targets finish. This fills it once from the
+finished targets already in job_targets.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Database path - app.db is in the project root
+DB_PATH = Path(__file__).parent.parent / "app.db"
+
+def migrate():
+    """Create port_stats and count existing finished targets into it."""
+    
+    if not DB_PATH.exists():
+        print(f"ERROR: Database not found at {DB_PATH}")
+        return 1
+    
+    print(f"Migrating database: {DB_PATH}")
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='port_stats'")
+        if cursor.fetchone():
+            print("✓ port_stats already exists, nothing to do")
+            return 0
+        
+        print("Creating 'port_stats' table...")
+        cursor.execute("""
+            CREATE TABLE port_stats (
+                id INTEGER PRIMARY KEY,
+                port VARCHAR NOT NULL,
+                hour DATETIME NOT NULL,
+                succeeded INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                duration_seconds FLOAT NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("CREATE UNIQUE INDEX ix_port_stats_port_hour ON port_stats (port, hour)")
+        
+        print("Backfilling from finished targets...")
+        # Targets from before started_at/finished_at existed are counted at updated_at.
+        cursor.execute("""
+            INSERT INTO port_stats (port, hour, succeeded, failed, duration_seconds)
+            SELECT port,
+                   strftime('%Y-%m-%d %H:00:00.000000', COALESCE(finished_at, updated_at)) AS hour,
+                   SUM(status = 'success'),
+                   SUM(status = 'failed'),
+                   COALESCE(SUM(
+                       CASE WHEN started_at IS NOT NULL AND finished_at IS NOT NULL
+                            THEN MAX(0, (julianday(finished_at) - julianday(started_at)) * 86400)
+                       END
+                   ), 0)
+            FROM job_targets
+            WHERE status IN ('success', 'failed') AND port IS NOT NULL
+            GROUP BY port, hour
+        """)
+        print(f"✓ {cursor.rowcount} port/hour rows written")
+        
+        conn.commit()
+        print("✓ Migration completed successfully")
+        return 0
+        
+    except Exception as e:
+        print(f"ERROR during migration: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(migrate())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add 'started_at' and 'finished_at' to job_targets table.
+
+The port scheduler uses them to estimate queue wait times.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# Database path - app.db is in the project root
+DB_PATH = Path(__file__).parent.parent / "app.db"
+
+def migrate():
+    """Add started_at and finished_at columns to job_targets table."""
+    
+    if not DB_PATH.exists():
+        print(f"ERROR: Database not found at {DB_PATH}")
+        return 1
+    
+    print(f"Migrating database: {DB_PATH}")
+    
+    # Backup first
+    backup_path = DB_PATH.with_suffix('.db.pre-target-timing')
+    if not backup_path.exists():
+        print(f"Creating backup at {backup_path}...")
+        import shutil
+        shutil.copy2(DB_PATH, backup_path)
+        print("✓ Backup created")
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("PRAGMA table_info(job_targets)")
+        columns = [row[1] for row in cursor.fetchall()]
+        
+        if 'started_at' not in columns:
+            print("Adding 'started_at' column...")
+            cursor.execute("ALTER TABLE job_targets ADD COLUMN started_at DATETIME")
+        
+        if 'finished_at' not in columns:
+            print("Adding 'finished_at' column...")
+            cursor.execute("ALTER TABLE job_targets ADD COLUMN finished_at DATETIME")
+        
+        conn.commit()
+        print("✓ Migration completed successfully")
+        return 0
+        
+    except Exception as e:
+        print(f"ERROR during migration: {e}")
+        conn.rollback()
+        return 1
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(migrate())
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON, DateTime
+from sqlalchemy import Column, Integer, Float, String, Text, ForeignKey, JSON, DateTime, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -28,6 +28,9 @@ class Job(Base):
     template = relationship("Template", back_populates="jobs")
     targets = relationship("JobTarget", back_populates="job")
 
+    # Keyset pagination of the job list walks (created_at, id) backwards.
+    __table_args__ = (Index("ix_jobs_created_at_id", "created_at", "id"),)
+
 class JobTarget(Base):
     __tablename__ = "job_targets"
 
@@ -36,14 +39,53 @@ class JobTarget(Base):
     port = Column(String) # e.g. "~/port1"
     variables = Column(JSON) # Actual variables used for this target
     status = Column(String, default="queued") # queued, running, success, failed
-    log = Column(Text, default="")
     verification_results = Column(JSON, default=list)  # List of check results
     failure_category = Column(String, nullable=True)  # Categorized failure type
     remediation = Column(Text, nullable=True)  # Suggested fix
+    started_at = Column(DateTime, nullable=True)  # Dispatched to its port
+    finished_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     job = relationship("Job", back_populates="targets")
+    log_lines = relationship("TargetLogLine", order_by="TargetLogLine.seq", passive_deletes=True)
+
+    # Covers the per-job status counts of the job list.
+    __table_args__ = (Index("ix_job_targets_job_status", "job_id", "status"),)
+
+class TargetLogLine(Base):
+    """One line of a target's log. Append-only; seq counts from 0 per target."""
+    __tablename__ = "target_log_lines"
+
+    id = Column(Integer, primary_key=True)
+    target_id = Column(Integer, ForeignKey("job_targets.id"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    line = Column(Text, nullable=False)
+
+    __table_args__ = (Index("ix_target_log_lines_target_seq", "target_id", "seq", unique=True),)
+
+class PortStat(Base):
+    """Targets finished per port and hour; maintained by the worker for the dashboard."""
+    __tablename__ = "port_stats"
+
+    id = Column(Integer, primary_key=True)
+    port = Column(String, nullable=False)
+    hour = Column(DateTime, nullable=False)  # Start of the hour (UTC)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Float, nullable=False, default=0)  # Sum over finished targets
+
+    __table_args__ = (Index("ix_port_stats_port_hour", "port", "hour", unique=True),)
+
+class OutputBlob(Base):
+    """Captured command output, compressed and stored once per distinct text."""
+    __tablename__ = "output_blobs"
+
+    hash = Column(String, primary_key=True)  # sha256 of the UTF-8 text
+    encoding = Column(String, nullable=False)  # "zstd" or "gzip"
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
 class Setting(Base):
     __tablename__ = "settings"
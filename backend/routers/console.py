@@ -1,13 +1,15 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
+import logging
 import os
 import serial
 from serial_lib.serial_session import SerialSession
+from serial_lib.port_lock import PortLease, PortBusyError, read_holder
 
-from ..database import SessionLocal, get_db
 from .. import models, schemas
-from fastapi import Depends
-from sqlalchemy.orm import Session
+from ..settings_cache import settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/console",
@@ -19,35 +21,31 @@ def test_console():
     return {"status": "console router reachable"}
 
 @router.get("/ports")
-def list_ports(db: Session = Depends(get_db)):
+def list_ports():
     ports = []
     
-    # Fetch baud rates from settings
-    baud_rates = {}
-    setting = db.query(models.Setting).filter(models.Setting.key == "port_baud_rates").first()
-    if setting:
-        baud_rates = setting.value
-        
     # Check ports 1-16
     for i in range(1, 17):
         port_path = os.path.expanduser(f"~/port{i}")
         exists = os.path.exists(port_path)
-        is_busy = port_path in active_consoles
+        # Lease is shared with the worker, so ports used by jobs show as busy too.
+        holder = read_holder(port_path) if exists else None
         
         # Determine baud rate (default 9600)
-        baud = baud_rates.get(str(i), 9600)
+        baud = settings.port_baud(i)
         
         ports.append({
             "id": i,
             "path": port_path,
             "connected": exists, # "connected" means the device/symlink exists
-            "busy": is_busy,
+            "busy": holder is not None,
+            "holder": holder.get("owner") if holder else None,
             "baud": baud
         })
     return ports
 
-# In-memory lock for active console sessions in this process
-# Note: For multi-process/worker setups, a file-based or Redis-based lock should be used.
+# Console sessions open in this process (for the dashboard). Exclusive access
+# to a port is enforced across processes by PortLease.
 active_consoles = set()
 
 @router.websocket("/ws/{port_id}")
@@ -56,28 +54,26 @@ async def console_websocket(websocket: WebSocket, port_id: str):
     port_path = os.path.expanduser(f"~/port{port_id}")
     print(f"debug: WebSocket connected for {port_path}", flush=True)
 
-    if port_path in active_consoles:
-        await asyncio.sleep(0.5)
-        if port_path in active_consoles:
-            await websocket.close(code=1008, reason="Port busy (Console active)")
-            return
+    lease = PortLease(port_path, owner="console")
+    try:
+        await asyncio.to_thread(lease.acquire, 0.5)
+    except PortBusyError:
+        holder = read_holder(port_path) or {}
+        await websocket.close(code=1008, reason=f"Port busy ({holder.get('owner', 'in use')})")
+        return
 
-    await websocket.accept()
-    active_consoles.add(port_path)
-    
     session = None
     try:
+        await websocket.accept()
+        active_consoles.add(port_path)
+
         if not os.path.exists(port_path):
             await websocket.send_text(f"\r\n[Error: Port {port_path} does not exist]\r\n")
             await websocket.close()
             return
 
         # Fetch baud rate for this port from settings
-        baud = 9600
-        with SessionLocal() as db:
-            setting = db.query(models.Setting).filter(models.Setting.key == "port_baud_rates").first()
-            if setting and str(port_id) in setting.value:
-                baud = setting.value[str(port_id)]
+        baud = settings.port_baud(port_id)
 
         session = SerialSession(port_path, baud=baud, timeout=0.1)
         try:
@@ -204,8 +200,14 @@ async def console_websocket(websocket: WebSocket, port_id: str):
     finally:
         if session:
             await asyncio.to_thread(session.disconnect)
-        if port_path in active_consoles:
-            active_consoles.remove(port_path)
+        active_consoles.discard(port_path)
+        lease.release()
+        # Targets queued behind the console can start now.
+        try:
+            from ..worker import dispatch_ports
+            dispatch_ports.delay()
+        except Exception:
+            logger.warning("Could not trigger dispatch after console on %s closed", port_path, exc_info=True)
 
 
 
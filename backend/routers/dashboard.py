@@ -1,8 +1,10 @@
+import datetime
+
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
-from .. import database, models
+from .. import database, models, dashboard_stats
 from .console import active_consoles
 
 router = APIRouter(
@@ -11,34 +13,73 @@ router = APIRouter(
 )
 
 
-@router.get("/summary")
-def read_dashboard_summary(db: Session = Depends(database.get_db)):
+def build_summary(db: Session) -> dict:
+    """Everything on the dashboard except live console sessions."""
     template_count = db.query(func.count(models.Template.id)).scalar() or 0
-    configured_targets = (
-        db.query(func.count(models.JobTarget.id))
-        .filter(models.JobTarget.status == "success")
-        .scalar()
-        or 0
+    job_counts = dict(db.query(models.Job.status, func.count()).group_by(models.Job.status).all())
+
+    since = dashboard_stats.hour_of(datetime.datetime.utcnow()) - datetime.timedelta(
+        hours=dashboard_stats.THROUGHPUT_HOURS - 1
+    )
+    stat = models.PortStat
+    port_rows = (
+        db.query(
+            stat.port,
+            func.sum(stat.succeeded),
+            func.sum(stat.failed),
+            func.sum(stat.duration_seconds),
+            func.sum(case((stat.hour >= since, stat.succeeded + stat.failed), else_=0)),
+        )
+        .group_by(stat.port)
+        .order_by(stat.port)
+        .all()
     )
+    ports = [dashboard_stats.port_summary(*row) for row in port_rows]
+
     recent_jobs = (
         db.query(models.Job)
-        .order_by(models.Job.created_at.desc())
+        .order_by(models.Job.created_at.desc(), models.Job.id.desc())
         .limit(5)
         .all()
     )
+    # Index-only lookup on job_targets(job_id, status); target rows are never loaded.
+    target_counts = dict(
+        db.query(models.JobTarget.job_id, func.count())
+        .filter(models.JobTarget.job_id.in_([job.id for job in recent_jobs]))
+        .group_by(models.JobTarget.job_id)
+        .all()
+    ) if recent_jobs else {}
 
+    finished_recent = sum(port["finished_recent"] for port in ports)
     return {
-        "active_sessions": len(active_consoles),
         "template_count": template_count,
-        "configured_targets": configured_targets,
+        "configured_targets": sum(port["succeeded"] for port in ports),
+        "job_counts": job_counts,
+        "throughput": {
+            "hours": dashboard_stats.THROUGHPUT_HOURS,
+            "finished": finished_recent,
+            "per_hour": round(finished_recent / dashboard_stats.THROUGHPUT_HOURS, 2),
+        },
+        "ports": ports,
         "recent_jobs": [
             {
                 "id": job.id,
                 "template_id": job.template_id,
                 "status": job.status,
                 "created_at": job.created_at.isoformat(),
-                "target_count": len(job.targets),
+                "target_count": target_counts.get(job.id, 0),
             }
             for job in recent_jobs
         ],
     }
+
+
+@router.get("/summary")
+def read_dashboard_summary(db: Session = Depends(database.get_db)):
+    """
+    Dashboard figures, cached for a few seconds. configured_targets is the
+    number of successful target runs from the per-port counters; each target
+    runs once, so this equals the number of targets that succeeded.
+    """
+    summary = dashboard_stats.summary_cache.get(lambda: build_summary(db))
+    return {"active_sessions": len(active_consoles), **summary}
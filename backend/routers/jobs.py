@@ -1,51 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List
-import csv
-import io
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
+import asyncio
+import base64
+import datetime
+import os
 
-from .. import models, schemas, database
+from .. import models, schemas, database, scheduler, events, job_validation, inventory, dashboard_stats, job_export
+from ..log_writer import read_log_lines
 
 router = APIRouter(
     prefix="/jobs",
     tags=["jobs"],
 )
 
+# Upper bound on rows accepted by POST /jobs/bulk.
+MAX_BULK_TARGETS = int(os.getenv("MAX_BULK_TARGETS", "5000"))
+
 @router.get("/", response_model=List[schemas.Job])
 def list_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     return db.query(models.Job).order_by(models.Job.created_at.desc()).offset(skip).limit(limit).all()
 
-@router.post("/", response_model=schemas.Job)
-def create_job(job: schemas.JobCreate, db: Session = Depends(database.get_db)):
-    template = db.query(models.Template).filter(models.Template.id == job.template_id).first()
+def encode_cursor(job: models.Job) -> str:
+    return base64.urlsafe_b64encode(f"{job.created_at.isoformat()}|{job.id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(created_at), int(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/summary", response_model=schemas.JobPage)
+def list_job_summaries(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Newest jobs first, without targets: each job carries its target counts
+    per status instead. Pass the returned next_cursor to get the next page.
+    """
+    query = (
+        db.query(models.Job, models.Template.name)
+        .outerjoin(models.Template, models.Template.id == models.Job.template_id)
+        .options(load_only(models.Job.id, models.Job.template_id, models.Job.status, models.Job.created_at))
+    )
+    if cursor:
+        created_at, job_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                models.Job.created_at < created_at,
+                and_(models.Job.created_at == created_at, models.Job.id < job_id),
+            )
+        )
+    rows = query.order_by(models.Job.created_at.desc(), models.Job.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    counts = {}
+    if rows:
+        grouped = (
+            db.query(models.JobTarget.job_id, models.JobTarget.status, func.count())
+            .filter(models.JobTarget.job_id.in_([job.id for job, _ in rows]))
+            .group_by(models.JobTarget.job_id, models.JobTarget.status)
+            .all()
+        )
+        for job_id, status, count in grouped:
+            counts.setdefault(job_id, {})[status] = count
+
+    items = [
+        schemas.JobListItem(
+            id=job.id,
+            template_id=job.template_id,
+            template_name=template_name,
+            status=job.status,
+            created_at=job.created_at,
+            target_count=sum(counts.get(job.id, {}).values()),
+            status_counts=counts.get(job.id, {}),
+        )
+        for job, template_name in rows
+    ]
+    return schemas.JobPage(items=items, next_cursor=encode_cursor(rows[-1][0]) if has_more else None)
+
+def get_template(db: Session, template_id: int) -> models.Template:
+    template = db.query(models.Template).filter(models.Template.id == template_id).first()
     if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+@router.post("/render", response_model=schemas.JobRender)
+def render_job(job: schemas.JobCreate, db: Session = Depends(database.get_db)):
+    """Dry run: validate and render every step for every target without queueing."""
+    template = get_template(db, job.template_id)
+    return job_validation.render_job(template, job.targets, keep_output=True)
+
+@router.post("/", response_model=schemas.Job)
+def create_job(job: schemas.JobCreate, db: Session = Depends(database.get_db)):
+    template = get_template(db, job.template_id)
+
+    # Reject the whole job if any target would fail to render
+    check = job_validation.render_job(template, job.targets)
+    if not check["ok"]:
+        failed = [
+            {"index": t["index"], "port": t["port"], "errors": t["errors"]}
+            for t in check["targets"] if not t["ok"]
+        ]
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"{len(failed)} target(s) failed validation", "targets": failed},
+        )
 
     # Create the parent Job
-    db_job = models.Job(template_id=job.template_id, status="queued")
+    db_job = insert_job(db, job.template_id, [(t.port, t.variables) for t in job.targets])
+    
+    # Trigger Celery task
+    from ..worker import execute_job
+    execute_job.delay(db_job.id)
+
+    return db_job
+
+def insert_job(db: Session, template_id: int, targets: list) -> models.Job:
+    """Create a queued job and its (port, variables) targets in one transaction."""
+    db_job = models.Job(template_id=template_id, status="queued")
     db.add(db_job)
+    db.flush()
+    if targets:
+        now = datetime.datetime.utcnow()
+        db.execute(
+            insert(models.JobTarget),
+            [
+                {
+                    "job_id": db_job.id,
+                    "port": port,
+                    "variables": variables,
+                    "status": "queued",
+                    "verification_results": [],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for port, variables in targets
+            ],
+        )
     db.commit()
+    dashboard_stats.invalidate()
     db.refresh(db_job)
+    return db_job
+
+@router.post("/bulk", response_model=schemas.BulkJobResult)
+async def create_bulk_job(
+    request: Request,
+    template_id: int,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    partial: bool = False,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Create a job from a CSV or NDJSON inventory streamed as the request body.
+
+    Rows are validated like POST /jobs/. By default any invalid row rejects
+    the whole inventory (422 with per-row errors); with partial=true the job
+    is created from the valid rows and the invalid ones are reported.
+    """
+    template = await asyncio.to_thread(get_template, db, template_id)
+    fmt = format or inventory.detect_format(request.headers.get("content-type"))
+    try:
+        rows = await inventory.parse_inventory(request.stream(), fmt, max_rows=MAX_BULK_TARGETS)
+    except inventory.InventoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Create JobTargets
-    for target in job.targets:
-        db_target = models.JobTarget(
-            job_id=db_job.id,
-            port=target.port,
-            variables=target.variables, # JSON storage
-            status="queued"
+    # Rows that did not parse are reported as they are; the rest are rendered.
+    parsed = [row for row in rows if not row.errors]
+    check = await asyncio.to_thread(job_validation.render_job, template, parsed)
+    render_errors = {row.row: result["errors"] for row, result in zip(parsed, check["targets"])}
+    errors = []
+    valid = []
+    for row in rows:
+        row_errors = row.errors or render_errors[row.row]
+        if row_errors:
+            errors.append({"row": row.row, "port": row.port, "errors": row_errors})
+        else:
+            valid.append((row.port, row.variables))
+
+    if errors and not partial:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"{len(errors)} of {len(rows)} row(s) failed validation", "rows": errors},
         )
-        db.add(db_target)
-    
-    db.commit()
-    db.refresh(db_job)
-    
-    # Trigger Celery task
+    if not valid:
+        raise HTTPException(status_code=422, detail={"message": "No valid rows in inventory", "rows": errors})
+
+    db_job = await asyncio.to_thread(insert_job, db, template_id, valid)
+
     from ..worker import execute_job
     execute_job.delay(db_job.id)
 
-    return db_job
+    return {"job_id": db_job.id, "rows": len(rows), "targets_created": len(valid), "errors": errors}
+
+@router.get("/queue", response_model=List[schemas.PortQueue])
+def read_port_queues(db: Session = Depends(database.get_db)):
+    """Per-port queue depth, running target and estimated wait."""
+    return scheduler.port_queue_status(db)
 
 @router.get("/{job_id}", response_model=schemas.Job)
 def read_job(job_id: int, db: Session = Depends(database.get_db)):
@@ -54,46 +211,120 @@ def read_job(job_id: int, db: Session = Depends(database.get_db)):
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
+def get_job_target(db: Session, job_id: int, target_id: int) -> models.JobTarget:
+    target = (
+        db.query(models.JobTarget)
+        .filter(models.JobTarget.id == target_id, models.JobTarget.job_id == job_id)
+        .first()
+    )
+    if target is None:
+        raise HTTPException(status_code=404, detail="Target not found")
+    return target
+
+@router.get("/{job_id}/targets/{target_id}", response_model=schemas.JobTarget)
+def read_job_target(job_id: int, target_id: int, db: Session = Depends(database.get_db)):
+    target = get_job_target(db, job_id, target_id)
+    result = schemas.JobTarget.model_validate(target, from_attributes=True)
+    result.log = "\n".join(read_log_lines(db, target.id))
+    return result
+
+@router.get("/{job_id}/targets/{target_id}/log", response_model=schemas.TargetLog)
+def read_job_target_log(
+    job_id: int,
+    target_id: int,
+    after: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(database.get_db),
+):
+    """Log lines from line offset `after`; poll again with `next_offset`."""
+    target = get_job_target(db, job_id, target_id)
+    lines = read_log_lines(db, target.id, after=after, limit=limit)
+    return {
+        "target_id": target.id,
+        "status": target.status,
+        "after": after,
+        "next_offset": after + len(lines),
+        "lines": lines,
+    }
+
+def job_snapshot(job_id: int):
+    """Current job state for a new events viewer; its only database read."""
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.Job).filter(models.Job.id == job_id).first()
+        if job is None:
+            return None
+        return schemas.Job.model_validate(job, from_attributes=True).model_dump(mode="json")
+    finally:
+        db.close()
+
+@router.websocket("/{job_id}/events")
+async def job_events(websocket: WebSocket, job_id: int):
+    """
+    Live job events: a "snapshot" message with the job, then job_status,
+    target_status, step and log events as the worker publishes them.
+    """
+    await websocket.accept()
+    # Be subscribed before reading the snapshot so no event falls in between.
+    queue = events.hub.subscribe(job_id)
+    try:
+        await events.hub.wait_subscribed(job_id)
+        snapshot = await asyncio.to_thread(job_snapshot, job_id)
+        if snapshot is None:
+            await websocket.close(code=1008, reason="Job not found")
+            return
+        await websocket.send_json({"type": "snapshot", "job_id": job_id, "job": snapshot})
+
+        async def forward_events():
+            while True:
+                await websocket.send_text(await queue.get())
+
+        async def wait_for_disconnect():
+            while True:
+                await websocket.receive_text()
+
+        tasks = [asyncio.create_task(forward_events()), asyncio.create_task(wait_for_disconnect())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        events.hub.unsubscribe(job_id, queue)
+
 @router.get("/{job_id}/export")
-def export_job(job_id: int, db: Session = Depends(database.get_db)):
+def export_job(
+    job_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    checks: bool = False,
+    db: Session = Depends(database.get_db),
+):
+    """
+    Stream the job's targets as CSV or NDJSON. With checks=true there is one
+    row per verification check instead of one per target.
+    """
     job = db.query(models.Job).filter(models.Job.id == job_id).first()
     if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Headers
-    headers = ["target_id", "port", "status", "log_summary", "created_at"]
-    # Dynamic Headers from variables of first target if available
-    first_target = job.targets[0] if job.targets else None
-    var_keys = []
-    if first_target and first_target.variables:
-        var_keys = sorted(list(first_target.variables.keys()))
-        headers.extend(var_keys)
-    
-    writer.writerow(headers)
-    
-    for target in job.targets:
-        row = [
-            target.id,
-            target.port,
-            target.status,
-            (target.log or "")[:100].replace("\n", " ") + "...", # simple summary
-            target.created_at
-        ]
-        # Variables
-        if target.variables:
-            for key in var_keys:
-                row.append(target.variables.get(key, ""))
-        else:
-            row.extend([""] * len(var_keys))
-        
-        writer.writerow(row)
-    
-    output.seek(0)
+    var_keys = job_export.variable_keys(db, job_id) if format == "csv" else []
+
+    def stream():
+        # The request's session may be closed before streaming finishes.
+        export_db = database.SessionLocal()
+        try:
+            records = job_export.iter_records(export_db, job_id, checks=checks)
+            if format == "csv":
+                yield from job_export.iter_csv(records, var_keys, checks=checks)
+            else:
+                yield from job_export.iter_ndjson(records)
+        finally:
+            export_db.close()
+
+    suffix = "_checks" if checks else ""
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=job_{job_id}_export.csv"}
+        stream(),
+        media_type=job_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=job_{job_id}_export{suffix}.{format}"}
     )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+
+from .. import blob_store, database
+
+router = APIRouter(
+    prefix="/outputs",
+    tags=["outputs"],
+)
+
+
+@router.get("/{output_hash}", response_class=PlainTextResponse)
+def read_output(
+    output_hash: str = Path(..., pattern="^[0-9a-f]{64}$"),
+    db: Session = Depends(database.get_db),
+):
+    """Captured command output referenced by a verification result's output_hash."""
+    text = blob_store.get(db, output_hash)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Output not found")
+    # Content-addressed: the text behind a hash never changes.
+    return PlainTextResponse(
+        text,
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{output_hash}"'},
+    )
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from ..database import get_db
 from .. import models, schemas
+from ..settings_cache import settings as settings_cache
 
 router = APIRouter(
     prefix="/settings",
@@ -10,8 +11,8 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[schemas.Setting])
-def get_settings(db: Session = Depends(get_db)):
-    return db.query(models.Setting).all()
+def get_settings():
+    return list(settings_cache.rows().values())
 
 @router.post("/port_baud_rates")
 def update_port_baud_rates(baud_rates: Dict[str, int], db: Session = Depends(get_db)):
@@ -27,12 +28,13 @@ def update_port_baud_rates(baud_rates: Dict[str, int], db: Session = Depends(get
         setting.value = baud_rates
     
     db.commit()
+    settings_cache.invalidate()
     db.refresh(setting)
     return setting
 
 @router.get("/key/{key}", response_model=schemas.Setting)
-def get_setting_by_key(key: str, db: Session = Depends(get_db)):
-    setting = db.query(models.Setting).filter(models.Setting.key == key).first()
+def get_setting_by_key(key: str):
+    setting = settings_cache.rows().get(key)
     if not setting:
         raise HTTPException(status_code=404, detail="Setting not found")
     return setting
@@ -0,0 +1,309 @@
+"""
+Port-aware scheduling of job targets.
+
+Every JobTarget is one work item. Items queue per serial device and a device
+runs one item at a time; as soon as it finishes, the next item of that
+device's queue is dispatched. Within a queue jobs take turns, so a large job
+cannot hold a port for all of its targets while a later job waits.
+
+The queue state is the job_targets table itself (status "queued" / "running"),
+so the API process and every worker process see the same queues. A "running"
+row whose worker died is failed by the next dispatch (recover_stale_targets),
+so a crash never blocks its port or a slot for good.
+"""
+import datetime
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models, events, dashboard_stats
+from serial_lib.port_lock import exclusive, is_port_busy
+
+# Number of finished targets per port used to estimate run time.
+DURATION_HISTORY = 20
+
+# A running target whose port nobody holds is given up after this many
+# seconds. The grace period covers the gap between a dispatch claiming the
+# target and its worker taking the port lease.
+STALE_TARGET_SECONDS = float(os.getenv("STALE_TARGET_SECONDS", "120"))
+STALE_FAILURE_CATEGORY = "worker_lost"
+STALE_REMEDIATION = (
+    "The worker running this target stopped before it finished (crash, restart or lost task). "
+    "Check the device state and re-run the target."
+)
+
+
+def port_key(port: str) -> str:
+    """Identify the physical device behind a port string (~/portN symlinks resolve)."""
+    return os.path.realpath(os.path.expanduser(port or ""))
+
+
+def order_port_queue(queued: list, served: Dict[int, int]) -> list:
+    """
+    Fair FIFO order for the queued targets of one port.
+
+    A target's rank is the number of targets its job already had on this port
+    (`served`, by job id) plus its position among the job's queued targets.
+    Lower ranks go first and ties go to the older job, which makes jobs
+    alternate on a shared port while keeping each job's own order.
+    """
+    position = defaultdict(int)
+    ranked = []
+    for target in sorted(queued, key=lambda t: t.id):
+        rank = served.get(target.job_id, 0) + position[target.job_id]
+        position[target.job_id] += 1
+        ranked.append((rank, target.job_id, target.id, target))
+    ranked.sort(key=lambda item: item[:3])
+    return [item[3] for item in ranked]
+
+
+def served_counts(db: Session, job_ids) -> Dict[str, Dict[int, int]]:
+    """Targets per device and job that already left the queue, for `job_ids`."""
+    from sqlalchemy import func
+
+    served = defaultdict(lambda: defaultdict(int))
+    rows = (
+        db.query(models.JobTarget.port, models.JobTarget.job_id, func.count())
+        .filter(models.JobTarget.job_id.in_(job_ids), models.JobTarget.status != "queued")
+        .group_by(models.JobTarget.port, models.JobTarget.job_id)
+        .all()
+    )
+    for port, job_id, count in rows:
+        served[port_key(port)][job_id] += count
+    return served
+
+
+def build_queues(db: Session) -> Dict[str, list]:
+    """
+    Queued targets per device, each list in dispatch order.
+
+    Only (id, job_id, port) is read per target; the rows are not ORM objects.
+    """
+    queued = (
+        db.query(models.JobTarget.id, models.JobTarget.job_id, models.JobTarget.port)
+        .filter(models.JobTarget.status == "queued")
+        .order_by(models.JobTarget.id)
+        .all()
+    )
+    if not queued:
+        return {}
+
+    served = served_counts(db, {t.job_id for t in queued})
+    by_port = defaultdict(list)
+    for target in queued:
+        by_port[port_key(target.port)].append(target)
+    return {port: order_port_queue(items, served[port]) for port, items in by_port.items()}
+
+
+def queue_heads(db: Session) -> Dict[str, tuple]:
+    """
+    The first target of every device's queue as (id, port), without reading
+    the whole queue.
+
+    A job's oldest queued target on a device is its only candidate for the
+    head, so one row per (port, job) is enough to apply order_port_queue's
+    rule: lowest served count, then the older job.
+    """
+    from sqlalchemy import func
+
+    heads = (
+        db.query(models.JobTarget.port, models.JobTarget.job_id, func.min(models.JobTarget.id))
+        .filter(models.JobTarget.status == "queued")
+        .group_by(models.JobTarget.port, models.JobTarget.job_id)
+        .all()
+    )
+    if not heads:
+        return {}
+
+    # Several port strings can name one device; keep each job's oldest target.
+    first = {}
+    for port, job_id, target_id in heads:
+        key = (port_key(port), job_id)
+        if key not in first or target_id < first[key][0]:
+            first[key] = (target_id, port)
+
+    served = served_counts(db, {job_id for _, job_id in first})
+    best = {}
+    for (device, job_id), (target_id, port) in first.items():
+        rank = (served[device].get(job_id, 0), job_id, target_id)
+        if device not in best or rank < best[device][0]:
+            best[device] = (rank, (target_id, port))
+    return {device: head for device, (_, head) in best.items()}
+
+
+def recover_stale_targets(db: Session, running: list, now: datetime.datetime,
+                          grace: float = STALE_TARGET_SECONDS) -> list:
+    """
+    Fail the running targets that no worker is working on any more.
+
+    A worker holds its target's port lease (with a heartbeat) for the whole
+    run and the kernel drops the lease when the worker dies, so a target
+    claimed more than `grace` seconds ago whose port is free has lost its
+    worker. Such targets are failed rather than requeued: the device may be
+    half configured, and a late copy of the lost task must not run it twice
+    (execute_target skips targets that are no longer running). Returns the
+    failed targets; caller commits.
+    """
+    cutoff = now - datetime.timedelta(seconds=grace)
+    stale = [
+        t for t in running
+        if (t.started_at is None or t.started_at < cutoff) and not is_port_busy(t.port)
+    ]
+    for target in stale:
+        target.status = "failed"
+        target.finished_at = now
+        target.failure_category = STALE_FAILURE_CATEGORY
+        target.remediation = STALE_REMEDIATION
+        dashboard_stats.record_target_result(db, target)
+    return stale
+
+
+def claim_next_targets(db: Session, max_active: int) -> List[int]:
+    """
+    Mark the head of every idle port's queue as running and return the ids.
+
+    Runs under a cross-process lock so two dispatchers never start two
+    targets on one port. Ports held by a console session are skipped; they
+    are picked up again by the dispatch that follows the console closing.
+    At most `max_active` targets run at once across all ports. Running
+    targets that lost their worker are failed first, freeing their ports.
+    """
+    claimed = []
+    with exclusive("scheduler"):
+        now = datetime.datetime.utcnow()
+        running = db.query(models.JobTarget).filter(models.JobTarget.status == "running").all()
+        stale = recover_stale_targets(db, running, now)
+        running = [t for t in running if t not in stale]
+        busy = {port_key(t.port) for t in running}
+        free_slots = max_active - len(running)
+
+        if free_slots > 0:
+            heads = sorted(head for port, head in queue_heads(db).items() if port not in busy)
+            for target_id, port in heads:
+                if len(claimed) >= free_slots:
+                    break
+                if is_port_busy(port):
+                    continue
+                claimed.append(target_id)
+        if claimed:
+            (
+                db.query(models.JobTarget)
+                .filter(models.JobTarget.id.in_(claimed))
+                .update({"status": "running", "started_at": now}, synchronize_session=False)
+            )
+        db.commit()
+
+    for target in stale:
+        events.publish(
+            target.job_id, "target_status", target_id=target.id, status=target.status,
+            failure_category=target.failure_category, remediation=target.remediation,
+        )
+    for job_id in sorted({t.job_id for t in stale}):
+        finalize_job(db, job_id)
+    return claimed
+
+
+def finalize_job(db: Session, job_id: int) -> Optional[str]:
+    """Set the job's final status once none of its targets is queued or running."""
+    pending = (
+        db.query(models.JobTarget)
+        .filter(models.JobTarget.job_id == job_id, models.JobTarget.status.in_(["queued", "running"]))
+        .count()
+    )
+    if pending:
+        return None
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        return None
+    failed = any(t.status == "failed" for t in job.targets)
+    job.status = "failed" if failed else "completed"
+    db.commit()
+    dashboard_stats.invalidate()
+    events.publish(job.id, "job_status", status=job.status)
+    return job.status
+
+
+def average_durations(finished: list, history: int = DURATION_HISTORY) -> Dict[str, float]:
+    """
+    Mean run time in seconds of the last `history` targets per device.
+
+    `finished` holds targets with started_at/finished_at, newest first. The
+    overall mean is stored under "" as fallback for ports without history.
+    """
+    per_port = defaultdict(list)
+    overall = []
+    for target in finished:
+        seconds = (target.finished_at - target.started_at).total_seconds()
+        samples = per_port[port_key(target.port)]
+        if len(samples) < history:
+            samples.append(seconds)
+        if len(overall) < history:
+            overall.append(seconds)
+    averages = {port: sum(s) / len(s) for port, s in per_port.items()}
+    if overall:
+        averages[""] = sum(overall) / len(overall)
+    return averages
+
+
+def estimate_waits(depth: int, average: Optional[float], running_for: Optional[float]) -> List[Optional[float]]:
+    """
+    Seconds until each of `depth` queued items (and a newly queued one) starts.
+
+    The running item is assumed to need `average` in total; returns Nones when
+    there is no history to estimate from.
+    """
+    if average is None:
+        return [None] * (depth + 1)
+    remaining = max(0.0, average - running_for) if running_for is not None else 0.0
+    return [round(remaining + i * average, 1) for i in range(depth + 1)]
+
+
+def port_queue_status(db: Session) -> list:
+    """Queue depth, current item and estimated wait for every port with work."""
+    queues = build_queues(db)
+    running = {
+        port_key(t.port): t
+        for t in (
+            db.query(models.JobTarget.id, models.JobTarget.job_id, models.JobTarget.port, models.JobTarget.started_at)
+            .filter(models.JobTarget.status == "running")
+            .all()
+        )
+    }
+    finished = (
+        db.query(models.JobTarget.port, models.JobTarget.started_at, models.JobTarget.finished_at)
+        .filter(models.JobTarget.started_at.isnot(None), models.JobTarget.finished_at.isnot(None))
+        .order_by(models.JobTarget.finished_at.desc())
+        .limit(DURATION_HISTORY * 16)
+        .all()
+    )
+    averages = average_durations(finished)
+    now = datetime.datetime.utcnow()
+
+    result = []
+    for device in sorted(set(queues) | set(running)):
+        queue = queues.get(device, [])
+        current = running.get(device)
+        average = averages.get(device, averages.get(""))
+        running_for = None
+        if current is not None and current.started_at is not None:
+            running_for = (now - current.started_at).total_seconds()
+        waits = estimate_waits(len(queue), average, running_for)
+        result.append({
+            "port": (current or queue[0]).port,
+            "device": device,
+            "depth": len(queue),
+            "running": {
+                "target_id": current.id,
+                "job_id": current.job_id,
+                "started_at": current.started_at,
+            } if current is not None else None,
+            "average_duration_seconds": round(average, 1) if average is not None else None,
+            "estimated_wait_seconds": waits[-1],
+            "queue": [
+                {"target_id": t.id, "job_id": t.job_id, "estimated_start_seconds": wait}
+                for t, wait in zip(queue, waits)
+            ],
+        })
+    return result
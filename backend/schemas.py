@@ -35,36 +35,110 @@ class JobTargetBase(BaseModel):
 class JobTargetCreate(JobTargetBase):
     pass
 
-class JobTarget(JobTargetBase):
+class JobTargetSummary(JobTargetBase):
+    """Job target without its log, for listings; see TargetLog for the log."""
     id: int
     job_id: int
     status: str
-    log: Optional[str] = ""
     verification_results: Optional[List[Dict[str, Any]]] = []
     failure_category: Optional[str] = None
     remediation: Optional[str] = None
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
     class Config:
         from_attributes = True
 
+class JobTarget(JobTargetSummary):
+    log: Optional[str] = ""
+
+class TargetLog(BaseModel):
+    target_id: int
+    status: str
+    after: int
+    next_offset: int
+    lines: List[str]
+
 class JobCreate(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     template_id: int
     targets: List[JobTargetCreate]
 
+class RenderedStep(BaseModel):
+    step: int
+    type: str
+    field: str
+    text: str
+
+class TargetRender(BaseModel):
+    index: int
+    port: str
+    ok: bool
+    errors: List[str] = []
+    rendered: Optional[List[RenderedStep]] = None
+
+class JobRender(BaseModel):
+    template_id: int
+    ok: bool
+    targets: List[TargetRender]
+
+class BulkRowError(BaseModel):
+    row: int
+    port: Optional[str] = None
+    errors: List[str]
+
+class BulkJobResult(BaseModel):
+    job_id: int
+    rows: int
+    targets_created: int
+    errors: List[BulkRowError] = []
+
 class Job(BaseModel):
     id: int
     template_id: int
     status: str
     created_at: datetime.datetime
-    targets: List[JobTarget] = []
+    targets: List[JobTargetSummary] = []
 
     class Config:
         from_attributes = True
 
+class JobListItem(BaseModel):
+    """Job without its targets, with target counts per status."""
+    id: int
+    template_id: int
+    template_name: Optional[str] = None
+    status: str
+    created_at: datetime.datetime
+    target_count: int = 0
+    status_counts: Dict[str, int] = {}
+
+class JobPage(BaseModel):
+    items: List[JobListItem]
+    next_cursor: Optional[str] = None
+
+class PortQueueEntry(BaseModel):
+    target_id: int
+    job_id: int
+    estimated_start_seconds: Optional[float] = None
+
+class PortQueueRunning(BaseModel):
+    target_id: int
+    job_id: int
+    started_at: Optional[datetime.datetime] = None
+
+class PortQueue(BaseModel):
+    port: str
+    device: str
+    depth: int
+    running: Optional[PortQueueRunning] = None
+    average_duration_seconds: Optional[float] = None
+    estimated_wait_seconds: Optional[float] = None
+    queue: List[PortQueueEntry] = []
+
 # Setting Schemas
 class SettingBase(BaseModel):
     key: str
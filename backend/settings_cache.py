@@ -0,0 +1,104 @@
+"""
+Process-wide cache of the settings table.
+
+All settings are loaded with one query and served from memory until they
+change. Writers call invalidate() after committing; it bumps a version file
+shared by the API and worker processes, and every reader compares that
+file's identity (a single stat call) before using its copy. No reader hits
+the database while settings are unchanged.
+
+Per-port settings live under "port_settings" as {"<port id>": {name: value}},
+next to the older "port_baud_rates" {"<port id>": baud} map.
+"""
+import os
+import re
+import threading
+import types
+from typing import Any, Callable, Optional, Tuple
+
+from . import models
+from .version_file import VersionFile
+from serial_lib.port_lock import LOCK_DIR
+
+SETTINGS_VERSION_FILE = os.getenv("SETTINGS_VERSION_FILE", os.path.join(LOCK_DIR, "settings.version"))
+
+DEFAULT_BAUD = 9600
+
+
+def port_id_of(port) -> Optional[str]:
+    """"~/port3" -> "3"; plain ids pass through."""
+    match = re.search(r"port(\d+)", str(port))
+    if match:
+        return match.group(1)
+    return str(port) if str(port).isdigit() else None
+
+
+class SettingsCache:
+    def __init__(self, session_factory: Callable, version_file: str = SETTINGS_VERSION_FILE):
+        self.session_factory = session_factory
+        self.version_file = VersionFile(version_file)
+        self.loads = 0
+        self._rows: Optional[dict] = None
+        self._values: Optional[dict] = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        db = self.session_factory()
+        try:
+            return {
+                s.key: types.SimpleNamespace(id=s.id, key=s.key, value=s.value, updated_at=s.updated_at)
+                for s in db.query(models.Setting).order_by(models.Setting.id).all()
+            }
+        finally:
+            db.close()
+
+    def _current(self) -> Tuple[dict, dict]:
+        version = self.version_file.current()
+        with self._lock:
+            if self._rows is None or version != self._version:
+                self._rows = self._load()
+                self._values = {key: row.value for key, row in self._rows.items()}
+                self._version = version
+                self.loads += 1
+            return self._rows, self._values
+
+    def rows(self) -> dict:
+        """All settings as {key: row} with id, key, value and updated_at. Treat as read-only."""
+        return self._current()[0]
+
+    def values(self) -> dict:
+        """All settings as {key: value}. Treat the result as read-only."""
+        return self._current()[1]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values().get(key, default)
+
+    def invalidate(self):
+        """Mark settings changed for every process; call after committing a write."""
+        self.version_file.bump()
+        with self._lock:
+            self._rows = None
+            self._values = None
+
+    def port_baud(self, port, default: int = DEFAULT_BAUD) -> int:
+        port_id = port_id_of(port)
+        baud = self.port_setting(port, "baud")
+        if baud is None and port_id is not None:
+            baud = (self.get("port_baud_rates") or {}).get(port_id)
+        return int(baud) if baud else default
+
+    def port_setting(self, port, name: str, default: Any = None) -> Any:
+        """A per-port setting such as "device_profile" or "command_timeout"."""
+        port_id = port_id_of(port)
+        if port_id is None:
+            return default
+        return ((self.get("port_settings") or {}).get(port_id) or {}).get(name, default)
+
+
+def _session_factory():
+    from .database import SessionLocal
+    return SessionLocal()
+
+
+settings = SettingsCache(_session_factory)
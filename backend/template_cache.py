@@ -0,0 +1,69 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from jinja2 import Environment, StrictUndefined, Template
+
+# Compiled templates kept per worker process (least recently used are dropped).
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "2048"))
+
+# One environment for all renders; compiled templates are safe to render
+# from several threads at once.
+env = Environment(undefined=StrictUndefined)
+
+
+class CompiledTemplateCache:
+    """
+    Compiled Jinja templates keyed by (scope, content hash).
+
+    The scope is the owning template's id, so an edited template (new hash)
+    never reuses stale code and one template's strings are easy to tell apart
+    from another's. Every step and check string of a template is compiled
+    once per worker process; each target only renders.
+    """
+
+    def __init__(self, environment: Environment = env, max_size: int = TEMPLATE_CACHE_SIZE):
+        self.environment = environment
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._templates: "OrderedDict[tuple, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._templates)
+
+    def get(self, source: str, scope: Optional[Hashable] = None) -> Template:
+        key = (scope, hashlib.sha1(source.encode()).hexdigest())
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return template
+        # Compile outside the lock; a concurrent compile of the same key is harmless.
+        template = self.environment.from_string(source)
+        with self._lock:
+            self.misses += 1
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+    def render(self, source: str, variables: dict, scope: Optional[Hashable] = None) -> str:
+        return self.get(source, scope).render(**variables)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+templates = CompiledTemplateCache()
+
+
+def render(source: str, variables: dict, scope: Optional[Hashable] = None) -> str:
+    """Render a template string with the shared cache."""
+    return templates.render(source, variables, scope)
@@ -0,0 +1,35 @@
+"""
+A counter file that tells processes some shared state changed.
+
+Readers compare the file's identity (one stat call) with the one they saw
+last; writers bump it with write-then-rename, which always gives the file a
+new identity. The API and worker processes use it to drop cached copies of
+database state without asking the database whether anything changed.
+"""
+import os
+import threading
+
+
+class VersionFile:
+    def __init__(self, path: str):
+        self.path = path
+
+    def current(self):
+        """Opaque version; None while the file does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def bump(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            with open(self.path) as f:
+                counter = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            counter = 0
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w") as f:
+            f.write(str(counter + 1))
+        os.replace(tmp_path, self.path)
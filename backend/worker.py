@@ -1,11 +1,12 @@
 import os
 import time
 import re
+import datetime
 from celery import Celery
+from celery.signals import worker_ready
 from sqlalchemy.orm import Session
-from jinja2 import Environment, StrictUndefined
 
-from .database import SessionLocal
+from .database import SessionLocal, write_session
 from . import models
 
 # Assuming serial_lib is in PYTHONPATH or sibling directory
@@ -15,15 +16,32 @@ from serial_lib.serial_session import SerialSession
 from serial_lib.command_runner import CommandRunner
 from serial_lib.verifier import Verifier
 from serial_lib.prompt_detector import PromptDetector
+from serial_lib.config_diff import plan_config_push
+from serial_lib.port_lock import PortLease, is_port_busy
+from . import scheduler, events
+from .log_writer import LogFlusher, TargetLogWriter, clear_log
+from . import template_cache, settings_cache, dashboard_stats, blob_store, check_engine
 
 # Redis URL - make configurable
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
 celery_app = Celery("worker", broker=REDIS_URL, backend=REDIS_URL)
 
+# Maximum number of targets running at once across all ports and jobs.
+# Keep the worker's --concurrency above this so dispatches find a free slot.
+MAX_PARALLEL_TARGETS = int(os.getenv("MAX_PARALLEL_TARGETS", "8"))
+
+# How long a target queues behind another holder of its port (console or
+# job) before failing with PORT_BUSY.
+PORT_LEASE_WAIT = float(os.getenv("PORT_LEASE_WAIT", "5"))
+
 def get_db_session():
     return SessionLocal()
 
+# All targets running in this worker process share one log flusher, so their
+# lines reach SQLite in one short write transaction per interval.
+log_flusher = LogFlusher(write_session)
+
 # Failure Categories
 class FailureCategory:
     PORT_BUSY = "port_busy"
@@ -35,6 +53,7 @@ class FailureCategory:
     VERIFICATION_FAILED = "verification_failed"
     FILE_NOT_FOUND = "file_not_found"
     TEMPLATE_ERROR = "template_error"
+    WORKER_LOST = scheduler.STALE_FAILURE_CATEGORY
     UNKNOWN = "unknown"
 
 def categorize_failure(error_msg: str, log: str) -> str:
@@ -42,6 +61,8 @@ def categorize_failure(error_msg: str, log: str) -> str:
     error_lower = error_msg.lower()
     log_lower = log.lower()
     
+    if "port busy" in error_lower:
+        return FailureCategory.PORT_BUSY
     if "does not exist" in error_lower or "filenotfound" in error_lower:
         return FailureCategory.FILE_NOT_FOUND
     if "permission denied" in error_lower:
@@ -71,6 +92,7 @@ def suggest_remediation(category: str) -> str:
         FailureCategory.TEMPLATE_ERROR: "Ensure all template variables are provided in the job submission.",
         FailureCategory.VERIFICATION_FAILED: "Review the verification checks and ensure expected values match actual configuration.",
         FailureCategory.PORT_BUSY: "Another job may be using this port. Wait and retry.",
+        FailureCategory.WORKER_LOST: scheduler.STALE_REMEDIATION,
         FailureCategory.UNKNOWN: "Review the error log for details. Contact support if issue persists."
     }
     return suggestions.get(category, suggestions[FailureCategory.UNKNOWN])
@@ -90,7 +112,27 @@ def normalize_template_steps(template) -> list:
             steps.append({"type": "command", "content": command, "wait_prompt": True})
     return steps
 
-def run_verification_checks(runner: CommandRunner, checks: list, variables: dict, log_func=None, output_cache=None, include_full_output=True) -> list:
+def group_pipelined_steps(steps: list) -> list:
+    """
+    Collapse runs of consecutive send/command steps flagged with "pipeline": true
+    into a single {"type": "pipeline_block", "steps": [...]} step.
+    """
+    grouped = []
+    for step in steps:
+        is_pipelined = step.get("type", "send") in ["send", "command"] and step.get("pipeline")
+        if is_pipelined and grouped and grouped[-1].get("type") == "pipeline_block":
+            grouped[-1]["steps"].append(step)
+        elif is_pipelined:
+            grouped.append({
+                "type": "pipeline_block",
+                "steps": [step],
+                "window": step.get("pipeline_window", 8),
+            })
+        else:
+            grouped.append(step)
+    return grouped
+
+def run_verification_checks(runner: CommandRunner, checks: list, variables: dict, log_func=None, output_cache=None, include_full_output=True, template_scope=None) -> list:
     """
     Run verification checks and return results.
     Each check format: {name, command, type, pattern, evidence_lines}
@@ -105,38 +147,51 @@ def run_verification_checks(runner: CommandRunner, checks: list, variables: dict
         if log_func:
             log_func(msg)
 
-    env = Environment(undefined=StrictUndefined)
-    
-    # Pre-calculate last indices for commands if we are including full output
+    # Render every check once: (command, pattern, render error)
+    rendered = []
+    for check in checks:
+        command_raw = check.get("command", "show run")
+        try:
+            command = template_cache.render(command_raw, variables, template_scope)
+        except Exception as e:
+            rendered.append((command_raw, "", e))
+            continue
+        try:
+            pattern = template_cache.render(check.get("pattern", ""), variables, template_scope)
+        except Exception as e:
+            rendered.append((command, "", e))
+            continue
+        rendered.append((command, pattern, None))
+
+    # Last check index per command, which gets the full output attached
     last_indices = {}
     if include_full_output:
-        for idx, check in enumerate(checks):
-            cmd_raw = check.get("command", "show run")
-            try:
-                cmd = env.from_string(cmd_raw).render(**variables)
-            except Exception:
-                cmd = cmd_raw
-            last_indices[cmd] = idx
+        for idx, (command, _, _) in enumerate(rendered):
+            last_indices[command] = idx
+
+    # `contains` literals per command, located together once its output is in
+    literals = {}
+    for check, (command, pattern, render_error) in zip(checks, rendered):
+        if render_error is None and check.get("type", "regex_match") == "contains":
+            literals.setdefault(command, []).append(pattern)
+
+    # One shared view per command output (the outputs come from output_cache)
+    views = {}
 
     for idx, check in enumerate(checks):
         check_name = check.get("name", "Unnamed Check")
-        command_raw = check.get("command", "show run")
         check_type = check.get("type", "regex_match")
-        pattern_raw = check.get("pattern", "")
         evidence_lines = check.get("evidence_lines", 3)
+        command, pattern, render_error = rendered[idx]
         
-        # Render command and pattern with variables (Jinja2)
-        try:
-            command = env.from_string(command_raw).render(**variables)
-            pattern = env.from_string(pattern_raw).render(**variables)
-        except Exception as e:
-            log_msg(f"Error rendering verification check '{check_name}': {str(e)}")
+        if render_error is not None:
+            log_msg(f"Error rendering verification check '{check_name}': {str(render_error)}")
             results.append({
                 "check_name": check_name,
                 "status": "error",
                 "evidence": "",
                 "full_output": "",
-                "message": f"Verification render error: {str(e)}"
+                "message": f"Verification render error: {str(render_error)}"
             })
             continue
         
@@ -153,128 +208,20 @@ def run_verification_checks(runner: CommandRunner, checks: list, variables: dict
             else:
                 output = runner.run_show(command)
                 output_cache[command] = output
-            
-            # Run check based on type
+
+            view = views.get(command)
+            if view is None or view.text is not output:
+                view = views[command] = check_engine.OutputView(output)
+                view.locate(literals.get(command, []))
+
+            outcome = check_engine.evaluate(view, check_type, pattern, evidence_lines)
             res = {
                 "check_name": check_name,
-                "status": "pending",
-                "evidence": "",
+                "status": outcome["status"],
+                "evidence": outcome["evidence"],
                 "full_output": output if should_attach else "",
-                "message": ""
+                "message": outcome["message"]
             }
-
-            if check_type == "regex_match":
-                # Use re.DOTALL (re.S) to allow . to match newlines for multi-line verification
-                flags = re.MULTILINE | re.DOTALL if "\n" in pattern else re.MULTILINE
-                match = re.search(pattern, output, flags)
-                if match:
-                    # Extract evidence
-                    lines = output.splitlines()
-                    match_line_idx = output[:match.start()].count("\n")
-                    start_idx = max(0, match_line_idx - evidence_lines)
-                    end_idx = min(len(lines), match_line_idx + evidence_lines + 1)
-                    evidence = "\n".join(lines[start_idx:end_idx])
-                    
-                    res.update({
-                        "status": "pass",
-                        "evidence": evidence,
-                        "message": f"Pattern matched: {pattern}"
-                    })
-                else:
-                    # Fallback: Fuzzy Whitespace Match
-                    # This handles cases like "13   MGMT" vs "13 MGMT" (table spacing)
-                    # or " description" vs "description" (indentation).
-                    try:
-                        norm_pattern = " ".join(pattern.split())
-                        norm_output = " ".join(output.split())
-                        
-                        # Use IGNORECASE for the fuzzy match to be extra forgiving and helpful
-                        if re.search(norm_pattern, norm_output, re.IGNORECASE):
-                            # Try to find the actual match in the original output to provide evidence
-                            # We escape the pattern and replace escaped spaces with \s+ 
-                            # (not perfect for complex regex, but good for simple literal patterns)
-                            try:
-                                # Simple approach: split by whitespace and rejoin with \s+
-                                # Use re.escape on each word if we suspect the user gave literal text
-                                # If it's a regex, we still try the \s+ join
-                                tokens = pattern.split()
-                                if tokens:
-                                    relaxed_search_pattern = r"\s+".join([re.escape(t) for t in tokens])
-                                    match_orig = re.search(relaxed_search_pattern, output, re.IGNORECASE | re.DOTALL)
-                                    
-                                    if match_orig:
-                                        lines = output.splitlines()
-                                        match_line_idx = output[:match_orig.start()].count("\n")
-                                        start_idx = max(0, match_line_idx - evidence_lines)
-                                        end_idx = min(len(lines), match_line_idx + evidence_lines + 1)
-                                        evidence = "\n".join(lines[start_idx:end_idx])
-                                    else:
-                                        evidence = "(Relaxed match successful - lines found but context extraction failed)"
-                                else:
-                                    evidence = "(Relaxed match successful)"
-                            except Exception:
-                                evidence = "(Relaxed match successful)"
-
-                            res.update({
-                                "status": "pass",
-                                "evidence": evidence,
-                                "message": f"Pattern matched (relaxed conformance): {pattern}"
-                            })
-                        else:
-                            res.update({
-                                "status": "fail",
-                                "evidence": output[-500:],  # Last 500 chars as evidence
-                                "message": f"Pattern not found: {pattern}"
-                            })
-                    except Exception:
-                        # If normalization inadvertently breaks a complex regex, fall back to fail
-                        res.update({
-                            "status": "fail",
-                            "evidence": output[-500:],
-                            "message": f"Pattern not found: {pattern}"
-                        })
-                    
-            elif check_type == "regex_not_present":
-                flags = re.MULTILINE | re.DOTALL if "\n" in pattern else re.MULTILINE
-                match = re.search(pattern, output, flags)
-                if not match:
-                    res.update({
-                        "status": "pass",
-                        "evidence": "",
-                        "message": f"Pattern correctly absent: {pattern}"
-                    })
-                else:
-                    lines = output.splitlines()
-                    match_line_idx = output[:match.start()].count("\n")
-                    start_idx = max(0, match_line_idx - evidence_lines)
-                    end_idx = min(len(lines), match_line_idx + evidence_lines + 1)
-                    evidence = "\n".join(lines[start_idx:end_idx])
-                    
-                    res.update({
-                        "status": "fail",
-                        "evidence": evidence,
-                        "message": f"Unwanted pattern found: {pattern}"
-                    })
-                    
-            elif check_type == "contains":
-                if pattern in output:
-                    idx = output.find(pattern)
-                    start = max(0, idx - 100)
-                    end = min(len(output), idx + 100)
-                    evidence = output[start:end]
-                    
-                    res.update({
-                        "status": "pass",
-                        "evidence": evidence,
-                        "message": f"Text found: {pattern}"
-                    })
-                else:
-                    res.update({
-                        "status": "fail",
-                        "evidence": output[-500:],
-                        "message": f"Text not found: {pattern}"
-                    })
-            
             results.append(res)
             log_msg(f"Check '{check_name}' result: {res['status']}")
                     
@@ -292,47 +239,120 @@ def run_verification_checks(runner: CommandRunner, checks: list, variables: dict
 @celery_app.task(bind=True)
 def execute_job(self, job_id: int):
     """
-    Main task to execute a full job.
+    Queue a job's targets on their ports and start whatever can run now.
+
+    Targets are already stored as "queued"; the scheduler decides when each
+    port takes its next target, so this only kicks off a dispatch.
     """
     db = get_db_session()
     try:
         job = db.query(models.Job).filter(models.Job.id == job_id).first()
         if not job:
             return "Job not found"
+        if not job.targets:
+            scheduler.finalize_job(db, job_id)
+            return
+    finally:
+        db.close()
+
+    return dispatch_ports()
+
+@celery_app.task()
+def dispatch_ports():
+    """Start the next queued target on every free port."""
+    db = get_db_session()
+    try:
+        claimed = scheduler.claim_next_targets(db, MAX_PARALLEL_TARGETS)
+        for target_id in claimed:
+            try:
+                execute_target.delay(target_id)
+            except Exception:
+                # Broker unreachable: put the target back so the port is not stuck.
+                target = db.query(models.JobTarget).filter(models.JobTarget.id == target_id).first()
+                target.status = "queued"
+                target.started_at = None
+                db.commit()
+                raise
+        return claimed
+    finally:
+        db.close()
 
-        job.status = "running"
-        db.commit()
+@worker_ready.connect
+def recover_on_startup(**kwargs):
+    """
+    Dispatch when the worker (re)starts, and again once targets orphaned by
+    the previous run are old enough to be recovered by the scheduler.
+    """
+    dispatch_ports.delay()
+    dispatch_ports.apply_async(countdown=scheduler.STALE_TARGET_SECONDS + 1)
+
+@celery_app.task(bind=True)
+def execute_target(self, target_id: int):
+    """
+    Run one target that the scheduler has claimed, then hand its port on.
+    """
+    db = get_db_session()
+    try:
+        target = db.query(models.JobTarget).filter(models.JobTarget.id == target_id).first()
+        if not target:
+            return "Target not found"
+        if target.status != "running":
+            # Given up by the scheduler (worker presumed lost) before this task ran.
+            return "Target no longer claimed"
+
+        job = target.job
+        if job.status == "queued":
+            job.status = "running"
+            db.commit()
+            dashboard_stats.invalidate()
+            events.publish(job.id, "job_status", status="running")
 
         verification_checks = (job.template.verification if job.template else []) or []
         template_steps = normalize_template_steps(job.template)
-        
-        # Simple sequential execution for MVP
-        for target in job.targets:
+        try:
             process_target(db, target, template_steps, verification_checks)
-        
-        # Check overall status
-        failed = any(t.status == "failed" for t in job.targets)
-        job.status = "failed" if failed else "completed"
-        db.commit()
-
+        except Exception:
+            # The final status was not committed; go on from the stored row.
+            db.rollback()
+            raise
+        finally:
+            if target.status == "running":
+                target.status = "failed"
+                finish_target(db, target)
+            scheduler.finalize_job(db, target.job_id)
     finally:
         db.close()
+        dispatch_ports()
+
+def finish_target(db: Session, target: models.JobTarget):
+    """
+    Commit a target's final status together with finished_at and its port
+    stats, so a crash can never leave one without the others.
+    """
+    target.finished_at = datetime.datetime.utcnow()
+    dashboard_stats.record_target_result(db, target)
+    db.commit()
 
 def process_target(db: Session, target: models.JobTarget, template_steps: list, verification_checks: list):
     target.status = "running"
+    clear_log(db, target.id)
     db.commit()
+    job_id = target.job_id
+    events.publish(job_id, "target_status", target_id=target.id, status="running")
     
-    log_buffer = []
-    
-    def log(msg):
-        log_buffer.append(f"[{time.strftime('%H:%M:%S')}] {msg}")
-        target.log = "\n".join(log_buffer)
-        db.commit()
+    def publish_log(offset, lines):
+        events.publish(job_id, "log", target_id=target.id, offset=offset, lines=lines)
+
+    log_writer = TargetLogWriter(target.id, get_db_session, on_flush=publish_log, flusher=log_flusher)
+    log = log_writer.write
+
+    # Step strings compile once per worker process; each target only renders.
+    template_scope = target.job.template_id if target.job else None
+
+    def render(source):
+        return template_cache.render(source, target.variables, template_scope)
 
     try:
-        # 1. Prepare Environment
-        env = Environment(undefined=StrictUndefined)
-        
         # 2. Connect to Serial
         port_path = os.path.expanduser(target.port)
         if not os.path.exists(port_path):
@@ -340,17 +360,13 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
 
         log(f"Connecting to {port_path}...")
         
-        # Fetch baud rate from settings
-        baud = 9600
-        setting = db.query(models.Setting).filter(models.Setting.key == "port_baud_rates").first()
-        if setting:
-            # target.port might be "~/port1", so we extract the port ID
-            match = re.search(r"port(\d+)", target.port)
-            if match:
-                port_id = match.group(1)
-                baud = setting.value.get(port_id, 9600)
-
-        with SerialSession(port_path, baud=baud) as session:
+        # Baud rate from the process-wide settings cache
+        baud = settings_cache.settings.port_baud(target.port)
+
+        if is_port_busy(port_path):
+            log(f"Port busy, waiting up to {PORT_LEASE_WAIT:.0f}s for it to become free...")
+        lease = PortLease(port_path, owner=f"job {target.job_id} (target {target.id})")
+        with lease.acquire(wait=PORT_LEASE_WAIT), SerialSession(port_path, baud=baud, background_reader=True) as session:
             # Clear noise and wake up
             initial_buffer = session.drain(0.5)
             runner = CommandRunner(session)
@@ -378,7 +394,7 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
             
             # 3. Execute standardized template steps
             if template_steps:
-                execution_steps = [s for s in template_steps if s.get("type") != "verify"]
+                execution_steps = group_pipelined_steps([s for s in template_steps if s.get("type") != "verify"])
                 verification_steps = [s for s in template_steps if s.get("type") == "verify"]
                 
                 log(f"Executing {len(execution_steps)} configuration steps...")
@@ -387,17 +403,18 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
                 for i, step in enumerate(execution_steps):
                     step_type = step.get("type", "send")
                     log(f"Step {i+1}: {step_type}")
+                    events.publish(job_id, "step", target_id=target.id, index=i + 1, total=len(execution_steps), step_type=step_type)
                     
                     if step_type in ["send", "command"]:
                         wake_console_once()
                         initialize_paging()
                         cmd_template = step.get("cmd", step.get("content", ""))
-                        rendered_cmd = env.from_string(cmd_template).render(**target.variables)
+                        rendered_cmd = render(cmd_template)
                         if not rendered_cmd.strip():
                             log("Skipping empty command step.")
                             continue
                         log(f"Sending: {rendered_cmd}")
-                        session.send_line(rendered_cmd)
+                        runner.send_command(rendered_cmd)
                         # Wait for prompt after command if specified
                         if step.get("wait_prompt", True):
                             out = runner.wait_for_prompt()
@@ -409,14 +426,57 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
                         else:
                             log(f"Sent (no wait): {rendered_cmd}")
                     
+                    elif step_type == "pipeline_block":
+                        wake_console_once()
+                        initialize_paging()
+                        commands = []
+                        for block_step in step["steps"]:
+                            cmd_template = block_step.get("cmd", block_step.get("content", ""))
+                            rendered_cmd = render(cmd_template)
+                            if rendered_cmd.strip():
+                                commands.append(rendered_cmd)
+                        window = max(1, int(step.get("window") or 1))
+                        log(f"Pipelining {len(commands)} commands (window {window})...")
+                        for result in runner.run_pipelined(commands, window=window):
+                            log(f"Sent: {result['command']}")
+                            if result["error"]:
+                                log(f"WARNING: {result['command']}: {result['error']}")
+                        log(f"Pipelined block of {len(commands)} commands acknowledged.")
+
+                    elif step_type == "config_diff":
+                        # Incremental push: only send lines missing from the running config.
+                        # Runs from exec mode; enters and leaves config mode itself.
+                        wake_console_once()
+                        initialize_paging()
+                        capture_cmd = render(step.get("command") or "show running-config")
+                        desired = render(step.get("content", ""))
+
+                        log(f"Capturing '{capture_cmd}' for incremental push...")
+                        running = runner.run_show(capture_cmd)
+                        plan = plan_config_push(running, desired)
+                        log(f"Incremental push: {len(plan.commands)} commands to send, "
+                            f"{plan.skipped}/{plan.total} lines already present (skipped).")
+
+                        if plan.commands:
+                            runner.enter_config_mode(custom_command=step.get("config_command"))
+                            window = max(1, int(step.get("pipeline_window") or 1))
+                            for result in runner.run_pipelined(plan.commands, window=window):
+                                log(f"Sent: {result['command']}")
+                                if result["error"]:
+                                    log(f"WARNING: {result['command']}: {result['error']}")
+                            runner.exit_config_mode(custom_command=step.get("exit_command"))
+                            log("Incremental push applied.")
+                        else:
+                            log("Device already compliant; nothing to push.")
+
                     elif step_type == "expect":
                         wake_console_once()
                         initialize_paging()
                         pattern_template = step.get("pattern", "")
                         response_template = step.get("response", "")
                         
-                        pattern = env.from_string(pattern_template).render(**target.variables)
-                        response = env.from_string(response_template).render(**target.variables)
+                        pattern = render(pattern_template)
+                        response = render(response_template)
                         
                         log(f"Waiting for pattern: {pattern}")
                         # Use session.read_until or similar if available, or session.read with timeout
@@ -449,13 +509,17 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
                          log(f"Acquired privileged mode (using: {cmd or 'default'}).")
 
                     elif step_type == "authenticate" or step_type == "login":
-                         user = step.get("username") or target.variables.get("username")
-                         pwd = step.get("password") or target.variables.get("password")
-                         
+                         # Credentials from target variables are rendered without caching them.
+                         user = step.get("username")
+                         pwd = step.get("password")
                          if user:
-                             user = env.from_string(user).render(**target.variables)
+                             user = render(user)
+                         elif target.variables.get("username"):
+                             user = template_cache.env.from_string(target.variables["username"]).render(**target.variables)
                          if pwd:
-                             pwd = env.from_string(pwd).render(**target.variables)
+                             pwd = render(pwd)
+                         elif target.variables.get("password"):
+                             pwd = template_cache.env.from_string(target.variables["password"]).render(**target.variables)
                          
                          log("Waiting for authentication/link-up...")
                          runner.authenticate(username=user, password=pwd, initial_buffer=initial_buffer)
@@ -494,7 +558,10 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
                             "pattern": step.get("pattern", ""),
                             "evidence_lines": step.get("evidence_lines", 3)
                         })
-                    results = run_verification_checks(runner, checks, target.variables, log_func=log)
+                    results = run_verification_checks(runner, checks, target.variables, log_func=log, template_scope=template_scope)
+                    # Captured output goes to the blob store; results keep its hash.
+                    with write_session() as blob_db:
+                        results = blob_store.externalize_outputs(blob_db, results)
                     target.verification_results = results
                     
                     failed_count = sum(1 for r in results if r["status"] in ["fail", "error"])
@@ -525,8 +592,14 @@ def process_target(db: Session, target: models.JobTarget, template_steps: list,
         log(f"Error: {error_msg}")
         
         # Categorize and suggest remediation
-        target.failure_category = categorize_failure(error_msg, target.log)
+        target.failure_category = categorize_failure(error_msg, log_writer.text)
         target.remediation = suggest_remediation(target.failure_category)
         
     finally:
-        db.commit()
+        # Stored log must be complete before the final status is visible.
+        log_writer.close()
+        finish_target(db, target)
+        events.publish(
+            job_id, "target_status", target_id=target.id, status=target.status,
+            failure_category=target.failure_category, remediation=target.remediation,
+        )
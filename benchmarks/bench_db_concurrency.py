@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark API read latency while a 16-target job writes its logs.
+
+A worker process simulates 16 targets, each logging a line every few
+milliseconds, while this process repeatedly runs the queries behind
+GET /jobs/{id} against the same SQLite file. Two setups are compared:
+
+    legacy   default rollback journal, one commit per log line rewriting the
+             whole log text (what the worker did before append-only logs)
+    current  WAL + tuned pragmas, lines grouped by the shared LogFlusher
+             into one write_session-style transaction per interval
+
+Run from the repository root:
+
+    python benchmarks/bench_db_concurrency.py [--targets 16] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend import models
+from backend.database import Base, apply_sqlite_pragmas
+from backend.log_writer import LogFlusher, TargetLogWriter, read_log_lines
+
+LINE_INTERVAL = 0.005
+
+
+def make_engine(path: str, mode: str):
+    # The legacy setup used pysqlite's 5 s default timeout and no pragmas.
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if mode == "current":
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+def setup_database(path: str, targets: int) -> int:
+    engine = make_engine(path, "legacy")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    template = models.Template(name="bench", steps=[], config_schema={})
+    db.add(template)
+    db.flush()
+    job = models.Job(template_id=template.id, status="running")
+    db.add(job)
+    db.flush()
+    for port in range(1, targets + 1):
+        db.add(models.JobTarget(job_id=job.id, port=f"~/port{port}", variables={}, status="running"))
+    db.commit()
+    db.execute(text("CREATE TABLE legacy_logs (target_id INTEGER PRIMARY KEY, log TEXT)"))
+    db.commit()
+    job_id = job.id
+    db.close()
+    engine.dispose()
+    return job_id
+
+
+def legacy_target(Session, target_id: int, stop: threading.Event, errors: list):
+    log = ""
+    db = Session()
+    db.execute(text("INSERT INTO legacy_logs (target_id, log) VALUES (:id, '')"), {"id": target_id})
+    db.commit()
+    line = 0
+    while not stop.is_set():
+        log += f"[00:00:00] Output: interface 1/1/{line} no shutdown\n"
+        line += 1
+        try:
+            db.execute(text("UPDATE legacy_logs SET log = :log WHERE target_id = :id"), {"log": log, "id": target_id})
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            errors.append(1)
+        time.sleep(LINE_INTERVAL)
+    db.close()
+
+
+def current_target(writer: TargetLogWriter, stop: threading.Event):
+    line = 0
+    while not stop.is_set():
+        writer.write(f"Output: interface 1/1/{line} no shutdown")
+        line += 1
+        time.sleep(LINE_INTERVAL)
+    writer.close()
+
+
+def run_worker(path: str, mode: str, targets: int, seconds: float, result):
+    engine = make_engine(path, mode)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    write_lock = threading.Lock()
+    errors = []
+
+    @contextmanager
+    def write_session():
+        with write_lock:
+            db = Session()
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    flusher = LogFlusher(write_session)
+    stop = threading.Event()
+    threads = []
+    for target_id in range(1, targets + 1):
+        if mode == "legacy":
+            thread = threading.Thread(target=legacy_target, args=(Session, target_id, stop, errors))
+        else:
+            writer = TargetLogWriter(target_id, Session, flusher=flusher)
+            thread = threading.Thread(target=current_target, args=(writer, stop))
+        threads.append(thread)
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    result["write_errors"] = len(errors)
+    result["transactions"] = flusher.flush_count if mode == "current" else None
+    engine.dispose()
+
+
+def read_job(Session, job_id: int, mode: str):
+    db = Session()
+    try:
+        job = db.get(models.Job, job_id)
+        for target in job.targets:
+            if mode == "legacy":
+                db.execute(text("SELECT log FROM legacy_logs WHERE target_id = :id"), {"id": target.id}).scalar()
+            else:
+                read_log_lines(db, target.id, limit=200)
+    finally:
+        db.close()
+
+
+def measure(mode: str, targets: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        job_id = setup_database(path, targets)
+        result = multiprocessing.Manager().dict()
+        worker = multiprocessing.Process(target=run_worker, args=(path, mode, targets, seconds, result))
+        worker.start()
+
+        engine = make_engine(path, mode)
+        Session = sessionmaker(bind=engine)
+        latencies, read_errors = [], 0
+        time.sleep(0.2)
+        while worker.is_alive():
+            start = time.perf_counter()
+            try:
+                read_job(Session, job_id, mode)
+            except OperationalError:
+                read_errors += 1
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+        worker.join()
+        engine.dispose()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies),
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max": latencies[-1] * 1000,
+        "read_errors": read_errors,
+        "write_errors": result.get("write_errors", 0),
+        "transactions": result.get("transactions"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.targets} targets, one log line per target every {LINE_INTERVAL * 1000:.0f} ms, {args.seconds:g} s")
+    print(f"{'mode':>8} {'reads':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'locked (r/w)':>13} {'log txns':>9}")
+    for mode in ("legacy", "current"):
+        r = measure(mode, args.targets, args.seconds)
+        transactions = "-" if r["transactions"] is None else str(r["transactions"])
+        locked = f"{r['read_errors']}/{r['write_errors']}"
+        print(f"{mode:>8} {r['reads']:>6} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['max']:>8.2f} {locked:>13} {transactions:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark PromptDetector.normalize on pathological pager output.
+
+HP/Aruba devices erase their "-- MORE --" prompt with runs of backspaces on
+every page. The previous implementation resolved one backspace per re.sub()
+call over the whole string, so cost grew with output size times backspace
+count. Run from the repository root:
+
+    python benchmarks/bench_normalize.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib.prompt_detector import PromptDetector
+
+
+def legacy_normalize(text: str) -> str:
+    """The pre-streaming implementation, kept here for comparison."""
+    text = re.sub(r'\x1b\[[0-?]*[ -/]*[@-~]', '', text)
+    text = re.sub(r'\x1b[@-_][0-?]*[ -/]*[@-~]', '', text)
+    while '\x08' in text:
+        new_text = re.sub(r'.\x08', '', text, count=1)
+        if new_text == text:
+            text = text.replace('\x08', '')
+            break
+        text = new_text
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
+    return text
+
+
+def pager_output(pages: int, lines_per_page: int = 22) -> str:
+    body = "".join(f"interface 1/1/{i}\r\n   no shutdown\r\n" for i in range(lines_per_page // 2))
+    prompt = "-- MORE --, next page: Space, next line: Enter, quit: Control-C"
+    erase = "\x08" * len(prompt) + " " * len(prompt) + "\x08" * len(prompt)
+    return (body + prompt + erase) * pages
+
+
+def timed(func, text: str) -> float:
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'pages':>6} {'bytes':>9} {'normalize (s)':>14} {'legacy (s)':>11}")
+    for pages in (10, 20, 40, 80, 160, 320):
+        text = pager_output(pages)
+        new = timed(PromptDetector.normalize, text)
+        # The legacy path is quadratic; skip it once it gets too slow to wait for.
+        legacy = f"{timed(legacy_normalize, text):11.3f}" if pages <= 80 else f"{'-':>11}"
+        print(f"{pages:>6} {len(text):>9} {new:>14.4f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
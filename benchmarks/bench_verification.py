@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark verification checks against one large `show running-config`.
+
+An audit template runs dozens of checks against the same output. The
+previous evaluation re-split the output and re-counted newlines for every
+evidence extraction, and normalized the whole output again for every
+relaxed (whitespace-insensitive) match. check_engine shares one OutputView
+(lines split once, bisect over line breaks, one normalized copy with an
+offset map) across all checks of an output. Run from the
+repository root:
+
+    python benchmarks/bench_verification.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import check_engine
+
+
+def legacy_evaluate(output: str, check_type: str, pattern: str, evidence_lines: int) -> str:
+    """The per-check evidence extraction used before check_engine, kept here for comparison."""
+    if check_type == "contains":
+        return "pass" if pattern in output else "fail"
+    flags = re.MULTILINE | re.DOTALL if "\n" in pattern else re.MULTILINE
+    match = re.search(pattern, output, flags)
+    if match:
+        lines = output.splitlines()
+        match_line_idx = output[:match.start()].count("\n")
+        "\n".join(lines[max(0, match_line_idx - evidence_lines):match_line_idx + evidence_lines + 1])
+        return "pass"
+    # Relaxed fallback: normalize the whole output again, then search it once
+    # more for evidence.
+    if re.search(" ".join(pattern.split()), " ".join(output.split()), re.IGNORECASE):
+        match = re.search(r"\s+".join(re.escape(t) for t in pattern.split()), output, re.IGNORECASE | re.DOTALL)
+        if match:
+            lines = output.splitlines()
+            match_line_idx = output[:match.start()].count("\n")
+            "\n".join(lines[max(0, match_line_idx - evidence_lines):match_line_idx + evidence_lines + 1])
+        return "pass"
+    return "fail"
+
+
+def running_config(interfaces: int) -> str:
+    return "".join(
+        f"interface 1/1/{i}\n description Uplink port {i}\n vlan trunk allowed {i % 40},{i % 40 + 1}\n no shutdown\n!\n"
+        for i in range(interfaces)
+    )
+
+
+def audit_checks(count: int, interfaces: int) -> list:
+    checks = []
+    for i in range(count):
+        port = (i * 37) % interfaces
+        if i % 3 == 0:
+            checks.append(("contains", f"description Uplink port {port}"))
+        elif i % 3 == 1:
+            checks.append(("regex_match", rf"interface 1/1/{port}\n description Uplink"))
+        else:
+            # Near miss: only passes the relaxed (whitespace-insensitive) match.
+            checks.append(("regex_match", f"interface 1/1/{port} description   uplink port {port}"))
+    return checks
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """Fastest of `repeat` runs in ms, after one warm-up run (patterns compiled)."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    print(f"{'interfaces':>10} {'bytes':>9} {'checks':>7} {'engine (ms)':>12} {'legacy (ms)':>12}")
+    for interfaces, count in ((200, 10), (1000, 30), (2000, 30), (2000, 100)):
+        output = running_config(interfaces)
+        checks = audit_checks(count, interfaces)
+
+        def run_engine():
+            view = check_engine.OutputView(output)
+            view.locate(p for t, p in checks if t == "contains")
+            for check_type, pattern in checks:
+                check_engine.evaluate(view, check_type, pattern, 3)
+
+        def run_legacy():
+            for check_type, pattern in checks:
+                legacy_evaluate(output, check_type, pattern, 3)
+
+        engine, legacy = best_of(run_engine), best_of(run_legacy)
+        print(f"{interfaces:>10} {len(output):>9} {count:>7} {engine:>12.2f} {legacy:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
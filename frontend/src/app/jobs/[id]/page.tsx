@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState, use } from "react";
+import { useEffect, useRef, useState, use } from "react";
 import { Terminal, CheckCircle, XCircle, Clock, AlertTriangle, Info } from "lucide-react";
 import api from "@/lib/api";
 
@@ -8,7 +8,9 @@ type VerificationCheck = {
     check_name: string;
     status: string;
     evidence: string;
-    full_output?: string;
+    full_output?: string;  // Results stored before outputs moved to the blob store
+    output_hash?: string;
+    output_size?: number;
     message: string;
 };
 
@@ -16,7 +18,6 @@ type JobTarget = {
     id: number;
     port: string;
     status: string;
-    log: string;
     verification_results?: VerificationCheck[];
     failure_category?: string;
     remediation?: string;
@@ -29,10 +30,22 @@ type Job = {
     targets: JobTarget[];
 };
 
+type LogListener = (offset: number, lines: string[]) => void;
+
+type JobEvent =
+    | { type: "snapshot"; job: Job }
+    | { type: "job_status"; status: string }
+    | { type: "target_status"; target_id: number; status: string; failure_category?: string; remediation?: string }
+    | { type: "step"; target_id: number; index: number; total: number; step_type: string }
+    | { type: "log"; target_id: number; offset: number; lines: string[] };
+
 export default function JobDetailPage({ params }: { params: Promise<{ id: string }> }) {
     const resolvedParams = use(params);
     const [job, setJob] = useState<Job | null>(null);
     const [loading, setLoading] = useState(true);
+    // True while the events socket is up; otherwise fall back to polling.
+    const [live, setLive] = useState(false);
+    const logListeners = useRef(new Map<number, LogListener>());
 
     const fetchJob = () => {
         api.get(`jobs/${resolvedParams.id}`)
@@ -42,10 +55,46 @@ export default function JobDetailPage({ params }: { params: Promise<{ id: string
     };
 
     useEffect(() => {
+        const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+        const socket = new WebSocket(`${protocol}//${window.location.host}/api/jobs/${resolvedParams.id}/events`);
+
+        socket.onmessage = (message) => {
+            const event: JobEvent = JSON.parse(message.data);
+            if (event.type === "snapshot") {
+                setJob(event.job);
+                setLive(true);
+                setLoading(false);
+            } else if (event.type === "job_status") {
+                setJob((prev) => prev && { ...prev, status: event.status });
+            } else if (event.type === "target_status") {
+                setJob((prev) => prev && {
+                    ...prev,
+                    targets: prev.targets.map((t) => t.id === event.target_id
+                        ? { ...t, status: event.status, failure_category: event.failure_category, remediation: event.remediation }
+                        : t),
+                });
+                // Verification results are only in the full record.
+                if (event.status === "success" || event.status === "failed") fetchJob();
+            } else if (event.type === "log") {
+                logListeners.current.get(event.target_id)?.(event.offset, event.lines);
+            }
+        };
+        socket.onclose = () => setLive(false);
+
+        return () => socket.close();
+    }, [resolvedParams.id]);
+
+    useEffect(() => {
+        if (live) return;
         fetchJob();
         const interval = setInterval(fetchJob, 2000);
         return () => clearInterval(interval);
-    }, [resolvedParams.id]);
+    }, [resolvedParams.id, live]);
+
+    const subscribeLog = (targetId: number, listener: LogListener) => {
+        logListeners.current.set(targetId, listener);
+        return () => { logListeners.current.delete(targetId); };
+    };
 
     if (loading && !job) return <div className="text-neutral-500">Loading job...</div>;
     if (!job) return <div className="text-red-500">Job not found</div>;
@@ -88,11 +137,7 @@ export default function JobDetailPage({ params }: { params: Promise<{ id: string
                         )}
 
                         {/* Logs */}
-                        <div className="p-4 bg-black border-b border-neutral-800">
-                            <div className="h-32 overflow-y-auto font-mono text-xs text-neutral-400 whitespace-pre-wrap">
-                                {target.log || "Waiting for output..."}
-                            </div>
-                        </div>
+                        <TargetLog jobId={job.id} targetId={target.id} status={target.status} live={live} subscribe={subscribeLog} />
 
                         {/* Verification Results */}
                         {target.verification_results && target.verification_results.length > 0 && (
@@ -132,13 +177,8 @@ export default function JobDetailPage({ params }: { params: Promise<{ id: string
                                                                 </pre>
                                                             </details>
                                                         )}
-                                                        {check.full_output && (
-                                                            <details className="flex-1">
-                                                                <summary className="cursor-pointer text-[10px] font-bold uppercase text-neutral-500 hover:text-neutral-300">Full Output</summary>
-                                                                <pre className="mt-1 p-2 bg-black/50 rounded text-[10px] font-mono text-neutral-400 overflow-x-auto border border-neutral-800 max-h-64">
-                                                                    {check.full_output}
-                                                                </pre>
-                                                            </details>
+                                                        {(check.output_hash || check.full_output) && (
+                                                            <FullOutput hash={check.output_hash} size={check.output_size} inline={check.full_output} />
                                                         )}
                                                     </div>
                                                 </div>
@@ -155,6 +195,91 @@ export default function JobDetailPage({ params }: { params: Promise<{ id: string
     );
 }
 
+type TargetLogChunk = {
+    status: string;
+    next_offset: number;
+    lines: string[];
+};
+
+// Tails a target's log by line offset. Live log events are appended as they
+// arrive; a gap in offsets (or no live socket) falls back to the REST tail.
+function TargetLog({ jobId, targetId, status, live, subscribe }: {
+    jobId: number;
+    targetId: number;
+    status: string;
+    live: boolean;
+    subscribe: (targetId: number, listener: LogListener) => () => void;
+}) {
+    const [lines, setLines] = useState<string[]>([]);
+    const offset = useRef(0);
+    const done = status === "success" || status === "failed";
+
+    useEffect(() => {
+        let cancelled = false;
+        const fetchLog = () => {
+            api.get<TargetLogChunk>(`jobs/${jobId}/targets/${targetId}/log`, { params: { after: offset.current } })
+                .then((res) => {
+                    if (cancelled || res.data.lines.length === 0) return;
+                    const fresh = res.data.lines.slice(Math.max(0, offset.current - (res.data.next_offset - res.data.lines.length)));
+                    offset.current = Math.max(offset.current, res.data.next_offset);
+                    setLines((prev) => prev.concat(fresh));
+                    // A finished log is read once, page by page.
+                    if (done) fetchLog();
+                })
+                .catch((err) => console.error(err));
+        };
+
+        fetchLog();
+        const unsubscribe = subscribe(targetId, (start, batch) => {
+            if (start > offset.current) {
+                fetchLog();
+                return;
+            }
+            const fresh = batch.slice(offset.current - start);
+            if (fresh.length === 0) return;
+            offset.current += fresh.length;
+            setLines((prev) => prev.concat(fresh));
+        });
+        const interval = live || done ? undefined : setInterval(fetchLog, 2000);
+        return () => {
+            cancelled = true;
+            unsubscribe();
+            if (interval) clearInterval(interval);
+        };
+    }, [jobId, targetId, done, live]);
+
+    return (
+        <div className="p-4 bg-black border-b border-neutral-800">
+            <div className="h-32 overflow-y-auto font-mono text-xs text-neutral-400 whitespace-pre-wrap">
+                {lines.length > 0 ? lines.join("\n") : "Waiting for output..."}
+            </div>
+        </div>
+    );
+}
+
+function FullOutput({ hash, size, inline }: { hash?: string; size?: number; inline?: string }) {
+    const [text, setText] = useState<string | null>(inline ?? null);
+    const [error, setError] = useState(false);
+
+    const load = () => {
+        if (text !== null || !hash) return;
+        api.get<string>(`outputs/${hash}`, { responseType: "text" })
+            .then((res) => setText(res.data))
+            .catch(() => setError(true));
+    };
+
+    return (
+        <details className="flex-1" onToggle={(e) => (e.currentTarget as HTMLDetailsElement).open && load()}>
+            <summary className="cursor-pointer text-[10px] font-bold uppercase text-neutral-500 hover:text-neutral-300">
+                Full Output{size ? ` (${(size / 1024).toFixed(1)} KB)` : ""}
+            </summary>
+            <pre className="mt-1 p-2 bg-black/50 rounded text-[10px] font-mono text-neutral-400 overflow-x-auto border border-neutral-800 max-h-64">
+                {error ? "Output could not be loaded." : text ?? "Loading..."}
+            </pre>
+        </details>
+    );
+}
+
 function StatusBadge({ status, large = false }: { status: string; large?: boolean }) {
     let color = "bg-neutral-800 text-neutral-400";
     let icon = <Clock className={large ? "h-5 w-5" : "h-3 w-3"} />;
@@ -24,6 +24,11 @@ type Template = {
     config_schema: ConfigSchema;
 };
 
+type ValidationDetail = {
+    message: string;
+    targets: { index: number; port: string; errors: string[] }[];
+};
+
 type PortConfig = {
     id: number;
     enabled: boolean;
@@ -211,7 +216,14 @@ function NewJobBuilder() {
             });
             router.push(`/jobs/${res.data.id}`);
         } catch (err) {
-            alert("Failed to create job");
+            const detail = (err as { response?: { status?: number; data?: { detail?: ValidationDetail } } }).response?.data?.detail;
+            if (detail && typeof detail === "object" && detail.targets) {
+                const lines = detail.targets.slice(0, 10).map(t => `${t.port}: ${t.errors.join("; ")}`);
+                if (detail.targets.length > 10) lines.push(`...and ${detail.targets.length - 10} more`);
+                alert(`${detail.message}\n\n${lines.join("\n")}`);
+            } else {
+                alert("Failed to create job");
+            }
             console.error(err);
         } finally {
             setIsSubmitting(false);
@@ -8,19 +8,36 @@ import api from "@/lib/api";
 type Job = {
     id: number;
     template_id: number;
+    template_name: string | null;
     status: string;
     created_at: string;
+    target_count: number;
+    status_counts: Record<string, number>;
+};
+
+type JobPage = {
+    items: Job[];
+    next_cursor: string | null;
 };
 
 export default function JobsPage() {
     const [jobs, setJobs] = useState<Job[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-    useEffect(() => {
-        api.get("jobs/")
-            .then((res) => setJobs(res.data))
+    const loadPage = (cursor: string | null) => {
+        setLoading(true);
+        api.get<JobPage>("jobs/summary", { params: cursor ? { cursor } : {} })
+            .then((res) => {
+                setJobs((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items));
+                setNextCursor(res.data.next_cursor);
+            })
             .catch((err) => console.error(err))
             .finally(() => setLoading(false));
+    };
+
+    useEffect(() => {
+        loadPage(null);
     }, []);
 
     const getStatusIcon = (status: string) => {
@@ -51,18 +68,19 @@ export default function JobsPage() {
                         <tr>
                             <th className="px-6 py-4 font-semibold">Job ID</th>
                             <th className="px-6 py-4 font-semibold">Status</th>
+                            <th className="px-6 py-4 font-semibold">Targets</th>
                             <th className="px-6 py-4 font-semibold">Created At</th>
                             <th className="px-6 py-4 font-semibold text-right">Actions</th>
                         </tr>
                     </thead>
                     <tbody className="divide-y divide-neutral-800">
-                        {loading ? (
+                        {loading && jobs.length === 0 ? (
                             <tr>
-                                <td colSpan={4} className="px-6 py-12 text-center text-neutral-500">Loading jobs...</td>
+                                <td colSpan={5} className="px-6 py-12 text-center text-neutral-500">Loading jobs...</td>
                             </tr>
                         ) : jobs.length === 0 ? (
                             <tr>
-                                <td colSpan={4} className="px-6 py-12 text-center text-neutral-500">No jobs found.</td>
+                                <td colSpan={5} className="px-6 py-12 text-center text-neutral-500">No jobs found.</td>
                             </tr>
                         ) : (
                             jobs.map((job) => (
@@ -74,6 +92,11 @@ export default function JobsPage() {
                                             <span className="capitalize text-neutral-300">{job.status}</span>
                                         </div>
                                     </td>
+                                    <td className="px-6 py-4 text-neutral-400">
+                                        {job.target_count}
+                                        {job.status_counts.success ? <span className="ml-2 text-emerald-500">{job.status_counts.success} ok</span> : null}
+                                        {job.status_counts.failed ? <span className="ml-2 text-red-500">{job.status_counts.failed} failed</span> : null}
+                                    </td>
                                     <td className="px-6 py-4 text-neutral-400">
                                         {new Date(job.created_at).toLocaleString()}
                                     </td>
@@ -88,6 +111,18 @@ export default function JobsPage() {
                     </tbody>
                 </table>
             </div>
+
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <button
+                        onClick={() => loadPage(nextCursor)}
+                        disabled={loading}
+                        className="rounded-lg border border-neutral-700 px-4 py-2 text-sm text-neutral-300 hover:bg-neutral-800 disabled:opacity-50"
+                    >
+                        {loading ? "Loading..." : "Load more"}
+                    </button>
+                </div>
+            )}
         </div>
     );
 }
@@ -12,10 +12,23 @@ type Job = {
   target_count: number;
 };
 
+type PortStats = {
+  port: string;
+  succeeded: number;
+  failed: number;
+  success_rate: number | null;
+  average_duration_seconds: number | null;
+  finished_recent: number;
+  throughput_per_hour: number;
+};
+
 type DashboardSummary = {
   active_sessions: number;
   template_count: number;
   configured_targets: number;
+  job_counts: Record<string, number>;
+  throughput: { hours: number; finished: number; per_hour: number };
+  ports: PortStats[];
   recent_jobs: Job[];
 };
 
@@ -65,6 +78,7 @@ export default function Home() {
   const templateCount = summary?.template_count ?? 0;
   const configuredTargets = summary?.configured_targets ?? 0;
   const recentJobs = useMemo(() => summary?.recent_jobs ?? [], [summary]);
+  const ports = useMemo(() => summary?.ports ?? [], [summary]);
 
   return (
     <div className="space-y-8">
@@ -113,6 +127,46 @@ export default function Home() {
         </Link>
       </div>
 
+      {/* Port Health */}
+      {ports.length > 0 && (
+        <div className="rounded-xl border border-neutral-800 bg-neutral-900/30 overflow-hidden">
+          <div className="px-6 py-4 border-b border-neutral-800 flex justify-between items-center">
+            <h3 className="font-semibold text-white">Ports</h3>
+            <span className="text-xs text-neutral-500">
+              {summary?.throughput.finished ?? 0} targets in the last {summary?.throughput.hours ?? 24}h ({summary?.throughput.per_hour ?? 0}/h)
+            </span>
+          </div>
+          <table className="w-full text-left text-sm">
+            <thead className="text-neutral-500 text-xs">
+              <tr>
+                <th className="px-6 py-2 font-medium">Port</th>
+                <th className="px-6 py-2 font-medium">Success rate</th>
+                <th className="px-6 py-2 font-medium">Succeeded / Failed</th>
+                <th className="px-6 py-2 font-medium">Avg duration</th>
+                <th className="px-6 py-2 font-medium">Throughput</th>
+              </tr>
+            </thead>
+            <tbody className="divide-y divide-neutral-800">
+              {ports.map((port) => (
+                <tr key={port.port}>
+                  <td className="px-6 py-2 font-mono text-neutral-300">{port.port}</td>
+                  <td className="px-6 py-2 text-neutral-300">
+                    {port.success_rate === null ? "--" : `${Math.round(port.success_rate * 100)}%`}
+                  </td>
+                  <td className="px-6 py-2 text-neutral-400">
+                    <span className="text-emerald-500">{port.succeeded}</span> / <span className="text-rose-500">{port.failed}</span>
+                  </td>
+                  <td className="px-6 py-2 text-neutral-400">
+                    {port.average_duration_seconds === null ? "--" : `${port.average_duration_seconds}s`}
+                  </td>
+                  <td className="px-6 py-2 text-neutral-400">{port.throughput_per_hour}/h</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+
       {/* Recent Activity */}
       <div className="rounded-xl border border-neutral-800 bg-neutral-900/30 overflow-hidden">
         <div className="px-6 py-4 border-b border-neutral-800 flex justify-between items-center">
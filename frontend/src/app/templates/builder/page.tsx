@@ -13,11 +13,12 @@ import {
     Settings,
     ArrowLeft,
     ChevronRight,
-    Code
+    Code,
+    GitCompare
 } from 'lucide-react';
 import api from '@/lib/api';
 
-type StepType = 'command' | 'verify' | 'priv_mode' | 'config_mode' | 'exit_config' | 'authenticate';
+type StepType = 'command' | 'verify' | 'priv_mode' | 'config_mode' | 'exit_config' | 'authenticate' | 'config_diff';
 type StoredStep = Omit<Partial<Step>, 'type'> & {
     type: StepType | 'send';
     cmd?: string;
@@ -33,6 +34,8 @@ interface Step {
     pattern?: string;
     username?: string;
     password?: string;
+    pipeline?: boolean;
+    pipeline_window?: number;
 }
 
 export default function TemplateBuilderPage() {
@@ -136,9 +139,9 @@ function TemplateBuilder() {
         const newStep: Step = {
             id: Math.random().toString(36).substr(2, 9),
             type,
-            content: (type === 'command' || type === 'priv_mode' || type === 'config_mode' || type === 'exit_config') ? defaultContent : undefined,
+            content: (type === 'command' || type === 'priv_mode' || type === 'config_mode' || type === 'exit_config' || type === 'config_diff') ? defaultContent : undefined,
             name: type === 'verify' ? 'Check Name' : undefined,
-            command: type === 'verify' ? 'show run' : undefined,
+            command: type === 'verify' ? 'show run' : type === 'config_diff' ? 'show running-config' : undefined,
             check_type: type === 'verify' ? 'regex_match' : undefined,
             pattern: type === 'verify' ? '' : undefined,
             username: type === 'authenticate' ? '{{ username }}' : undefined,
@@ -183,6 +186,7 @@ function TemplateBuilder() {
             const payload = {
                 name,
                 is_baseline: 0,
+                // Keep every stored field, including ones the builder has no editor for.
                 steps: steps.map((step) => Object.fromEntries(
                     Object.entries(step).filter(([key]) => key !== 'id')
                 )),
@@ -240,6 +244,7 @@ function TemplateBuilder() {
                         <div className="space-y-2">
                             <ToolboxAction icon={<Command className="h-4 w-4" />} label="Send Command" onClick={() => addStep('command')} />
                             <ToolboxAction icon={<ShieldCheck className="h-4 w-4" />} label="Verification" onClick={() => addStep('verify')} />
+                            <ToolboxAction icon={<GitCompare className="h-4 w-4" />} label="Incremental Config" onClick={() => addStep('config_diff')} />
                             <div className="pt-4 border-t border-neutral-800 mt-4">
                                 <h4 className="text-[10px] font-bold text-neutral-500 mb-2 uppercase">Predefined</h4>
                                 <ToolboxAction icon={<Settings className="h-4 w-4" />} label="Login / Auth" onClick={() => addStep('authenticate')} />
@@ -302,12 +307,37 @@ function TemplateBuilder() {
                                 {/* Step Content */}
                                 <div className="space-y-3">
                                     {step.type === 'command' && (
-                                        <textarea
-                                            placeholder="Enter command (e.g. hostname {{ hostname }})"
-                                            value={step.content}
-                                            onChange={(e) => updateStep(step.id, { content: e.target.value })}
-                                            className="w-full bg-neutral-950 border border-neutral-800 rounded-lg p-3 text-sm font-mono text-emerald-400 focus:outline-none focus:border-blue-500 min-h-[80px]"
-                                        />
+                                        <div className="space-y-2">
+                                            <textarea
+                                                placeholder="Enter command (e.g. hostname {{ hostname }})"
+                                                value={step.content}
+                                                onChange={(e) => updateStep(step.id, { content: e.target.value })}
+                                                className="w-full bg-neutral-950 border border-neutral-800 rounded-lg p-3 text-sm font-mono text-emerald-400 focus:outline-none focus:border-blue-500 min-h-[80px]"
+                                            />
+                                            <div className="flex items-center gap-3 text-xs text-neutral-400">
+                                                <label className="flex items-center gap-2">
+                                                    <input
+                                                        type="checkbox"
+                                                        checked={!!step.pipeline}
+                                                        onChange={(e) => updateStep(step.id, { pipeline: e.target.checked || undefined })}
+                                                    />
+                                                    Pipeline with neighbouring commands
+                                                </label>
+                                                {step.pipeline && (
+                                                    <label className="flex items-center gap-2">
+                                                        Window
+                                                        <input
+                                                            type="number"
+                                                            min={1}
+                                                            placeholder="8"
+                                                            value={step.pipeline_window ?? ''}
+                                                            onChange={(e) => updateStep(step.id, { pipeline_window: e.target.value ? Number(e.target.value) : undefined })}
+                                                            className="w-16 bg-neutral-950 border border-neutral-800 rounded px-2 py-1 text-white focus:outline-none focus:border-blue-500"
+                                                        />
+                                                    </label>
+                                                )}
+                                            </div>
+                                        </div>
                                     )}
 
                                     {step.type === 'verify' && (
@@ -370,6 +400,46 @@ function TemplateBuilder() {
                                         </div>
                                     )}
 
+                                    {step.type === 'config_diff' && (
+                                        <div className="space-y-3">
+                                            <div>
+                                                <label className="text-[10px] font-bold text-neutral-500 uppercase mb-1 block">Desired Config</label>
+                                                <textarea
+                                                    placeholder={"interface Vlan{{ vlan_id }}\n description {{ description }}"}
+                                                    value={step.content}
+                                                    onChange={(e) => updateStep(step.id, { content: e.target.value })}
+                                                    className="w-full bg-neutral-950 border border-neutral-800 rounded-lg p-3 text-sm font-mono text-emerald-400 focus:outline-none focus:border-blue-500 min-h-[120px]"
+                                                />
+                                            </div>
+                                            <div className="grid grid-cols-2 gap-3">
+                                                <div>
+                                                    <label className="text-[10px] font-bold text-neutral-500 uppercase mb-1 block">Capture Command</label>
+                                                    <input
+                                                        type="text"
+                                                        value={step.command}
+                                                        onChange={(e) => updateStep(step.id, { command: e.target.value })}
+                                                        className="w-full bg-neutral-950 border border-neutral-800 rounded-lg px-3 py-2 text-sm font-mono text-white focus:outline-none focus:border-blue-500"
+                                                    />
+                                                </div>
+                                                <div>
+                                                    <label className="text-[10px] font-bold text-neutral-500 uppercase mb-1 block">Pipeline Window</label>
+                                                    <input
+                                                        type="number"
+                                                        min={1}
+                                                        placeholder="1"
+                                                        value={step.pipeline_window ?? ''}
+                                                        onChange={(e) => updateStep(step.id, { pipeline_window: e.target.value ? Number(e.target.value) : undefined })}
+                                                        className="w-full bg-neutral-950 border border-neutral-800 rounded-lg px-3 py-2 text-sm text-white focus:outline-none focus:border-blue-500"
+                                                    />
+                                                </div>
+                                            </div>
+                                            <div className="bg-neutral-950/50 border border-neutral-800/50 rounded-lg p-2 text-[10px] text-neutral-500 flex items-center gap-2">
+                                                <ChevronRight className="h-3 w-3" />
+                                                Only lines missing from the running config are sent. Run from privileged mode; the step enters and leaves config mode itself.
+                                            </div>
+                                        </div>
+                                    )}
+
                                     {step.type === 'authenticate' && (
                                         <div className="space-y-4">
                                             <div className="bg-blue-500/10 border border-blue-500/20 rounded-lg p-3 text-xs text-blue-400 flex items-start gap-3">
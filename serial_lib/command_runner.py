@@ -1,20 +1,82 @@
 import re
 import time
 from .serial_session import SerialSession
-from .prompt_detector import PromptDetector, PromptType
-from typing import Optional, Dict, Callable
+from .prompt_detector import PromptDetector, PromptType, PromptMatch, StreamingNormalizer, CLI_PROMPTS
+from typing import Optional, Dict, Callable, List, Tuple
+
+# Prompt states that end the wake-up phase of authenticate().
+LOGIN_STATES = CLI_PROMPTS | {PromptType.USERNAME, PromptType.PASSWORD}
 
 class CommandRunner:
-    def __init__(self, session: SerialSession, prompt_patterns: Optional[Dict[str, str]] = None):
+    def __init__(self, session: SerialSession, prompt_patterns: Optional[Dict[str, str]] = None,
+                 prompt_quiet: float = 1.5):
         """
         Initialize CommandRunner with optional device-specific prompt patterns.
         
         Args:
             session: SerialSession instance
             prompt_patterns: Optional dict of prompt patterns for device profile
+            prompt_quiet: Seconds the device must stay silent after a prompt
+                that does not match the learned hostname before it is accepted
         """
         self.session = session
         self.detector = PromptDetector(prompt_patterns)
+        self.prompt_quiet = prompt_quiet
+        # Device hostname learned from the first CLI prompt we see. Once known,
+        # prompts are matched literally against it before the generic patterns.
+        self.hostname: Optional[str] = None
+
+    # Commands that rename the device and therefore change its prompt.
+    HOSTNAME_COMMAND = re.compile(r'^\s*(?:hostname|sysname)\s+"?([^\s"]+)"?\s*$', re.I)
+
+    def learn_prompt(self, prompt: PromptMatch):
+        """Remember the hostname of a CLI prompt for exact matching."""
+        if prompt.is_cli and prompt.hostname:
+            self.hostname = prompt.hostname
+
+    def send_command(self, cmd: str):
+        """Send a command line, tracking hostname changes it causes."""
+        m = self.HOSTNAME_COMMAND.match(cmd)
+        if m:
+            self.hostname = m.group(1)
+        self.session.send_line(cmd)
+
+    def match_prompt(self, text: str) -> Tuple[PromptMatch, bool]:
+        """
+        Classify the prompt at the end of `text`.
+        Tries the learned hostname prompt literally first, then the generic
+        patterns. The flag is False for a CLI prompt that only the generic
+        patterns accept while a different hostname is known, i.e. possibly an
+        output line that happens to end in '#' or '>'.
+        """
+        if self.hostname:
+            line = self.detector.last_line(text)
+            if line.startswith(self.hostname):
+                rest = line[len(self.hostname):].strip()
+                if rest in ("#", ">") or (rest.startswith("(") and rest.endswith(")#")):
+                    if self.detector.PROMPT_CONF.search(rest):
+                        prompt_type = PromptType.CONFIG
+                    elif rest.endswith("#"):
+                        prompt_type = PromptType.PRIV
+                    else:
+                        prompt_type = PromptType.USER
+                    return PromptMatch(prompt_type, self.hostname, line), True
+
+        prompt = self.detector.classify(text)
+        trusted = not (prompt.is_cli and self.hostname and prompt.hostname != self.hostname)
+        return prompt, trusted
+
+    def _wait_for_data(self, seconds: float, quiet: float = 0.0):
+        """
+        Pause until the session has new data or `seconds` elapse.
+        Sessions running a background reader wake immediately on new bytes;
+        anything else (including plain test doubles) just sleeps.
+        """
+        wait = getattr(self.session, "wait_for_data", None)
+        if wait is None:
+            time.sleep(seconds)
+            return
+        wait(seconds, quiet=quiet)
 
     def get_prompted(self) -> str:
         # Wake up console and capture prompt
@@ -24,7 +86,7 @@ class CommandRunner:
             time.sleep(0.3) # Give device time to process
             new_out = self.session.read_available()
             out += new_out
-            if self.detector.PROMPT_ANY.search(out):
+            if self.detector.classify(out).is_cli:
                 return out
         
         # If still no prompt, wait more aggressively
@@ -40,17 +102,17 @@ class CommandRunner:
         end_time = time.monotonic() + timeout
 
         while time.monotonic() < end_time:
-            normalized = self.detector.normalize(buf)
-            tail = normalized[-512:]
+            prompt = self.detector.classify(buf)
 
-            if self.detector.PROMPT_ANY.search(tail):
-                return normalized
+            if prompt.is_cli:
+                self.learn_prompt(prompt)
+                return self.detector.normalize(buf)
 
-            if self.detector.PROMPT_USERNAME.search(tail) or self.detector.PROMPT_PWD.search(tail):
+            if prompt.type in (PromptType.USERNAME, PromptType.PASSWORD):
                 raise RuntimeError("Device is at a login/password prompt. Add a Login / Auth step before command steps.")
 
             self.session.send_line("")
-            time.sleep(0.5)
+            self._wait_for_data(0.5, quiet=0.1)
             buf += self.session.read_available()
 
         raise TimeoutError(f"Timed out waking console. Last output seen:\n{buf[-500:]}")
@@ -58,7 +120,9 @@ class CommandRunner:
     def ensure_priv_exec(self, custom_command: Optional[str] = None, password: Optional[str] = None):
         buf = self.get_prompted()
 
-        prompt_type = self.detector.detect(buf)
+        prompt = self.detector.classify(buf)
+        self.learn_prompt(prompt)
+        prompt_type = prompt.type
         if prompt_type == PromptType.PRIV:
             return
         elif prompt_type == PromptType.CONFIG:
@@ -72,7 +136,7 @@ class CommandRunner:
             # Wait for either the priv prompt OR a password prompt
             out = self.session.wait_for(self.detector.PROMPT_PRIV_OR_PWD, timeout=10.0)
             
-            if self.detector.PROMPT_PWD.search(out):
+            if self.detector.classify(out).type == PromptType.PASSWORD:
                 if password:
                     self.session.send_line(password)
                     # Wait for priv prompt after password
@@ -80,7 +144,7 @@ class CommandRunner:
                 else:
                     raise RuntimeError("Enable password prompt detected but no password provided.")
             
-            if not self.detector.PROMPT_PRIV.search(out):
+            if self.detector.classify(out).type not in (PromptType.PRIV, PromptType.CONFIG):
                  raise RuntimeError(f"Unexpected response after '{cmd}':\n{out[-400:]}")
             return
 
@@ -104,8 +168,7 @@ class CommandRunner:
         buf = initial_buffer + self.session.read_available()
         end_time = time.monotonic() + 10.0
         while time.monotonic() < end_time:
-            normalized = self.detector.normalize(buf)
-            if self.detector.PROMPT_USER_PWD_OR_LOGIN.search(normalized):
+            if self.detector.classify(buf).type in LOGIN_STATES:
                 break
 
             self.session.send_line("")
@@ -115,14 +178,16 @@ class CommandRunner:
         # Now handle the state machine
         end_time = time.monotonic() + timeout
         while time.monotonic() < end_time:
-            normalized = self.detector.normalize(buf)
+            prompt = self.detector.classify(buf)
+            prompt_type = prompt.type
             
             # 1. Check if we already have a functional prompt
-            if self.detector.PROMPT_ANY.search(normalized):
+            if prompt_type in CLI_PROMPTS:
+                self.learn_prompt(prompt)
                 return # Authenticated!
             
             # 2. Check for Username prompt
-            if self.detector.PROMPT_USERNAME.search(normalized):
+            if prompt_type == PromptType.USERNAME:
                 if username:
                     self.session.send_line(username)
                     buf = self.session.wait_for(self.detector.PROMPT_USER_PWD_OR_LOGIN, timeout=10.0)
@@ -131,7 +196,7 @@ class CommandRunner:
                     raise RuntimeError("Username prompt detected but no username provided.")
                     
             # 3. Check for Password prompt
-            if self.detector.PROMPT_PWD.search(normalized):
+            if prompt_type == PromptType.PASSWORD:
                 if password:
                     self.session.send_line(password)
                     # Wait longer for password verification as it's often slow
@@ -154,59 +219,100 @@ class CommandRunner:
         Timeout is treated as an idle timeout; long commands may run longer
         while output is still arriving, up to a conservative hard cap.
         """
-        self.session.send_line(cmd)
+        self.send_command(cmd)
+        hard_timeout = max(timeout * 5, timeout + 120.0)
         
-        full_output = ""
+        output, tail = self._collect_until_prompt(hard_timeout, idle_timeout=timeout, on_data=on_data)
+        if output is not None:
+            return output
+                
+        raise TimeoutError(
+            f"Timed out waiting for final prompt after '{cmd}' "
+            f"(no output for {timeout:.0f}s or hard cap {hard_timeout:.0f}s reached).\n"
+            f"Last output seen:\n{tail}"
+        )
+
+    # Size of the rolling window inspected for pager and prompt detection.
+    TAIL_WINDOW = 256
+
+    def _collect_until_prompt(
+        self,
+        hard_timeout: float,
+        idle_timeout: Optional[float] = None,
+        on_data: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[Optional[str], str]:
+        """
+        Read output until a CLI prompt ends it, answering pager prompts on the way.
+        Output is accumulated as a list of normalized lines; per chunk only a
+        bounded tail window is inspected and pager prompts are stripped from
+        that window. The full output is joined once at the end.
+        Returns (output, last 500 chars); output is None on timeout.
+        """
+        stream = StreamingNormalizer()
+        pending_prompt = None
+        # Never wait longer for an unfamiliar prompt than for any output.
+        prompt_quiet = self.prompt_quiet if idle_timeout is None else min(self.prompt_quiet, idle_timeout)
         start_time = time.monotonic()
         last_activity = start_time
-        hard_timeout = max(timeout * 5, timeout + 120.0)
         
         while time.monotonic() - start_time < hard_timeout:
             chunk = self.session.read_available()
             if not chunk:
-                if time.monotonic() - last_activity >= timeout:
+                if pending_prompt and time.monotonic() - last_activity >= prompt_quiet:
+                    # Nothing followed the unfamiliar prompt for prompt_quiet
+                    # seconds, so the device is really waiting there (e.g. it
+                    # was renamed) rather than pausing mid-output. Only a line
+                    # that is nothing but a prompt replaces the learned name;
+                    # an output line like "banner motd #" must not.
+                    if self.detector.HOSTNAME.fullmatch(pending_prompt.line):
+                        self.learn_prompt(pending_prompt)
+                    stream.flush()
+                    return stream.getvalue(), stream.tail(500)
+                if idle_timeout is not None and time.monotonic() - last_activity >= idle_timeout:
                     break
-                time.sleep(0.1)
+                self._wait_for_data(0.1)
                 continue
             
             last_activity = time.monotonic()
             if on_data:
                 on_data(chunk)
 
-            full_output += chunk
-            normalized = self.detector.normalize(full_output)
+            stream.feed(chunk)
+            tail = stream.tail(self.TAIL_WINDOW)
+            prompt, trusted = self.match_prompt(tail)
+            pending_prompt = None
             
-            # 1. Check for pagination prompt
-            # Use small tail but search with the pagination regex
-            tail_len = 256
-            tail = normalized[-tail_len:]
-            
-            if self.detector.PROMPT_PAGINATION.search(tail):
+            # 1. Prioritize the pager over the final prompt
+            if prompt.type == PromptType.PAGER:
                 # Send space to continue
                 self.session.send(" ")
                 
-                # Try to clean up the pager prompt from the buffer
-                # This makes the final output cleaner
-                matches = list(self.detector.PROMPT_PAGINATION.finditer(normalized))
-                if matches:
-                    last_match = matches[-1]
-                    # Only remove if it's within the last chunk-ish to avoid data loss
-                    if last_match.start() > len(normalized) - 128:
-                        full_output = normalized[:last_match.start()]
+                # Clean up the pager prompt so the final output reads cleanly
+                self._strip_pager(stream, tail)
                 
-                time.sleep(0.2) # Wait for device to react
+                self._wait_for_data(0.2) # Wait for device to react
                 continue 
             
-            # 2. Check for final exec prompt only if no pager was detected.
+            # 2. Then check for the final prompt.
             # Verification commands may run from user exec mode on Cisco (">").
-            if self.detector.PROMPT_ANY.search(normalized[-256:]):
-                return self.detector.normalize(full_output)
-                
-        raise TimeoutError(
-            f"Timed out waiting for final prompt after '{cmd}' "
-            f"(no output for {timeout:.0f}s or hard cap {hard_timeout:.0f}s reached).\n"
-            f"Last output seen:\n{full_output[-500:]}"
-        )
+            if prompt.is_cli:
+                if not trusted:
+                    pending_prompt = prompt
+                    continue
+                self.learn_prompt(prompt)
+                stream.flush()
+                return stream.getvalue(), stream.tail(500)
+
+        return None, stream.tail(500)
+
+    def _strip_pager(self, stream: StreamingNormalizer, tail: str):
+        """Remove a pager prompt found in `tail` from the end of the normalized stream."""
+        matches = list(self.detector.PROMPT_PAGINATION.finditer(tail))
+        if matches:
+            last_match = matches[-1]
+            # Only remove if it's within the last chunk-ish to avoid data loss
+            if last_match.start() > len(tail) - 128:
+                stream.truncate(len(stream) - len(tail) + last_match.start())
 
     def enter_config_mode(self, custom_command: Optional[str] = None):
         self.ensure_priv_exec()
@@ -244,41 +350,101 @@ class CommandRunner:
 
     def wait_for_prompt(self, timeout: float = 15.0, on_data: Optional[Callable[[str], None]] = None) -> str:
         """Wait for any valid prompt to appear and return the normalized buffer."""
-        full_output = ""
-        end_time = time.monotonic() + timeout
-        
-        while time.monotonic() < end_time:
+        output, tail = self._collect_until_prompt(timeout, on_data=on_data)
+        if output is not None:
+            return output
+                
+        raise TimeoutError(f"Timed out waiting for prompt. Last output seen:\n{tail}")
+
+    def run_pipelined(
+        self,
+        commands: List[str],
+        window: int = 8,
+        timeout: float = 15.0,
+        on_data: Optional[Callable[[str], None]] = None,
+    ) -> List[Dict[str, Optional[str]]]:
+        """
+        Send config commands without waiting for each prompt, keeping at most
+        `window` commands unacknowledged. Echoes and prompts are matched back to
+        the commands afterwards using the learned hostname: every prompt at the
+        start of a line closes the response of one command.
+        Timeout is an idle timeout.
+        Returns [{command, output, error}] in command order.
+        """
+        if not self.hostname:
+            # Without a known prompt we cannot split the stream reliably.
+            results = []
+            for cmd in commands:
+                self.send_command(cmd)
+                output = self.wait_for_prompt(timeout=timeout, on_data=on_data)
+                results.append({"command": cmd, "output": output, "error": self.check_for_errors(output)})
+            return results
+
+        # Prompts may use the old or, after a hostname command, the new name.
+        names = {self.hostname}
+        for cmd in commands:
+            m = self.HOSTNAME_COMMAND.match(cmd)
+            if m:
+                names.add(m.group(1))
+        alternatives = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+        prompt_re = re.compile(rf"(?:{alternatives})(?:\([^)]*\))?\s*[>#]")
+
+        outputs: List[str] = []
+        segment: List[str] = []
+        stream = StreamingNormalizer()
+        line_idx = 0
+        sent = 0
+        current_counted = False
+        last_activity = time.monotonic()
+
+        while len(outputs) < len(commands):
+            while sent < len(commands) and sent - len(outputs) < window:
+                self.send_command(commands[sent])
+                sent += 1
+
             chunk = self.session.read_available()
             if not chunk:
-                time.sleep(0.1)
+                if time.monotonic() - last_activity >= timeout:
+                    raise TimeoutError(
+                        f"Timed out in pipelined push after {len(outputs)}/{len(commands)} "
+                        f"acknowledged commands. Last output seen:\n{stream.tail(500)}"
+                    )
+                self._wait_for_data(0.1)
                 continue
-            
+
+            last_activity = time.monotonic()
             if on_data:
                 on_data(chunk)
+            stream.feed(chunk)
 
-            full_output += chunk
-            normalized = self.detector.normalize(full_output)
-            tail = normalized[-256:]
-            
-            # 1. Prioritize Pager
-            if self.detector.PROMPT_PAGINATION.search(tail):
-                self.session.send(" ")
-                
-                # Cleanup pager prompt
-                matches = list(self.detector.PROMPT_PAGINATION.finditer(normalized))
-                if matches:
-                    last_match = matches[-1]
-                    if last_match.start() > len(normalized) - 128:
-                        full_output = normalized[:last_match.start()]
-                
-                time.sleep(0.2)
-                continue
-                
-            # 2. Then check for final prompt
-            if self.detector.PROMPT_ANY.search(tail):
-                return normalized
-                
-        raise TimeoutError(f"Timed out waiting for prompt. Last output seen:\n{full_output[-500:]}")
+            for line in stream.lines(line_idx):
+                m = prompt_re.match(line)
+                if m and current_counted:
+                    # Prompt already counted while it was the open line; the
+                    # rest is the echo of the next command.
+                    current_counted = False
+                    segment = [line[m.end():]]
+                elif m and len(outputs) < len(commands):
+                    outputs.append("".join(segment))
+                    segment = [line[m.end():]]
+                else:
+                    segment.append(line)
+            line_idx = stream.line_count
+
+            # A bare prompt on the open line acknowledges a command before the
+            # next echo terminates that line.
+            current = stream.current_line()
+            m = prompt_re.match(current)
+            if m and not current_counted and not current[m.end():].strip() and len(outputs) < sent:
+                outputs.append("".join(segment))
+                segment = []
+                current_counted = True
+
+        self.learn_prompt(self.detector.classify(stream.tail(self.TAIL_WINDOW)))
+        return [
+            {"command": cmd, "output": out, "error": self.check_for_errors(out)}
+            for cmd, out in zip(commands, outputs)
+        ]
 
     def check_for_errors(self, buffer: str) -> Optional[str]:
         """Look for common error patterns in the output buffer."""
@@ -0,0 +1,108 @@
+import re
+from typing import List, NamedTuple, Optional
+
+# Lines that carry no configuration. "exit" only closes a section (HP/Aruba
+# running-config prints it); the planner emits its own exits.
+NOISE = re.compile(r"^(?:!.*|#.*|end|exit|Building configuration.*|Current configuration.*|Running configuration.*)$", re.I)
+
+
+class ConfigSection:
+    """
+    One line of an indentation-structured config plus its child lines,
+    e.g. "interface Gi1/0/1" with " description uplink" below it.
+    """
+
+    def __init__(self, line: str = "", depth: int = -1):
+        self.line = line
+        self.depth = depth
+        self.children: List["ConfigSection"] = []
+        self._index = {}
+
+    @staticmethod
+    def key(line: str) -> str:
+        """Comparison key: whitespace-insensitive."""
+        return " ".join(line.split())
+
+    def add(self, child: "ConfigSection"):
+        self.children.append(child)
+        self._index.setdefault(self.key(child.line), child)
+
+    def find(self, line: str) -> Optional["ConfigSection"]:
+        return self._index.get(self.key(line))
+
+    def walk(self):
+        """Yield this section's descendants in config order."""
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+
+def parse_config(text: str) -> ConfigSection:
+    """
+    Parse Cisco/HP/Aruba style config text into a section tree based on
+    indentation. Blank lines, comments and banners like "Building
+    configuration..." are ignored.
+    """
+    root = ConfigSection()
+    stack = [root]
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        stripped = line.strip()
+        if not stripped or NOISE.match(stripped):
+            continue
+        depth = len(line) - len(line.lstrip())
+        while len(stack) > 1 and stack[-1].depth >= depth:
+            stack.pop()
+        section = ConfigSection(stripped, depth)
+        stack[-1].add(section)
+        stack.append(section)
+    return root
+
+
+class PushPlan(NamedTuple):
+    commands: List[str]
+    total: int      # configuration lines in the desired config
+    skipped: int    # of those, already present on the device
+
+
+def plan_config_push(running_config: str, desired_config: str) -> PushPlan:
+    """
+    Diff the desired config against the captured running config and return the
+    commands needed to apply only missing or changed lines. Missing children are
+    sent inside their parent section, followed by "exit" to return to the
+    parent context.
+    """
+    running = parse_config(running_config)
+    desired = parse_config(desired_config)
+    commands: List[str] = []
+    skipped = 0
+
+    def emit_all(section: ConfigSection):
+        commands.append(section.line)
+        for child in section.children:
+            emit_all(child)
+        if section.children:
+            commands.append("exit")
+
+    def emit_missing(want: ConfigSection, have: ConfigSection):
+        nonlocal skipped
+        for child in want.children:
+            existing = have.find(child.line)
+            if existing is None:
+                emit_all(child)
+                continue
+
+            skipped += 1
+            if child.children:
+                commands.append(child.line)
+                entered_at = len(commands)
+                emit_missing(child, existing)
+                if len(commands) == entered_at:
+                    # Section already compliant; no need to enter it.
+                    commands.pop()
+                else:
+                    commands.append("exit")
+
+    emit_missing(desired, running)
+    total = sum(1 for _ in desired.walk())
+    return PushPlan(commands, total, skipped)
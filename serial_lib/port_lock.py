@@ -0,0 +1,203 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Lock files live here; one per physical serial device.
+LOCK_DIR = os.getenv("PORT_LOCK_DIR", "/tmp/switchconfig-port-locks")
+
+# Kernel list of held file locks (Linux), read to check a lease without taking it.
+PROC_LOCKS = "/proc/locks"
+
+
+class PortBusyError(RuntimeError):
+    pass
+
+
+def lock_path(port_path: str, lock_dir: Optional[str] = None) -> str:
+    """Lock file for a port. Symlinks (~/portN) resolve to the real device."""
+    real = os.path.realpath(os.path.expanduser(port_path))
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", real.strip("/"))
+    return os.path.join(lock_dir or LOCK_DIR, f"{name}.lock")
+
+
+class PortLease:
+    """
+    Exclusive, cross-process lease on a serial port.
+
+    Backed by flock() on a per-device lock file, so the kernel releases the
+    lease when the holder exits or crashes; no lease can outlive its process.
+    The holder description and a heartbeat timestamp are kept in the lock
+    file so other processes can report who holds a port and for how long.
+    Flock locks conflict between separate open() calls even inside one
+    process, so threads of the same worker are serialized as well.
+    """
+
+    def __init__(self, port_path: str, owner: str, heartbeat_interval: float = 5.0, lock_dir: Optional[str] = None):
+        self.port_path = port_path
+        self.owner = owner
+        self.heartbeat_interval = heartbeat_interval
+        self.lock_dir = lock_dir
+        self.path = lock_path(port_path, lock_dir)
+        self._fd: Optional[int] = None
+        self._since = 0.0
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, wait: float = 0.0, poll: float = 0.2) -> "PortLease":
+        """
+        Take the lease, waiting up to `wait` seconds behind the current holder.
+        Raises PortBusyError if the port is still held afterwards.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        end = time.monotonic() + wait
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= end:
+                    os.close(fd)
+                    holder = read_holder(self.port_path, self.lock_dir)
+                    by = f" (held by {holder['owner']})" if holder else ""
+                    raise PortBusyError(f"Port busy: {self.port_path}{by}")
+                time.sleep(poll)
+
+        self._fd = fd
+        self._since = time.time()
+        self._write_info()
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop, name=f"port-lease-{self.port_path}", daemon=True
+        )
+        self._heartbeat_thread.start()
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=1.0)
+            self._heartbeat_thread = None
+        fd, self._fd = self._fd, None
+        try:
+            os.ftruncate(fd, 0)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _write_info(self):
+        info = json.dumps({
+            "owner": self.owner,
+            "pid": os.getpid(),
+            "since": self._since,
+            "heartbeat": time.time(),
+        }).encode()
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, info, 0)
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            fd = self._fd
+            if fd is None:
+                return
+            try:
+                self._write_info()
+            except OSError:
+                return
+
+    def __enter__(self):
+        if not self.held:
+            self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+def _listed_flock(path: str) -> Optional[bool]:
+    """
+    Whether PROC_LOCKS lists a flock on `path`, or None if it cannot be read.
+    Entries look like "1: FLOCK  ADVISORY  WRITE 7050 fe:00:13533235 0 EOF"
+    (device major:minor in hex, then the inode); waiters ("->") are skipped.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    target = (os.major(st.st_dev), os.minor(st.st_dev), st.st_ino)
+    try:
+        with open(PROC_LOCKS) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 6 or fields[1] != "FLOCK":
+                    continue
+                major, minor, inode = fields[5].split(":")
+                if (int(major, 16), int(minor, 16), int(inode)) == target:
+                    return True
+    except (OSError, ValueError):
+        return None
+    return False
+
+
+def is_port_busy(port_path: str, lock_dir: Optional[str] = None) -> bool:
+    """
+    True if some process currently holds the lease for this port.
+
+    The kernel's lock list is read so the check never takes the lock itself.
+    Where that list is unavailable the check briefly takes the lock instead,
+    and a PortLease.acquire() racing it with wait=0 can then fail spuriously.
+    """
+    path = lock_path(port_path, lock_dir)
+    listed = _listed_flock(path)
+    if listed is not None:
+        return listed
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+def read_holder(port_path: str, lock_dir: Optional[str] = None) -> Optional[dict]:
+    """Return {owner, pid, since, heartbeat} of the current holder, or None if free."""
+    if not is_port_busy(port_path, lock_dir):
+        return None
+    try:
+        with open(lock_path(port_path, lock_dir), "rb") as f:
+            data = f.read()
+        # The holder may not have written its description yet.
+        return json.loads(data) if data else {"owner": "unknown"}
+    except (OSError, ValueError):
+        return {"owner": "unknown"}
+
+
+@contextmanager
+def exclusive(name: str, lock_dir: Optional[str] = None):
+    """Blocking process-wide mutex named `name`, e.g. around the job scheduler."""
+    path = os.path.join(lock_dir or LOCK_DIR, f"{name}.lock")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
@@ -1,12 +1,185 @@
 import re
 from enum import Enum, auto
-from typing import Optional, Dict
+from typing import Optional, Dict, List, NamedTuple
 
 class PromptType(Enum):
     USER = auto()       # >
     PRIV = auto()       # #
     CONFIG = auto()     # (config)# or similar
     UNKNOWN = auto()
+    USERNAME = auto()   # Login: / Username:
+    PASSWORD = auto()   # Password:
+    PAGER = auto()      # --More-- and friends
+
+CLI_PROMPTS = frozenset({PromptType.USER, PromptType.PRIV, PromptType.CONFIG})
+
+class PromptMatch(NamedTuple):
+    """Result of PromptDetector.classify()."""
+    type: PromptType
+    hostname: Optional[str] = None
+    line: str = ""
+
+    @property
+    def is_cli(self) -> bool:
+        """True for a usable exec/config prompt."""
+        return self.type in CLI_PROMPTS
+
+class StreamingNormalizer:
+    """
+    Incremental terminal line-discipline emulator used to normalize CLI output.
+
+    Each raw chunk is processed exactly once, so cost is linear in output size.
+    The current line is kept as a character stack with a cursor:
+    - printable text overwrites at the cursor (appends at end of line)
+    - backspace erases the last character, or moves left if the cursor was
+      moved back into the line
+    - a lone CR returns to column 0 so following text overwrites the line
+      (pager prompts erased with CR + spaces disappear); LF ends the line
+    - CSI cursor moves (CUB/CUF/CHA) and erase-in-line (EL) are applied,
+      all other escape sequences and control characters are dropped
+    Escape sequences split across chunk boundaries are held back until complete.
+    """
+
+    # An escape sequence that has started but not yet been terminated.
+    ANSI_PARTIAL = re.compile(r'\x1b(?:[@-_][0-?]*[ -/]*)?\Z')
+    # Printable runs (tabs included), complete escape sequences, or a single
+    # line-discipline character. Other control characters are skipped by finditer.
+    TOKEN = re.compile(
+        r'[^\x00-\x08\x0a-\x1f\x7f]+'
+        r'|\x1b\[[0-?]*[ -/]*[@-~]'
+        r'|\x1b[@-_][0-?]*[ -/]*[@-~]'
+        r'|[\x08\r\n]'
+    )
+
+    def __init__(self):
+        self._pending = ""
+        self._done: List[str] = []
+        self._done_len = 0
+        self._line: List[str] = []
+        self._col = 0
+
+    def __len__(self) -> int:
+        return self._done_len + len(self._line)
+
+    def feed(self, chunk: str):
+        """Consume a raw chunk of device output."""
+        data = self._pending + chunk
+        self._pending = ""
+        if "\x1b" in data[-64:]:
+            partial = self.ANSI_PARTIAL.search(data, max(0, len(data) - 64))
+            if partial:
+                self._pending = data[partial.start():]
+                data = data[:partial.start()]
+        self._consume(data)
+
+    def flush(self):
+        """Process any held-back partial escape sequence as plain input."""
+        data, self._pending = self._pending, ""
+        self._consume(data)
+
+    def _consume(self, data: str):
+        line = self._line
+        for m in self.TOKEN.finditer(data):
+            token = m.group()
+            c = token[0]
+            if c == "\n":
+                self._commit_line()
+            elif c == "\r":
+                self._col = 0
+            elif c == "\x08":
+                if self._col == len(line):
+                    if line:
+                        line.pop()
+                        self._col -= 1
+                elif self._col > 0:
+                    self._col -= 1
+            elif c == "\x1b":
+                if token[1] == "[":
+                    self._apply_csi(token[2:-1], token[-1])
+            elif self._col == len(line):
+                line.extend(token)
+                self._col += len(token)
+            else:
+                line[self._col:self._col + len(token)] = token
+                self._col += len(token)
+
+    def _apply_csi(self, params: str, final: str):
+        line = self._line
+        n = int(params) if params.isdigit() else 0
+        if final == "D":
+            self._col = max(0, self._col - max(n, 1))
+        elif final == "C":
+            self._col += max(n, 1)
+            if self._col > len(line):
+                line.extend(" " * (self._col - len(line)))
+        elif final == "G":
+            self._col = max(n, 1) - 1
+            if self._col > len(line):
+                line.extend(" " * (self._col - len(line)))
+        elif final == "K":
+            if n == 0:
+                del line[self._col:]
+            elif n == 1:
+                line[:self._col] = " " * min(self._col, len(line))
+            elif n == 2:
+                line[:] = " " * self._col
+
+    def _commit_line(self):
+        text = "".join(self._line) + "\n"
+        self._line.clear()
+        self._col = 0
+        self._done.append(text)
+        self._done_len += len(text)
+
+    @property
+    def line_count(self) -> int:
+        """Number of completed pieces (each ending in a newline)."""
+        return len(self._done)
+
+    def lines(self, start: int = 0) -> List[str]:
+        """Return completed pieces from index `start` on."""
+        return self._done[start:]
+
+    def current_line(self) -> str:
+        """Return the current, not yet terminated line."""
+        return "".join(self._line)
+
+    def getvalue(self) -> str:
+        """Return the full normalized text seen so far."""
+        return "".join(self._done) + "".join(self._line)
+
+    def tail(self, n: int) -> str:
+        """Return the last n normalized characters without joining the whole buffer."""
+        if n <= 0:
+            return ""
+        parts = ["".join(self._line[-n:])]
+        size = len(parts[0])
+        for piece in reversed(self._done):
+            if size >= n:
+                break
+            parts.append(piece)
+            size += len(piece)
+        text = "".join(reversed(parts))
+        return text[-n:]
+
+    def truncate(self, length: int):
+        """Discard normalized text beyond `length` characters (e.g. a pager prompt)."""
+        if length >= self._done_len:
+            del self._line[length - self._done_len:]
+            self._col = len(self._line)
+            return
+        self._line.clear()
+        while self._done and self._done_len > length:
+            piece = self._done.pop()
+            self._done_len -= len(piece)
+        keep = piece[:length - self._done_len]
+        head, sep, rest = keep.rpartition("\n")
+        if sep:
+            self._done.append(head + sep)
+            self._done_len += len(head) + 1
+        self._line.extend(rest)
+        self._col = len(self._line)
+
 
 class PromptDetector:
     """
@@ -17,10 +190,10 @@ class PromptDetector:
     # Default Cisco IOS patterns (fallback)
     # Note: Global flags like (?im) are moved to re.compile to avoid 'global flags not at start' errors.
     DEFAULT_PATTERNS = {
-        "user": r".*?>\s*\Z",
-        "priv": r"(?:^|[\r\n]).*?#\s*\Z",
-        "config": r".*?\(config[^\)]*\)#\s*\Z",
-        "any": r".*?[>#]\s*\Z",
+        "user": r">\s*\Z",
+        "priv": r"#\s*\Z",
+        "config": r"\(config[^\)]*\)#\s*\Z",
+        "any": r"[>#]\s*\Z",
         "username": r"(?:[Ll]ogin|[Uu]sername|[Uu]ser [Nn]ame|[Uu]ser|[Uu]ser-[Nn]ame)\s*:\s*\Z",
         "password": r"(?:[Pp]assword|[Pp]asswd|[Pp]ass)\s*:\s*\Z",
         "pagination": r"-+\s*more\s*-+\s*(?:\([^)]*\)?)?|^\s*more\s*:|press\s+any\s+key|press\s+enter|hit\s+any\s+key|q\s*=\s*quit|space\s*bar\s*to\s+continue|next\s+page|\[\s*more\s*\]"
@@ -51,42 +224,78 @@ class PromptDetector:
         # Combined patterns for state transitions
         self.PROMPT_PRIV_OR_PWD = re.compile(f"({p['priv']})|({p['password']})", re.MULTILINE)
         self.PROMPT_USER_PWD_OR_LOGIN = re.compile(f"({p['any']})|({p['password']})|({p['username']})", re.MULTILINE)
+
+        # Single-pass classifier applied to the last line only. Alternatives are
+        # tried in priority order (each with its own lazy prefix), so e.g. a
+        # config prompt wins over the plain priv pattern that also matches it.
+        groups = [
+            ("pager", f"(?i:{p['pagination']})"),
+            ("config", p["config"]),
+            ("priv", p["priv"]),
+            ("user", p["user"]),
+            ("username", p["username"]),
+            ("password", p["password"]),
+        ]
+        self.PROMPT_CLASSIFIER = re.compile(
+            "|".join(f"(?:.*?(?P<{name}>{pattern}))" for name, pattern in groups),
+            re.MULTILINE,
+        )
+
+    # Only this many trailing characters are ever inspected by classify().
+    CLASSIFY_WINDOW = 512
+
+    _GROUP_TYPES = {
+        "pager": PromptType.PAGER,
+        "config": PromptType.CONFIG,
+        "priv": PromptType.PRIV,
+        "user": PromptType.USER,
+        "username": PromptType.USERNAME,
+        "password": PromptType.PASSWORD,
+    }
+
+    # Hostname in front of the prompt character, e.g. "sw-core-07" in
+    # "sw-core-07(config-if)#" or "X440-G2.1 # ".
+    HOSTNAME = re.compile(r"([^\s>#()]+)(?:\([^)]*\))?\s*[>#]\s*\Z")
     
     @staticmethod
     def normalize(text: str) -> str:
         """
-        Normalize CLI output by stripping ANSI codes, backspaces, and normalizing newlines.
+        Normalize CLI output by stripping ANSI codes, resolving backspaces and
+        carriage-return overwrites, and normalizing newlines. Single pass; see
+        StreamingNormalizer for the exact terminal semantics.
         """
-        # Strip ANSI escape sequences
-        text = re.sub(r'\x1b\[[0-?]*[ -/]*[@-~]', '', text)
-        text = re.sub(r'\x1b[@-_][0-?]*[ -/]*[@-~]', '', text)
-        
-        # Handle backspaces (repeatedly apply to handle multiple backspaces)
-        while '\x08' in text:
-            new_text = re.sub(r'.\x08', '', text, count=1)
-            if new_text == text:
-                text = text.replace('\x08', '')
-                break
-            text = new_text
+        stream = StreamingNormalizer()
+        stream.feed(text)
+        stream.flush()
+        return stream.getvalue()
+
+    @staticmethod
+    def last_line(buffer: str, window: int = CLASSIFY_WINDOW) -> str:
+        """Return the last non-blank line of the normalized buffer tail."""
+        tail = PromptDetector.normalize(buffer[-window:]).rstrip()
+        return tail[tail.rfind("\n") + 1:]
 
-        # Normalize CRLF to LF
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    def classify(self, buffer: str) -> PromptMatch:
+        """
+        Classify the prompt at the end of the buffer in one regex pass over its
+        last line. Cost is independent of the buffer size.
+        """
+        line = self.last_line(buffer)
+        m = self.PROMPT_CLASSIFIER.match(line)
+        if not m:
+            return PromptMatch(PromptType.UNKNOWN, None, line)
 
-        # Remove remaining non-printing control characters while preserving
-        # newlines and tabs. Some serial CLIs decorate pager prompts with these.
-        text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
-        
-        return text
+        prompt_type = self._GROUP_TYPES[m.lastgroup]
+        hostname = None
+        if prompt_type in CLI_PROMPTS:
+            host = self.HOSTNAME.search(line)
+            if host:
+                hostname = host.group(1)
+        return PromptMatch(prompt_type, hostname, line)
 
     def detect(self, buffer: str) -> PromptType:
         """
         Analyze the end of the buffer to determine the current prompt state.
         """
-        normalized = self.normalize(buffer)
-        if self.PROMPT_CONF.search(normalized):
-            return PromptType.CONFIG
-        if self.PROMPT_PRIV.search(normalized):
-            return PromptType.PRIV
-        if self.PROMPT_USER.search(normalized):
-            return PromptType.USER
-        return PromptType.UNKNOWN
+        prompt_type = self.classify(buffer).type
+        return prompt_type if prompt_type in CLI_PROMPTS else PromptType.UNKNOWN
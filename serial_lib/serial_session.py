@@ -5,7 +5,15 @@ import threading
 from typing import Optional
 
 class SerialSession:
-    def __init__(self, port: str, baud: int = 9600, timeout: float = 0.2):
+    def __init__(self, port: str, baud: int = 9600, timeout: float = 0.2, background_reader: bool = False):
+        """
+        Args:
+            port: Serial device path
+            baud: Baud rate
+            timeout: Read timeout of the underlying port (seconds)
+            background_reader: Drain the port from a reader thread into an internal
+                buffer and wake waiters as soon as bytes arrive instead of sleep-polling.
+        """
         self.port = port
         self.baud = baud
         self.timeout = timeout
@@ -13,6 +21,15 @@ class SerialSession:
         self.write_delay = 0.02
         self.lock = threading.Lock()
 
+        self.background_reader = background_reader
+        self.max_buffer = 1024 * 1024
+        self._rx_buffer = bytearray()
+        self._rx_cond = threading.Condition()
+        self._rx_stamp = 0.0
+        self._reader_error: Optional[BaseException] = None
+        self._reader_stop = threading.Event()
+        self._reader_thread: Optional[threading.Thread] = None
+
     def connect(self):
         self.ser = serial.Serial(
             self.port,
@@ -22,15 +39,114 @@ class SerialSession:
             dsrdtr=False,
             xonxoff=False,
         )
+        if self.background_reader:
+            self._start_reader()
 
     def disconnect(self):
+        self._stop_reader()
         if self.ser and self.ser.is_open:
             self.ser.close()
         self.ser = None
 
+    # --- Background reader ---
+
+    def _start_reader(self):
+        self._reader_stop.clear()
+        self._reader_error = None
+        with self._rx_cond:
+            self._rx_buffer.clear()
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop,
+            name=f"serial-reader-{self.port}",
+            daemon=True,
+        )
+        self._reader_thread.start()
+
+    def _stop_reader(self):
+        if not self._reader_thread:
+            return
+        self._reader_stop.set()
+        # The reader blocks at most `timeout` seconds in ser.read().
+        self._reader_thread.join(timeout=self.timeout + 1.0)
+        self._reader_thread = None
+        with self._rx_cond:
+            self._rx_cond.notify_all()
+
+    def _reader_loop(self):
+        ser = self.ser
+        while not self._reader_stop.is_set():
+            try:
+                # Block for the first byte (bounded by the port timeout), then
+                # take whatever else is already queued in the driver.
+                b = ser.read(max(1, ser.in_waiting))
+            except Exception as e:
+                with self._rx_cond:
+                    self._reader_error = e
+                    self._rx_cond.notify_all()
+                return
+            if not b:
+                continue
+            with self._rx_cond:
+                self._rx_buffer.extend(b)
+                overflow = len(self._rx_buffer) - self.max_buffer
+                if overflow > 0:
+                    # Nobody is consuming; keep the newest output only.
+                    del self._rx_buffer[:overflow]
+                self._rx_stamp = time.monotonic()
+                self._rx_cond.notify_all()
+
+    def _take(self, max_bytes: Optional[int] = None) -> str:
+        with self._rx_cond:
+            if self._reader_error and not self._rx_buffer:
+                raise self._reader_error
+            if max_bytes is None or max_bytes >= len(self._rx_buffer):
+                b = bytes(self._rx_buffer)
+                self._rx_buffer.clear()
+            else:
+                b = bytes(self._rx_buffer[:max_bytes])
+                del self._rx_buffer[:max_bytes]
+        return b.decode(errors="replace") if b else ""
+
+    def wait_for_data(self, timeout: float, quiet: float = 0.0) -> bool:
+        """
+        Block until unread data is buffered or `timeout` expires.
+        With `quiet` > 0, additionally wait until the line has been idle for that
+        long, so callers see a complete burst (e.g. a full prompt) rather than its
+        first bytes. Without a background reader this simply sleeps `timeout`.
+        Returns True if unread data is available.
+        """
+        if not self.background_reader:
+            time.sleep(timeout)
+            return False
+
+        end = time.monotonic() + timeout
+        with self._rx_cond:
+            while True:
+                if self._reader_error:
+                    return bool(self._rx_buffer)
+                now = time.monotonic()
+                remaining = end - now
+                if self._rx_buffer:
+                    idle = now - self._rx_stamp
+                    if idle >= quiet:
+                        return True
+                    wait_time = quiet - idle
+                else:
+                    wait_time = remaining
+                if remaining <= 0:
+                    return bool(self._rx_buffer)
+                self._rx_cond.wait(min(wait_time, remaining))
+
+    # --- Reading ---
+
     def read_available(self) -> str:
         if not self.ser:
             raise RuntimeError("Serial port not open")
+        if self.background_reader:
+            # Same worst-case latency as a direct read, but returns as soon as
+            # any bytes arrive instead of blocking for the full port timeout.
+            self.wait_for_data(self.timeout)
+            return self._take()
         with self.lock:
             b = self.ser.read(4096)
         return b.decode(errors="replace") if b else ""
@@ -38,6 +154,8 @@ class SerialSession:
     def read_pending(self, max_bytes: int = 4096) -> str:
         if not self.ser:
             raise RuntimeError("Serial port not open")
+        if self.background_reader:
+            return self._take(max_bytes)
         waiting = self.ser.in_waiting
         if waiting <= 0:
             return ""
@@ -48,11 +166,17 @@ class SerialSession:
     def read(self, size: int = 1) -> str:
         if not self.ser:
             raise RuntimeError("Serial port not open")
+        if self.background_reader:
+            self.wait_for_data(self.timeout)
+            return self._take(size)
         with self.lock:
             b = self.ser.read(size)
         return b.decode(errors="replace") if b else ""
 
     def drain(self, seconds: float = 0.8) -> str:
+        if self.background_reader:
+            time.sleep(seconds)
+            return self._take()
         end = time.monotonic() + seconds
         out = []
         while time.monotonic() < end:
@@ -60,6 +184,8 @@ class SerialSession:
             time.sleep(0.05)
         return "".join(out)
 
+    # --- Writing ---
+
     def send_line(self, line: str):
         if not self.ser:
             raise RuntimeError("Serial port not open")
@@ -91,7 +217,10 @@ class SerialSession:
             buf += self.read_available()
             if pattern.search(buf):
                 return buf
-            time.sleep(0.05)
+            if self.background_reader:
+                self.wait_for_data(end - time.monotonic())
+            else:
+                time.sleep(0.05)
         raise TimeoutError(f"Timed out waiting for: {pattern.pattern}\n--- buffer ---\n{buf[-2000:]}")
 
     def __enter__(self):
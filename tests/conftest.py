@@ -0,0 +1,85 @@
+"""
+Shared test setup.
+
+Unit tests run without a broker or a database: Celery and the backend's
+database/models modules are replaced by stubs before any test module
+imports the backend. Tests that need the real database take the
+`sqlite_backend` fixture instead.
+"""
+import importlib
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class CeleryStub:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def task(self, *args, **kwargs):
+        def decorator(func):
+            func.delay = MagicMock(name=f"{func.__name__}.delay")
+            func.apply_async = MagicMock(name=f"{func.__name__}.apply_async")
+            return func
+
+        return decorator
+
+
+class SignalStub:
+    def connect(self, func):
+        return func
+
+
+celery_stub = types.ModuleType("celery")
+celery_stub.Celery = CeleryStub
+celery_signals_stub = types.ModuleType("celery.signals")
+celery_signals_stub.worker_ready = SignalStub()
+sys.modules.setdefault("celery", celery_stub)
+sys.modules.setdefault("celery.signals", celery_signals_stub)
+
+database_stub = types.ModuleType("backend.database")
+database_stub.SessionLocal = MagicMock()
+database_stub.write_session = MagicMock()
+models_stub = types.ModuleType("backend.models")
+models_stub.Setting = object
+models_stub.JobTarget = object
+sys.modules.setdefault("backend.database", database_stub)
+sys.modules.setdefault("backend.models", models_stub)
+
+
+def _backend_modules() -> dict:
+    return {name: module for name, module in sys.modules.items() if name == "backend" or name.startswith("backend.")}
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    """
+    The real backend package on a fresh SQLite file, with events on the
+    in-process bus and port locks under tmp_path. The stubbed backend
+    modules are set aside for the test and restored afterwards, so import
+    backend modules inside the test. Yields the database and models modules.
+    """
+    from serial_lib import port_lock
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setenv("EVENTS_URL", "memory://")
+    monkeypatch.setattr(port_lock, "LOCK_DIR", str(tmp_path / "locks"))
+
+    stubbed = _backend_modules()
+    for name in stubbed:
+        del sys.modules[name]
+    try:
+        database = importlib.import_module("backend.database")
+        models = importlib.import_module("backend.models")
+        database.Base.metadata.create_all(bind=database.engine)
+        yield types.SimpleNamespace(database=database, models=models)
+        database.engine.dispose()
+    finally:
+        for name in _backend_modules():
+            del sys.modules[name]
+        sys.modules.update(stubbed)
@@ -0,0 +1,206 @@
+import asyncio
+import csv
+import datetime
+import io
+import json
+import time
+
+import pytest
+
+pytest.importorskip("httpx")
+
+STEPS = [{"type": "command", "content": "hostname {{ hostname }}"}]
+SCHEMA = {"properties": {"hostname": {"type": "string"}}, "required": ["hostname"]}
+
+
+@pytest.fixture
+def client(sqlite_backend):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend.routers import dashboard, jobs, settings
+
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.include_router(dashboard.router)
+    app.include_router(settings.router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(sqlite_backend):
+    session = sqlite_backend.database.SessionLocal()
+    yield session
+    session.close()
+
+
+def add_template(db, models, name="vlan"):
+    template = models.Template(name=name, steps=STEPS, config_schema=SCHEMA, verification=[])
+    db.add(template)
+    db.commit()
+    return template
+
+
+def add_job(db, models, template, targets, status="queued", created_at=None):
+    job = models.Job(template_id=template.id, status=status, created_at=created_at or datetime.datetime.utcnow())
+    db.add(job)
+    db.flush()
+    for port, variables, target_status, results in targets:
+        db.add(models.JobTarget(
+            job_id=job.id, port=port, variables=variables, status=target_status, verification_results=results,
+        ))
+    db.commit()
+    return job
+
+
+def test_bulk_job_from_csv(client, db, sqlite_backend):
+    from backend import worker
+
+    models = sqlite_backend.models
+    template = add_template(db, models)
+    body = "port,hostname\n1,sw-1\n2,sw-2\n"
+    response = client.post(f"/jobs/bulk?template_id={template.id}", content=body, headers={"content-type": "text/csv"})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["targets_created"] == 2 and result["errors"] == []
+    targets = db.query(models.JobTarget).filter(models.JobTarget.job_id == result["job_id"]).order_by(models.JobTarget.id).all()
+    assert [(t.port, t.variables, t.status) for t in targets] == [
+        ("~/port1", {"hostname": "sw-1"}, "queued"),
+        ("~/port2", {"hostname": "sw-2"}, "queued"),
+    ]
+    worker.execute_job.delay.assert_called_once_with(result["job_id"])
+
+
+def test_bulk_job_rejects_invalid_rows(client, db, sqlite_backend):
+    models = sqlite_backend.models
+    template = add_template(db, models)
+    body = "port,hostname\n1,sw-1\n2,\n"
+    response = client.post(f"/jobs/bulk?template_id={template.id}", content=body, headers={"content-type": "text/csv"})
+
+    assert response.status_code == 422
+    assert [row["row"] for row in response.json()["detail"]["rows"]] == [2]
+    assert db.query(models.Job).count() == 0
+
+
+def test_job_summary_pages_with_status_counts(client, db, sqlite_backend):
+    models = sqlite_backend.models
+    template = add_template(db, models)
+    start = datetime.datetime(2026, 5, 1, 12, 0)
+    jobs = [
+        add_job(db, models, template, [
+            ("~/port1", {}, "success", []),
+            ("~/port2", {}, "failed", []),
+            ("~/port3", {}, "success", []),
+        ], status="failed", created_at=start + datetime.timedelta(minutes=i))
+        for i in range(3)
+    ]
+
+    first = client.get("/jobs/summary?limit=2").json()
+    assert [item["id"] for item in first["items"]] == [jobs[2].id, jobs[1].id]
+    assert first["items"][0]["template_name"] == "vlan"
+    assert first["items"][0]["target_count"] == 3
+    assert first["items"][0]["status_counts"] == {"success": 2, "failed": 1}
+
+    second = client.get(f"/jobs/summary?limit=2&cursor={first['next_cursor']}").json()
+    assert [item["id"] for item in second["items"]] == [jobs[0].id]
+    assert second["next_cursor"] is None
+
+
+def test_export_csv_and_check_rows(client, db, sqlite_backend):
+    models = sqlite_backend.models
+    template = add_template(db, models)
+    checks = [
+        {"check_name": "vlan", "status": "pass", "message": "ok", "evidence": "vlan 10"},
+        {"check_name": "ntp", "status": "fail", "message": "missing", "evidence": ""},
+    ]
+    job = add_job(db, models, template, [
+        ("~/port1", {"hostname": "sw-1", "vlan": "10"}, "success", checks),
+        ("~/port2", {"hostname": "sw-2"}, "failed", []),
+    ])
+
+    response = client.get(f"/jobs/{job.id}/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(r["port"], r["status"], r["hostname"], r["vlan"]) for r in rows] == [
+        ("~/port1", "success", "sw-1", "10"),
+        ("~/port2", "failed", "sw-2", ""),
+    ]
+
+    response = client.get(f"/jobs/{job.id}/export?format=ndjson&checks=true")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["port"], r["check_name"]) for r in records] == [("~/port1", "vlan"), ("~/port1", "ntp"), ("~/port2", None)]
+
+    assert client.get("/jobs/999/export").status_code == 404
+
+
+def test_dashboard_summary_from_port_stats(client, db, sqlite_backend):
+    from backend import dashboard_stats
+
+    models = sqlite_backend.models
+    template = add_template(db, models)
+    job = add_job(db, models, template, [
+        ("~/port1", {}, "success", []),
+        ("~/port1", {}, "failed", []),
+    ], status="failed")
+    finished = datetime.datetime.utcnow()
+    for target in job.targets:
+        target.started_at = finished - datetime.timedelta(seconds=30)
+        target.finished_at = finished
+        dashboard_stats.record_target_result(db, target)
+    db.commit()
+
+    summary = client.get("/dashboard/summary").json()
+    assert summary["template_count"] == 1
+    assert summary["configured_targets"] == 1
+    assert summary["job_counts"] == {"failed": 1}
+    assert summary["throughput"]["finished"] == 2
+    [port] = summary["ports"]
+    assert (port["port"], port["succeeded"], port["failed"], port["success_rate"]) == ("~/port1", 1, 1, 0.5)
+    assert port["average_duration_seconds"] == 30.0
+    assert summary["recent_jobs"][0]["target_count"] == 2
+
+
+def test_job_events_keep_status_published_while_snapshot_is_read(client, db, sqlite_backend, monkeypatch):
+    from backend import events
+    from backend.routers import jobs
+
+    models = sqlite_backend.models
+    job = add_job(db, models, add_template(db, models), [("~/port1", {}, "running", [])], status="running")
+    read_snapshot = jobs.job_snapshot
+
+    def snapshot_racing_the_worker(job_id):
+        # The worker finishes the job while the snapshot is being read.
+        snapshot = read_snapshot(job_id)
+        events.publish(job_id, "job_status", status="completed")
+        return snapshot
+
+    read_local = events.hub._read_local
+
+    async def slow_subscription(job_id):
+        await asyncio.sleep(0.2)  # like the round trip of a Redis SUBSCRIBE
+        await read_local(job_id)
+
+    monkeypatch.setattr(jobs, "job_snapshot", snapshot_racing_the_worker)
+    monkeypatch.setattr(events.hub, "_read_local", slow_subscription)
+    with client.websocket_connect(f"/jobs/{job.id}/events") as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot["type"] == "snapshot" and snapshot["job"]["status"] == "running"
+        time.sleep(0.3)
+        events.publish(job.id, "log", target_id=1, offset=0, lines=["later"])
+        event = websocket.receive_json()
+    assert (event["type"], event.get("status")) == ("job_status", "completed")
+
+
+def test_settings_read_from_cache_after_update(client, sqlite_backend):
+    from backend.settings_cache import settings
+
+    assert client.get("/settings/").json() == []
+    assert client.post("/settings/port_baud_rates", json={"1": 115200}).status_code == 200
+
+    [setting] = client.get("/settings/").json()
+    assert (setting["key"], setting["value"]) == ("port_baud_rates", {"1": 115200})
+    assert client.get("/settings/key/port_baud_rates").json()["id"] == setting["id"]
+    assert client.get("/settings/key/missing").status_code == 404
+    assert settings.loads == 2
@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import blob_store
+
+RUNNING_CONFIG = "hostname sw1\n" + "interface 1/1/1\n no shutdown\n" * 2000
+
+
+def test_gzip_round_trip(monkeypatch):
+    monkeypatch.setattr(blob_store, "zstandard", None)
+    encoding, data = blob_store.compress(RUNNING_CONFIG)
+    assert encoding == "gzip"
+    assert len(data) < len(RUNNING_CONFIG) / 20
+    assert blob_store.decompress(encoding, data) == RUNNING_CONFIG
+
+
+def test_compression_is_deterministic(monkeypatch):
+    monkeypatch.setattr(blob_store, "zstandard", None)
+    assert blob_store.compress(RUNNING_CONFIG) == blob_store.compress(RUNNING_CONFIG)
+
+
+def test_zstd_blob_without_zstandard_is_reported(monkeypatch):
+    monkeypatch.setattr(blob_store, "zstandard", None)
+    try:
+        blob_store.decompress("zstd", b"")
+    except RuntimeError as e:
+        assert "zstandard" in str(e)
+    else:
+        raise AssertionError("expected RuntimeError")
+
+
+def test_externalize_outputs_references_hashes(monkeypatch):
+    stored = []
+
+    def fake_put_many(db, texts):
+        texts = list(texts)
+        stored.extend(texts)
+        return [blob_store.digest(t) for t in texts]
+
+    monkeypatch.setattr(blob_store, "put_many", fake_put_many)
+    results = [
+        {"check_name": "a", "status": "pass", "evidence": "x", "full_output": "", "message": ""},
+        {"check_name": "b", "status": "pass", "evidence": "y", "full_output": RUNNING_CONFIG, "message": ""},
+        {"check_name": "c", "status": "error", "evidence": "", "message": "render error"},
+    ]
+    out = blob_store.externalize_outputs(None, results)
+    assert stored == [RUNNING_CONFIG]
+    assert all("full_output" not in r for r in out)
+    assert "output_hash" not in out[0] and "output_hash" not in out[2]
+    assert out[1]["output_hash"] == blob_store.digest(RUNNING_CONFIG)
+    assert out[1]["output_size"] == len(RUNNING_CONFIG)
+    assert results[1]["full_output"] == RUNNING_CONFIG
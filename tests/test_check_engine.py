@@ -0,0 +1,120 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import check_engine
+
+CONFIG = "hostname sw1\n!\ninterface 1/1/1\n description Uplink\n no shutdown\n!\ninterface 1/1/2\n shutdown\n!\nSwitch#"
+
+
+def legacy_evidence(output, offset, context):
+    lines = output.splitlines()
+    line = output[:offset].count("\n")
+    return "\n".join(lines[max(0, line - context):min(len(lines), line + context + 1)])
+
+
+def test_evidence_matches_line_counting():
+    view = check_engine.OutputView(CONFIG)
+    for offset in range(len(CONFIG)):
+        for context in (0, 1, 3):
+            assert view.evidence(offset, context) == legacy_evidence(CONFIG, offset, context)
+
+
+def test_output_is_split_once():
+    view = check_engine.OutputView(CONFIG)
+    view.evidence(5, 1)
+    lines = view.lines
+    view.evidence(40, 1)
+    assert view.lines is lines
+
+
+def test_literals_are_located_once(monkeypatch):
+    view = check_engine.OutputView(CONFIG)
+    view.locate(["description Uplink", "shutdown", "description Uplink", "missing"])
+    assert view._found == {"description Uplink": CONFIG.find("description Uplink"), "shutdown": CONFIG.find("shutdown"), "missing": -1}
+    monkeypatch.setattr(view, "text", None)  # a second scan would fail
+    assert view.find("shutdown") == CONFIG.find("shutdown")
+
+
+def test_regex_match_and_relaxed_fallback():
+    view = check_engine.OutputView(CONFIG)
+    result = check_engine.evaluate(view, "regex_match", r"interface 1/1/2\n shutdown", 0)
+    assert result["status"] == "pass" and result["evidence"] == "interface 1/1/2"
+
+    result = check_engine.evaluate(view, "regex_match", "INTERFACE 1/1/1   DESCRIPTION uplink", 1)
+    assert result["status"] == "pass"
+    assert "relaxed" in result["message"]
+    assert result["evidence"] == "!\ninterface 1/1/1\n description Uplink"
+
+    result = check_engine.evaluate(view, "regex_match", "ntp server", 1)
+    assert result == {"status": "fail", "evidence": CONFIG[-500:], "message": "Pattern not found: ntp server"}
+
+
+def test_regex_not_present_and_contains():
+    view = check_engine.OutputView(CONFIG)
+    assert check_engine.evaluate(view, "regex_not_present", "^ntp", 1)["status"] == "pass"
+    result = check_engine.evaluate(view, "regex_not_present", "^ shutdown$", 0)
+    assert result["status"] == "fail" and result["evidence"] == " shutdown"
+
+    result = check_engine.evaluate(view, "contains", "description Uplink", 3)
+    assert result["status"] == "pass" and "description Uplink" in result["evidence"]
+    assert check_engine.evaluate(view, "contains", "ntp", 3)["status"] == "fail"
+
+
+def test_broken_regex_raises():
+    view = check_engine.OutputView(CONFIG)
+    try:
+        check_engine.evaluate(view, "regex_not_present", "shut(", 3)
+    except Exception:
+        pass
+    else:
+        raise AssertionError("expected a regex error")
+
+
+def test_patterns_compile_once():
+    check_engine.compile_pattern.cache_clear()
+    view = check_engine.OutputView(CONFIG)
+    for _ in range(5):
+        check_engine.evaluate(view, "regex_match", "hostname", 0)
+    info = check_engine.compile_pattern.cache_info()
+    assert info.misses == 1 and info.hits == 4
+
+
+def test_normalized_view_maps_back_to_lines():
+    text = "VLAN  Name\n\n13    MGMT\n\t20   DATA  \n"
+    view = check_engine.OutputView(text)
+    assert view.normalized == " ".join(text.split())
+    for token, line in (("VLAN", 0), ("Name", 0), ("13", 2), ("MGMT", 2), ("20", 3), ("DATA", 3)):
+        assert view.normalized_line(view.normalized.index(token)) == line
+
+
+def test_relaxed_literal_and_regex_agree():
+    view = check_engine.OutputView("VLAN  Name\n13    MGMT\n20   DATA\n")
+    literal = check_engine.evaluate(view, "regex_match", "13 mgmt", 0)
+    regex = check_engine.evaluate(view, "regex_match", "1[3] mgmt", 0)
+    assert literal["status"] == regex["status"] == "pass"
+    assert literal["evidence"] == regex["evidence"] == "13    MGMT"
+    assert check_engine.evaluate(view, "regex_match", "13 DATA", 0)["status"] == "fail"
+
+
+def test_normalized_view_is_built_once():
+    view = check_engine.OutputView(CONFIG)
+    for pattern in ("INTERFACE 1/1/1 DESCRIPTION uplink", "interface   1/1/2  shutdown", "ntp server"):
+        check_engine.evaluate(view, "regex_match", pattern, 0)
+    normalized = view.normalized
+    check_engine.evaluate(view, "regex_match", "HOSTNAME   sw1", 0)
+    assert view.normalized is normalized
+
+
+def test_relaxed_regex_match_reports_its_line():
+    view = check_engine.OutputView("interface 1/1/7\n   description   Uplink   port 7\n!")
+    result = check_engine.evaluate(view, "regex_match", r"description uplink port (\d+)", 0)
+    assert result["status"] == "pass"
+    assert result["evidence"] == "   description   Uplink   port 7"
+
+
+def test_empty_output():
+    view = check_engine.OutputView("")
+    assert view.normalized == ""
+    assert check_engine.evaluate(view, "regex_match", "anything", 3)["status"] == "fail"
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib.config_diff import parse_config, plan_config_push
+
+RUNNING = """show running-config
+Building configuration...
+
+Current configuration : 1234 bytes
+!
+hostname sw1
+!
+vlan 10
+ name MGMT
+!
+interface Gi1/0/1
+ description uplink
+ switchport mode trunk
+!
+router bgp 65000
+ address-family ipv4
+  neighbor 10.0.0.1 activate
+ exit-address-family
+!
+line vty 0 4
+ login local
+end
+sw1#"""
+
+
+def test_parse_config_builds_section_tree():
+    root = parse_config(RUNNING)
+    interface = root.find("interface Gi1/0/1")
+    assert [c.line for c in interface.children] == ["description uplink", "switchport mode trunk"]
+    bgp = root.find("router bgp 65000")
+    assert bgp.find("address-family ipv4").find("neighbor   10.0.0.1 activate") is not None
+
+
+def test_compliant_config_sends_nothing():
+    desired = "hostname sw1\nvlan 10\n name MGMT\ninterface Gi1/0/1\n description uplink\n"
+    plan = plan_config_push(RUNNING, desired)
+    assert plan.commands == []
+    assert plan.total == plan.skipped == 5
+
+
+def test_missing_lines_are_sent_in_parent_context():
+    desired = (
+        "hostname sw1\n"
+        "vlan 20\n name USERS\n"
+        "interface Gi1/0/1\n description uplink\n switchport trunk allowed vlan 10,20\n"
+        "router bgp 65000\n address-family ipv4\n  neighbor 10.0.0.2 activate\n"
+        "line vty 0 4\n login local\n"
+    )
+    plan = plan_config_push(RUNNING, desired)
+    assert plan.commands == [
+        "vlan 20", "name USERS", "exit",
+        "interface Gi1/0/1", "switchport trunk allowed vlan 10,20", "exit",
+        "router bgp 65000", "address-family ipv4", "neighbor 10.0.0.2 activate", "exit", "exit",
+    ]
+    assert plan.total == 11
+    assert plan.skipped == 7
+
+
+def test_hp_style_exit_lines_are_structure_only():
+    running = "vlan 10\n   name \"MGMT\"\n   untagged 1-4\n   exit\n"
+    desired = "vlan 10\n   name \"MGMT\"\n   untagged 1-8\n   exit\n"
+    plan = plan_config_push(running, desired)
+    assert plan.commands == ["vlan 10", "untagged 1-8", "exit"]
@@ -0,0 +1,64 @@
+import datetime
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import dashboard_stats
+
+
+def test_port_summary_rates_and_throughput():
+    summary = dashboard_stats.port_summary("~/port1", 9, 3, 600.0, 48, hours=24)
+    assert summary == {
+        "port": "~/port1",
+        "succeeded": 9,
+        "failed": 3,
+        "success_rate": 0.75,
+        "average_duration_seconds": 50.0,
+        "finished_recent": 48,
+        "throughput_per_hour": 2.0,
+    }
+
+
+def test_port_summary_without_finished_targets():
+    summary = dashboard_stats.port_summary("~/port2", None, None, None, None)
+    assert summary["success_rate"] is None
+    assert summary["average_duration_seconds"] is None
+    assert summary["throughput_per_hour"] == 0
+
+
+def test_hour_of_truncates():
+    moment = datetime.datetime(2026, 3, 4, 15, 42, 7, 123)
+    assert dashboard_stats.hour_of(moment) == datetime.datetime(2026, 3, 4, 15)
+
+
+def test_summary_is_cached_until_ttl(tmp_path, monkeypatch):
+    cache = dashboard_stats.SummaryCache(ttl=30, version_file=str(tmp_path / "dashboard.version"))
+    builds = []
+    build = lambda: builds.append(1) or {"n": len(builds)}
+    assert cache.get(build) == {"n": 1}
+    assert cache.get(build) == {"n": 1}
+    assert cache.builds == 1
+
+    now = dashboard_stats.time.monotonic()
+    monkeypatch.setattr(dashboard_stats.time, "monotonic", lambda: now + 31)
+    assert cache.get(build) == {"n": 2}
+
+
+def test_invalidation_reaches_other_processes(tmp_path):
+    version_file = str(tmp_path / "dashboard.version")
+    api = dashboard_stats.SummaryCache(ttl=300, version_file=version_file)
+    worker = dashboard_stats.SummaryCache(ttl=300, version_file=version_file)
+    builds = []
+    build = lambda: builds.append(1) or len(builds)
+    assert api.get(build) == 1
+    dashboard_stats.invalidate(worker)
+    assert api.get(build) == 2
+    assert api.get(build) == 2
+
+
+def test_invalidate_never_raises(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = dashboard_stats.SummaryCache(version_file=str(blocker / "dashboard.version"))
+    dashboard_stats.invalidate(cache)
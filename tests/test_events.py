@@ -0,0 +1,74 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import events
+
+
+def test_local_bus_delivers_to_subscribers_of_channel():
+    bus = events.LocalBus()
+    received = []
+    bus.subscribe("a", received.append)
+    assert bus.publish("a", "one") == 1
+    assert bus.publish("b", "two") == 0
+    bus.unsubscribe("a", received.append)
+    assert bus.publish("a", "three") == 0
+    assert received == ["one"]
+
+
+def test_hub_fans_out_one_subscription_to_all_viewers(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_URL", "memory://")
+
+    async def scenario():
+        hub = events.JobEventHub()
+        viewers = [hub.subscribe(7) for _ in range(3)]
+        other = hub.subscribe(8)
+        await asyncio.sleep(0)  # let the readers subscribe
+
+        events.publish(7, "target_status", target_id=1, status="running")
+        messages = [json.loads(await asyncio.wait_for(q.get(), 1)) for q in viewers]
+        assert {m["status"] for m in messages} == {"running"}
+        assert other.empty()
+
+        for queue in viewers:
+            hub.unsubscribe(7, queue)
+        await asyncio.sleep(0)
+        assert hub.viewer_count(7) == 0
+        hub.unsubscribe(8, other)
+
+    asyncio.run(scenario())
+    assert events.local_bus.publish(events.channel(7), "late") == 0
+
+
+def test_slow_viewer_drops_oldest_events(monkeypatch):
+    monkeypatch.setattr(events, "VIEWER_QUEUE_SIZE", 2)
+
+    async def scenario():
+        hub = events.JobEventHub()
+        hub._readers[1] = asyncio.get_running_loop().create_future()  # no bus reader
+        queue = hub.subscribe(1)
+        for i in range(3):
+            hub.dispatch(1, str(i))
+        assert [queue.get_nowait(), queue.get_nowait()] == ["1", "2"]
+        hub.unsubscribe(1, queue)
+
+    asyncio.run(scenario())
+
+
+def test_wait_subscribed_covers_events_published_right_after(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_URL", "memory://")
+
+    async def scenario():
+        hub = events.JobEventHub()
+        queue = hub.subscribe(5)
+        assert await hub.wait_subscribed(5, timeout=1)
+        # Published before the viewer yields to the loop again, e.g. while a snapshot is read.
+        events.publish(5, "job_status", status="completed")
+        assert json.loads(await asyncio.wait_for(queue.get(), 1))["status"] == "completed"
+        hub.unsubscribe(5, queue)
+        assert not await hub.wait_subscribed(5, timeout=0.01)
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import inventory
+
+
+def parse(text, fmt, chunk_size=7, **kwargs):
+    data = text.encode()
+
+    async def chunks():
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    return asyncio.run(inventory.parse_inventory(chunks(), fmt, **kwargs))
+
+
+def test_csv_rows_map_port_and_variables():
+    rows = parse('\ufeffPort,hostname,vlan\r\n1,sw-1,10\r\n~/port9,sw-9,\r\n', "csv")
+    assert rows == [
+        inventory.InventoryRow(1, "~/port1", {"hostname": "sw-1", "vlan": "10"}, []),
+        inventory.InventoryRow(2, "~/port9", {"hostname": "sw-9"}, []),
+    ]
+
+
+def test_csv_quoted_cells_may_span_lines():
+    rows = parse('port,banner\n1,"line one\nline ""two"""\n2,x\n', "csv", chunk_size=3)
+    assert [r.variables["banner"] for r in rows] == ['line one\nline "two"', "x"]
+
+
+def test_csv_reports_row_errors():
+    rows = parse("port,hostname\n,a\n2,b,extra\n3,\"open\n", "csv")
+    assert [r.errors for r in rows] == [
+        ["Missing port"],
+        ["Row has 3 cells but the header has 2"],
+        ["Unterminated quoted cell"],
+    ]
+
+
+def test_csv_requires_port_column():
+    with pytest.raises(inventory.InventoryError):
+        parse("hostname\nsw-1\n", "csv")
+
+
+def test_ndjson_nested_and_flat_rows():
+    rows = parse('{"port": 2, "variables": {"vlan": 5}}\n\n{"port": "~/port3", "vlan": 6}\n[1]\n', "ndjson")
+    assert rows[0] == inventory.InventoryRow(1, "~/port2", {"vlan": 5}, [])
+    assert rows[1] == inventory.InventoryRow(2, "~/port3", {"vlan": 6}, [])
+    assert rows[2].errors == ["Line must be a JSON object"]
+
+
+def test_row_limit():
+    with pytest.raises(inventory.InventoryError):
+        parse("port\n1\n2\n3\n", "csv", max_rows=2)
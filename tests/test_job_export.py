@@ -0,0 +1,74 @@
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import job_export
+
+
+def make_record(target_id, variables, **extra):
+    return {
+        "target_id": target_id,
+        "port": f"~/port{target_id}",
+        "status": "success",
+        "failure_category": None,
+        "remediation": None,
+        "started_at": datetime.datetime(2026, 5, 1, 12, 0),
+        "finished_at": None,
+        "created_at": datetime.datetime(2026, 5, 1, 11, 59),
+        "log_summary": "Connected",
+        "variables": variables,
+        **extra,
+    }
+
+
+def test_log_summary_truncates():
+    assert job_export.log_summary(["a", "b"]) == "a b"
+    assert job_export.log_summary(["x" * 150]) == "x" * 100 + "..."
+
+
+def test_check_records_one_row_per_check():
+    results = [
+        {"check_name": "vlan", "status": "pass", "message": "ok", "evidence": "vlan 10", "full_output": "big"},
+        {"check_name": "ntp", "status": "fail", "message": "missing", "evidence": ""},
+    ]
+    rows = list(job_export.check_records(make_record(1, {}), results))
+    assert [(r["check_index"], r["check_name"], r["check_status"]) for r in rows] == [(1, "vlan", "pass"), (2, "ntp", "fail")]
+    assert all("full_output" not in r for r in rows)
+    assert all(r["target_id"] == 1 for r in rows)
+
+
+def test_check_records_keep_targets_without_results():
+    rows = list(job_export.check_records(make_record(2, {}), []))
+    assert len(rows) == 1 and rows[0]["check_name"] is None
+
+
+def test_csv_streams_one_chunk_per_row():
+    records = [make_record(1, {"hostname": "sw1"}), make_record(2, {"hostname": "sw2", "vlan": 10})]
+    chunks = list(job_export.iter_csv(iter(records), ["hostname", "vlan"]))
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == job_export.TARGET_FIELDS + ["hostname", "vlan"]
+    assert rows[1][0] == "1" and rows[1][-2:] == ["sw1", ""]
+    assert rows[2][-2:] == ["sw2", "10"]
+    assert rows[1][job_export.TARGET_FIELDS.index("started_at")] == "2026-05-01T12:00:00"
+
+
+def test_csv_check_columns():
+    records = job_export.check_records(make_record(1, {}), [{"check_name": "vlan", "status": "pass"}])
+    rows = list(csv.reader(io.StringIO("".join(job_export.iter_csv(records, [], checks=True)))))
+    assert rows[0] == job_export.TARGET_FIELDS + job_export.CHECK_FIELDS
+    assert rows[1][len(job_export.TARGET_FIELDS):][:3] == ["1", "vlan", "pass"]
+
+
+def test_ndjson_lines():
+    lines = list(job_export.iter_ndjson([make_record(1, {"hostname": "sw1"})]))
+    assert len(lines) == 1 and lines[0].endswith("\n")
+    item = json.loads(lines[0])
+    assert item["variables"] == {"hostname": "sw1"}
+    assert item["created_at"] == "2026-05-01T11:59:00"
+    assert item["finished_at"] is None
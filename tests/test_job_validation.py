@@ -0,0 +1,90 @@
+import os
+import sys
+import types
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import job_validation, template_cache
+
+SCHEMA = {
+    "properties": {
+        "hostname": {"title": "Hostname", "type": "string", "pattern": "^[a-z0-9-]+$"},
+        "vlan": {"type": "integer", "minimum": 1, "maximum": 4094},
+        "role": {"type": "string", "enum": ["access", "core"]},
+    },
+    "required": ["hostname", "vlan"],
+}
+
+STEPS = [
+    {"type": "command", "content": "hostname {{ hostname }}"},
+    {"type": "command", "content": "vlan {{ vlan }}"},
+    {"type": "verify", "command": "show vlan id {{ vlan }}", "pattern": "{{ vlan }}\\s+active"},
+]
+
+
+def make_template(template_id=1, steps=STEPS, schema=SCHEMA):
+    return types.SimpleNamespace(id=template_id, steps=steps, body=None, config_schema=schema)
+
+
+def make_target(port, **variables):
+    return types.SimpleNamespace(port=port, variables=variables)
+
+
+def test_schema_validator_reports_each_problem():
+    validate = job_validation.compile_schema(SCHEMA)
+    assert validate({"hostname": "sw-01", "vlan": "10"}) == []
+    errors = validate({"hostname": "SW 01", "vlan": "5000", "role": "edge"})
+    assert errors == [
+        "'Hostname' does not match pattern '^[a-z0-9-]+$'",
+        "'vlan' must be at most 4094",
+        "'role' must be one of ['access', 'core'], got 'edge'",
+    ]
+    assert validate({"vlan": "ten"}) == [
+        "Missing required variable 'hostname'",
+        "'vlan' must be of type integer, got 'ten'",
+    ]
+
+
+def test_render_job_reports_failures_per_target():
+    template = make_template(schema={})
+    targets = [make_target("~/port1", hostname="a", vlan=10), make_target("~/port2", hostname="b")]
+    result = job_validation.render_job(template, targets)
+    assert result["ok"] is False
+    ok, failed = result["targets"]
+    assert ok["ok"] and ok["errors"] == []
+    assert failed["port"] == "~/port2"
+    assert failed["errors"] == [
+        "Step 2 (command cmd): 'vlan' is undefined",
+        "Step 3 (verify command): 'vlan' is undefined",
+        "Step 3 (verify pattern): 'vlan' is undefined",
+    ]
+
+
+def test_render_job_dry_run_returns_rendered_steps():
+    result = job_validation.render_job(make_template(), [make_target("~/port1", hostname="sw-01", vlan="20")], keep_output=True)
+    assert result["ok"]
+    assert [r["text"] for r in result["targets"][0]["rendered"]] == [
+        "hostname sw-01",
+        "vlan 20",
+        "show vlan id 20",
+        "20\\s+active",
+    ]
+
+
+def test_large_batch_compiles_each_step_once():
+    template = make_template(template_id=4242)
+    cache = template_cache.CompiledTemplateCache()
+    original = template_cache.templates
+    template_cache.templates = cache
+    try:
+        targets = [make_target(f"~/port{i % 16}", hostname=f"sw-{i}", vlan=i % 4000 + 1) for i in range(500)]
+        assert job_validation.render_job(template, targets)["ok"]
+    finally:
+        template_cache.templates = original
+    assert cache.misses == 4
+    assert cache.hits == 500 * 4 - 4
+
+
+def test_template_without_steps_is_rejected():
+    result = job_validation.render_job(make_template(steps=[]), [make_target("~/port1", hostname="a", vlan=1)])
+    assert result["targets"][0]["errors"] == ["Template has no executable steps"]
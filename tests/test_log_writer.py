@@ -0,0 +1,124 @@
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import log_writer
+
+
+class FakeSessions:
+    """Session factory recording the rows inserted by every flush."""
+
+    def __init__(self):
+        self.writes = []
+
+    def __call__(self):
+        db = MagicMock()
+        db.bulk_insert_mappings.side_effect = lambda model, rows: self.writes.append(rows)
+        return db
+
+
+def make_writer(monkeypatch, sessions, **kwargs):
+    monkeypatch.setattr(log_writer, "models", MagicMock())
+    return log_writer.TargetLogWriter(1, sessions, **kwargs)
+
+
+def test_lines_are_batched_until_close(monkeypatch):
+    sessions = FakeSessions()
+    writer = make_writer(monkeypatch, sessions, flush_interval=60, flush_lines=1000)
+    for i in range(200):
+        writer.write(f"line {i}")
+    assert sessions.writes == []
+    writer.close()
+    assert len(sessions.writes) == 1
+    assert [row["seq"] for row in sessions.writes[0]] == list(range(200))
+    assert sessions.writes[0][-1]["line"].endswith("line 199")
+
+
+def test_flushes_append_only_new_lines(monkeypatch):
+    sessions = FakeSessions()
+    writer = make_writer(monkeypatch, sessions, flush_interval=60, flush_lines=50)
+    for i in range(120):
+        writer.write(f"line {i}")
+    assert [len(rows) for rows in sessions.writes] == [50, 50]
+    assert sessions.writes[1][0]["seq"] == 50
+    writer.close()
+    assert [len(rows) for rows in sessions.writes] == [50, 50, 20]
+    assert sessions.writes[-1][-1] == {"target_id": 1, "seq": 119, "line": writer.text.split("\n")[-1]}
+
+
+def test_pending_lines_flush_after_interval(monkeypatch):
+    sessions = FakeSessions()
+    writer = make_writer(monkeypatch, sessions, flush_interval=0.05, flush_lines=1000)
+    writer.write("Sending: show version")
+    deadline = time.monotonic() + 2
+    while not sessions.writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sessions.writes and sessions.writes[0][0]["line"].endswith("Sending: show version")
+    writer.close()
+    assert writer.flush_count == 1
+
+
+class FakeScope:
+    """session_scope recording one entry per transaction."""
+
+    def __init__(self):
+        self.transactions = []
+
+    def __call__(self):
+        scope = self
+
+        class Scope:
+            def __enter__(self):
+                db = MagicMock()
+                db.bulk_insert_mappings.side_effect = lambda model, rows: scope.transactions.append(rows)
+                return db
+
+            def __exit__(self, *exc):
+                return False
+
+        return Scope()
+
+
+def test_flusher_groups_writers_into_one_transaction(monkeypatch):
+    monkeypatch.setattr(log_writer, "models", MagicMock())
+    scope = FakeScope()
+    flusher = log_writer.LogFlusher(scope, interval=60)
+    published = []
+    writers = [
+        log_writer.TargetLogWriter(
+            target_id, None, flush_lines=1000, flusher=flusher,
+            on_flush=lambda offset, lines, t=target_id: published.append((t, offset, len(lines))),
+        )
+        for target_id in range(16)
+    ]
+    for i in range(5):
+        for writer in writers:
+            writer.write(f"line {i}")
+    flusher.flush_all()
+    assert len(scope.transactions) == 1
+    assert len(scope.transactions[0]) == 16 * 5
+    assert sorted(published) == [(t, 0, 5) for t in range(16)]
+
+    writers[3].write("more")
+    flusher.flush_all()
+    assert scope.transactions[-1] == [{"target_id": 3, "seq": 5, "line": writers[3].text.split("\n")[-1]}]
+    for writer in writers:
+        writer.close()
+    assert len(scope.transactions) == 2
+
+
+def test_flusher_writer_still_flushes_on_threshold_and_close(monkeypatch):
+    monkeypatch.setattr(log_writer, "models", MagicMock())
+    scope = FakeScope()
+    flusher = log_writer.LogFlusher(scope, interval=60)
+    writer = log_writer.TargetLogWriter(1, None, flush_lines=10, flusher=flusher)
+    for i in range(13):
+        writer.write(f"line {i}")
+    assert [len(rows) for rows in scope.transactions] == [10]
+    writer.close()
+    assert [len(rows) for rows in scope.transactions] == [10, 3]
+    flusher.flush_all()
+    assert len(scope.transactions) == 2
@@ -164,6 +164,147 @@ def test_disable_paging_does_not_wait_for_prompt():
     session.send_line.assert_called_once_with("terminal length 0")
     session.drain.assert_called_once()
 
+def test_large_paginated_output_is_assembled_once():
+    session = MagicMock()
+    pages = []
+    for page in range(250):
+        lines = "".join(f"interface Gi1/0/{page * 20 + i}\r\n" for i in range(20))
+        pages.append(lines + " --More-- ")
+    pages.append("end\r\nSwitch# ")
+    outputs = list(pages)
+
+    def read_side_effect():
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+
+    result = runner.run_show("show run", timeout=5.0)
+
+    assert "--More--" not in result
+    assert result.count("interface Gi1/0/") == 5000
+    assert "interface Gi1/0/4999\n" in result
+    space_calls = [call for call in session.send.call_args_list if call.args[0] == " "]
+    assert len(space_calls) == 250
+
+def test_learned_prompt_ignores_output_lines_ending_in_hash():
+    session = MagicMock()
+    outputs = [
+        "# IP REDISTRIBUTION CONFIGURATION - VRF #\n",
+        "router isis\n",
+        "5520-24X-FabricEngine# ",
+    ]
+
+    def read_side_effect():
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+    runner.hostname = "5520-24X-FabricEngine"
+
+    result = runner.run_show("show run", timeout=5.0)
+
+    assert "router isis" in result
+    assert result.rstrip().endswith("5520-24X-FabricEngine#")
+
+def test_hostname_command_updates_learned_prompt():
+    session = MagicMock()
+    outputs = ["hostname sw-new\n", "sw-new(config)# "]
+
+    def read_side_effect():
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+    runner.hostname = "Switch"
+
+    runner.send_command("hostname sw-new")
+    out = runner.wait_for_prompt(timeout=5.0)
+
+    assert runner.hostname == "sw-new"
+    assert out.rstrip().endswith("sw-new(config)#")
+    prompt, trusted = runner.match_prompt(out)
+    assert trusted and prompt.type.name == "CONFIG"
+
+def fake_clock(monkeypatch, step=0.2):
+    """Each read takes `step` seconds of a fake clock."""
+    current_time = {"value": 0.0}
+    monkeypatch.setattr(time, "monotonic", lambda: current_time["value"])
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    def tick():
+        current_time["value"] += step
+
+    return tick
+
+def test_unfamiliar_prompt_accepted_once_device_goes_idle(monkeypatch):
+    session = MagicMock()
+    outputs = ["renamed# "]
+    tick = fake_clock(monkeypatch)
+
+    def read_side_effect():
+        tick()
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+    runner.hostname = "Switch"
+
+    result = runner.wait_for_prompt(timeout=5.0)
+
+    assert result == "renamed# "
+    assert runner.hostname == "renamed"
+
+def test_unfamiliar_prompt_needs_quiet_period(monkeypatch):
+    session = MagicMock()
+    # The device pauses for a few reads after a line that looks like a prompt.
+    outputs = ["show banner\n=====#", "", "", "", " end of banner\nSwitch# "]
+    tick = fake_clock(monkeypatch)
+
+    def read_side_effect():
+        tick()
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+    runner.hostname = "Switch"
+
+    result = runner.wait_for_prompt(timeout=5.0)
+
+    assert "=====# end of banner" in result
+    assert result.rstrip().endswith("Switch#")
+    assert runner.hostname == "Switch"
+
+def test_idle_output_line_ending_in_hash_is_not_learned(monkeypatch):
+    session = MagicMock()
+    outputs = ["hostname Switch\nbanner motd #\n"]
+    tick = fake_clock(monkeypatch)
+
+    def read_side_effect():
+        tick()
+        if not outputs:
+            return ""
+        return outputs.pop(0)
+
+    session.read_available.side_effect = read_side_effect
+    runner = CommandRunner(session)
+    runner.hostname = "Switch"
+
+    result = runner.wait_for_prompt(timeout=5.0)
+
+    assert result.rstrip().endswith("banner motd #")
+    assert runner.hostname == "Switch"
+
 if __name__ == "__main__":
     test_pagination_handling()
     test_extreme_more_prompt_with_suffix()
@@ -0,0 +1,76 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib.command_runner import CommandRunner
+
+
+class ConfigDevice:
+    """Fake config-mode console: echoes each line, prints its output and a prompt."""
+
+    def __init__(self, hostname: str, responses: dict):
+        self.hostname = hostname
+        self.mode = "(config)#"
+        self.responses = responses
+        self.received = []
+        self.pending = []
+        self.max_in_flight = 0
+
+    def send_line(self, line: str):
+        self.received.append(line)
+        self.pending.append(line)
+        self.max_in_flight = max(self.max_in_flight, len(self.pending))
+
+    def read_available(self) -> str:
+        # The device works through one queued line per read.
+        if not self.pending:
+            return ""
+        line = self.pending.pop(0)
+        if line.startswith("hostname "):
+            self.hostname = line.split()[1]
+        if line.startswith("interface"):
+            self.mode = "(config-if)#"
+        out = self.responses.get(line, "")
+        return f"{line}\r\n{out}{self.hostname}{self.mode}"
+
+
+def test_pipelined_push_matches_errors_to_commands():
+    device = ConfigDevice("Switch", {"vlan 99x": "% Invalid input detected at '^' marker.\r\n"})
+    runner = CommandRunner(device)
+    runner.hostname = "Switch"
+    commands = ["vlan 10", "name MGMT", "vlan 99x", "interface Gi1/0/1", "description uplink"]
+
+    results = runner.run_pipelined(commands, window=3, timeout=2.0)
+
+    assert [r["command"] for r in results] == commands
+    assert device.received == commands
+    assert device.max_in_flight == 3
+    errors = {r["command"]: r["error"] for r in results}
+    assert errors["vlan 99x"].startswith("% Invalid input")
+    assert all(errors[c] is None for c in commands if c != "vlan 99x")
+
+
+def test_pipelined_push_follows_hostname_change():
+    device = ConfigDevice("Switch", {})
+    runner = CommandRunner(device)
+    runner.hostname = "Switch"
+    commands = ["hostname sw-new", "vlan 10", "name MGMT"]
+
+    results = runner.run_pipelined(commands, window=8, timeout=2.0)
+
+    assert len(results) == 3
+    assert runner.hostname == "sw-new"
+
+
+def test_pipelined_push_without_known_prompt_falls_back_to_sequential():
+    session = MagicMock()
+    outputs = ["vlan 10\nSwitch(config-vlan)# ", "name MGMT\nSwitch(config-vlan)# "]
+    session.read_available.side_effect = lambda: outputs.pop(0) if outputs else ""
+    runner = CommandRunner(session)
+
+    results = runner.run_pipelined(["vlan 10", "name MGMT"], timeout=2.0)
+
+    assert [r["error"] for r in results] == [None, None]
+    assert session.send_line.call_count == 2
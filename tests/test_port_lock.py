@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib import port_lock
+from serial_lib.port_lock import PortBusyError, PortLease, is_port_busy, lock_path, read_holder
+
+
+def test_second_lease_fails_fast_with_port_busy(tmp_path):
+    lock_dir = str(tmp_path)
+    first = PortLease("/dev/ttyFAKE0", owner="console", lock_dir=lock_dir).acquire()
+    try:
+        with pytest.raises(PortBusyError) as exc:
+            PortLease("/dev/ttyFAKE0", owner="job 1", lock_dir=lock_dir).acquire(wait=0)
+        assert "held by console" in str(exc.value)
+        assert is_port_busy("/dev/ttyFAKE0", lock_dir)
+        assert read_holder("/dev/ttyFAKE0", lock_dir)["owner"] == "console"
+    finally:
+        first.release()
+
+    assert not is_port_busy("/dev/ttyFAKE0", lock_dir)
+    assert read_holder("/dev/ttyFAKE0", lock_dir) is None
+
+
+def test_lease_queues_behind_current_holder(tmp_path):
+    lock_dir = str(tmp_path)
+    first = PortLease("/dev/ttyFAKE1", owner="job 1", lock_dir=lock_dir).acquire()
+    threading.Timer(0.2, first.release).start()
+
+    start = time.monotonic()
+    with PortLease("/dev/ttyFAKE1", owner="job 2", lock_dir=lock_dir).acquire(wait=5.0, poll=0.05):
+        assert time.monotonic() - start >= 0.15
+        assert read_holder("/dev/ttyFAKE1", lock_dir)["owner"] == "job 2"
+
+
+def test_symlinked_ports_share_one_lock(tmp_path):
+    device = tmp_path / "ttyUSB0"
+    device.write_text("")
+    alias = tmp_path / "port1"
+    alias.symlink_to(device)
+    assert lock_path(str(alias), str(tmp_path)) == lock_path(str(device), str(tmp_path))
+
+
+@pytest.mark.skipif(not os.path.exists(port_lock.PROC_LOCKS), reason="needs /proc/locks")
+def test_busy_check_does_not_take_the_lock(tmp_path, monkeypatch):
+    lock_dir = str(tmp_path)
+    lease = PortLease("/dev/ttyFAKE2", owner="job 1", lock_dir=lock_dir).acquire()
+    monkeypatch.setattr(port_lock.fcntl, "flock", lambda *args: pytest.fail("is_port_busy took the lock"))
+    assert is_port_busy("/dev/ttyFAKE2", lock_dir)
+    assert not is_port_busy("/dev/ttyFAKE9", lock_dir)
+    monkeypatch.undo()
+    lease.release()
+    assert not is_port_busy("/dev/ttyFAKE2", lock_dir)
+
+
+def test_busy_check_without_proc_locks(tmp_path, monkeypatch):
+    monkeypatch.setattr(port_lock, "PROC_LOCKS", str(tmp_path / "missing"))
+    lock_dir = str(tmp_path)
+    with PortLease("/dev/ttyFAKE3", owner="job 1", lock_dir=lock_dir):
+        assert is_port_busy("/dev/ttyFAKE3", lock_dir)
+    assert not is_port_busy("/dev/ttyFAKE3", lock_dir)
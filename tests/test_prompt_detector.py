@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib.prompt_detector import PromptDetector, PromptType, StreamingNormalizer
+
+
+def feed_all(chunks):
+    stream = StreamingNormalizer()
+    for chunk in chunks:
+        stream.feed(chunk)
+    stream.flush()
+    return stream.getvalue()
+
+
+def test_normalize_strips_ansi_and_resolves_backspaces():
+    raw = "Building configuration...\r\n\x1b[7m--More--\x1b[0m\x07\r\ninterface Gi1\r\n descX\x08ription\r\nSwitch# "
+    assert PromptDetector.normalize(raw) == (
+        "Building configuration...\n--More--\ninterface Gi1\n description\nSwitch# "
+    )
+
+
+def test_normalize_carriage_return_overwrites_line():
+    # HP/Aruba style pager cleanup: CR, blank out the prompt, CR, continue.
+    raw = "-- MORE --\r          \rinterface 1\r\n"
+    assert PromptDetector.normalize(raw) == "interface 1\n"
+    assert PromptDetector.normalize("line\n\rnext") == "line\nnext"
+
+
+def test_normalize_applies_cursor_moves():
+    assert PromptDetector.normalize("-- MORE --\x1b[10D\x1b[Kdata") == "data"
+    assert PromptDetector.normalize("abcdef\x1b[3DX") == "abcXef"
+    assert PromptDetector.normalize("abc\x1b[2CX") == "abc  X"
+
+
+def test_normalize_backspace_runs_stay_linear():
+    page = "x" * 70 + "-- MORE --" + "\x08" * 10 + " " * 10 + "\x08" * 10
+    raw = (page + "\n") * 2000
+    assert PromptDetector.normalize(raw) == ("x" * 70 + "\n") * 2000
+
+
+def test_streaming_handles_sequences_split_across_chunks():
+    raw = "line one\r\n\x1b[7m--More--\x1b[0m\r\nline two\r\nSwitch# "
+    expected = PromptDetector.normalize(raw)
+    for cut in range(1, len(raw)):
+        assert feed_all([raw[:cut], raw[cut:]]) == expected, cut
+
+
+def test_streaming_backspace_across_chunks():
+    assert feed_all(["abc", "\x08\x08", "XY"]) == "aXY"
+
+
+def test_streaming_tail_and_truncate():
+    stream = StreamingNormalizer()
+    stream.feed("first\nsecond\n--More-- ")
+    assert stream.tail(9) == "--More-- "
+    stream.truncate(len(stream) - 9)
+    assert stream.getvalue() == "first\nsecond\n"
+    stream.truncate(8)
+    stream.feed("X")
+    assert stream.getvalue() == "first\nseX"
+
+
+def test_classify_returns_type_and_hostname():
+    detector = PromptDetector()
+    cases = [
+        ("garbage data\r\nsw-core-07> ", PromptType.USER, "sw-core-07"),
+        ("\r\nsw-core-07#", PromptType.PRIV, "sw-core-07"),
+        ("sw-core-07(config-if)# ", PromptType.CONFIG, "sw-core-07"),
+        ("X440-G2.1 # ", PromptType.PRIV, "X440-G2.1"),
+        ("User Name:", PromptType.USERNAME, None),
+        ("Login: ", PromptType.USERNAME, None),
+        ("Password: ", PromptType.PASSWORD, None),
+        ("first page\n\x1b[7m--More--\x1b[0m (", PromptType.PAGER, None),
+        ("show version\nCisco IOS Software", PromptType.UNKNOWN, None),
+    ]
+    for buffer, expected_type, expected_host in cases:
+        prompt = detector.classify(buffer)
+        assert prompt.type == expected_type, buffer
+        assert prompt.hostname == expected_host, buffer
+
+
+def test_classify_only_inspects_last_line():
+    detector = PromptDetector()
+    buffer = "Password:\n" + "x" * 200000 + "\nSwitch#\n\n"
+    assert detector.classify(buffer).type == PromptType.PRIV
+    assert detector.classify("Switch#\nshow clock").type == PromptType.UNKNOWN
+    assert detector.detect("Password:") == PromptType.UNKNOWN
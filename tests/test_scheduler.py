@@ -0,0 +1,167 @@
+import datetime
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import scheduler
+
+
+def make_target(target_id, job_id, port="/dev/ttyUSB0"):
+    return types.SimpleNamespace(id=target_id, job_id=job_id, port=port)
+
+
+def test_order_port_queue_is_fifo_for_one_job():
+    queued = [make_target(3, 1), make_target(1, 1), make_target(2, 1)]
+    assert [t.id for t in scheduler.order_port_queue(queued, {})] == [1, 2, 3]
+
+
+def test_order_port_queue_alternates_jobs():
+    # Job 1 queued three targets on the port before job 2 queued two.
+    queued = [make_target(1, 1), make_target(2, 1), make_target(3, 1), make_target(4, 2), make_target(5, 2)]
+    assert [t.id for t in scheduler.order_port_queue(queued, {})] == [1, 4, 2, 5, 3]
+
+
+def test_order_port_queue_counts_targets_already_served():
+    # Job 1 already ran two targets on the port; job 2 goes next.
+    queued = [make_target(3, 1), make_target(4, 1), make_target(9, 2)]
+    order = scheduler.order_port_queue(queued, {1: 2})
+    assert [t.id for t in order] == [9, 3, 4]
+
+
+def test_average_durations_per_port_with_fallback():
+    start = datetime.datetime(2026, 1, 1, 12, 0, 0)
+
+    def finished(port, seconds):
+        target = make_target(0, 1, port)
+        target.started_at = start
+        target.finished_at = start + datetime.timedelta(seconds=seconds)
+        return target
+
+    averages = scheduler.average_durations(
+        [finished("/dev/ttyUSB0", 30), finished("/dev/ttyUSB0", 50), finished("/dev/ttyUSB1", 80)]
+    )
+    assert averages["/dev/ttyUSB0"] == 40
+    assert averages["/dev/ttyUSB1"] == 80
+    assert round(averages[""], 3) == round(160 / 3, 3)
+
+
+def test_estimate_waits_accounts_for_running_target():
+    assert scheduler.estimate_waits(2, 60.0, 20.0) == [40.0, 100.0, 160.0]
+    assert scheduler.estimate_waits(1, 60.0, None) == [0.0, 60.0]
+    assert scheduler.estimate_waits(1, None, 5.0) == [None, None]
+
+
+@pytest.fixture
+def db(sqlite_backend):
+    session = sqlite_backend.database.SessionLocal()
+    yield session
+    session.close()
+
+
+def add_job(db, models, targets, status="queued"):
+    """A job with (port, status, started_at) targets; returns their rows in order."""
+    template = models.Template(name=f"t{db.query(models.Template).count()}", steps=[], config_schema={})
+    db.add(template)
+    db.flush()
+    job = models.Job(template_id=template.id, status=status)
+    db.add(job)
+    db.flush()
+    rows = [
+        models.JobTarget(job_id=job.id, port=port, variables={}, status=target_status, started_at=started_at)
+        for port, target_status, started_at in targets
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_claim_takes_one_target_per_idle_port(db, sqlite_backend):
+    from backend import scheduler
+
+    first = add_job(db, sqlite_backend.models, [("~/port1", "queued", None)] * 2 + [("~/port2", "queued", None)])
+    second = add_job(db, sqlite_backend.models, [("~/port1", "queued", None)])
+
+    claimed = scheduler.claim_next_targets(db, max_active=8)
+
+    assert claimed == [first[0].id, first[2].id]
+    db.expire_all()
+    assert [t.status for t in first + second] == ["running", "queued", "running", "queued"]
+    assert first[0].started_at is not None
+    # Port 1 is busy until its target finishes.
+    assert scheduler.claim_next_targets(db, max_active=8) == []
+
+
+def test_claim_skips_leased_ports_and_respects_slots(db, sqlite_backend):
+    from backend import scheduler
+    from serial_lib.port_lock import PortLease
+
+    targets = add_job(db, sqlite_backend.models, [(f"~/port{n}", "queued", None) for n in (1, 2, 3)])
+
+    with PortLease("~/port1", owner="console"):
+        assert scheduler.claim_next_targets(db, max_active=1) == [targets[1].id]
+        assert scheduler.claim_next_targets(db, max_active=1) == []
+        assert scheduler.claim_next_targets(db, max_active=8) == [targets[2].id]
+    assert scheduler.claim_next_targets(db, max_active=8) == [targets[0].id]
+
+
+def test_stale_running_target_is_failed_and_port_reused(db, sqlite_backend):
+    from backend import scheduler
+    from serial_lib.port_lock import PortLease
+
+    models = sqlite_backend.models
+    now = datetime.datetime.utcnow()
+    long_ago = now - datetime.timedelta(seconds=scheduler.STALE_TARGET_SECONDS + 60)
+    orphan, waiting = add_job(db, models, [("~/port1", "running", long_ago), ("~/port1", "queued", None)], status="running")
+    [held] = add_job(db, models, [("~/port2", "running", long_ago)], status="running")
+    [starting] = add_job(db, models, [("~/port3", "running", now)], status="running")
+
+    with PortLease("~/port2", owner="job (still running)"):
+        claimed = scheduler.claim_next_targets(db, max_active=3)
+
+    assert claimed == [waiting.id]
+    db.expire_all()
+    assert orphan.status == "failed"
+    assert orphan.failure_category == scheduler.STALE_FAILURE_CATEGORY
+    assert orphan.finished_at is not None
+    # A worker still holds port 2; port 3 was only just claimed.
+    assert held.status == "running" and starting.status == "running"
+    stat = db.query(models.PortStat).one()
+    assert (stat.port, stat.succeeded, stat.failed) == ("~/port1", 0, 1)
+
+
+def test_stale_recovery_finalizes_job(db, sqlite_backend):
+    from backend import scheduler
+
+    models = sqlite_backend.models
+    long_ago = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    [orphan] = add_job(db, models, [("~/port1", "running", long_ago)], status="running")
+
+    assert scheduler.claim_next_targets(db, max_active=8) == []
+    db.expire_all()
+    assert orphan.job.status == "failed"
+
+
+def test_queue_heads_match_the_fair_queue_order(db, sqlite_backend):
+    from backend import scheduler
+
+    models = sqlite_backend.models
+    first = add_job(db, models, [("~/port1", "success", None), ("~/port1", "queued", None), ("~/port2", "queued", None)])
+    second = add_job(db, models, [("~/port1", "queued", None), ("~/port1", "queued", None)])
+    add_job(db, models, [("~/port2", "queued", None)])
+
+    queues = scheduler.build_queues(db)
+    heads = scheduler.queue_heads(db)
+
+    # Job 1 already had a target on port 1, so job 2 goes first there.
+    assert heads[scheduler.port_key("~/port1")] == (second[0].id, "~/port1")
+    assert heads[scheduler.port_key("~/port2")] == (first[2].id, "~/port2")
+    assert {port: queue[0].id for port, queue in queues.items()} == {port: head[0] for port, head in heads.items()}
+    assert [t.id for t in queues[scheduler.port_key("~/port1")]] == [second[0].id, first[1].id, second[1].id]
+    status = {entry["device"]: entry for entry in scheduler.port_queue_status(db)}
+    assert [item["target_id"] for item in status[scheduler.port_key("~/port1")]["queue"]] == [
+        second[0].id, first[1].id, second[1].id,
+    ]
@@ -0,0 +1,96 @@
+import os
+import re
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from serial_lib.serial_session import SerialSession
+
+
+class FakePort:
+    """Minimal pyserial stand-in: bytes fed via feed() become readable."""
+
+    def __init__(self, timeout: float = 0.05):
+        self.timeout = timeout
+        self.is_open = True
+        self.writes = []
+        self._data = bytearray()
+        self._cond = threading.Condition()
+
+    def feed(self, data: bytes):
+        with self._cond:
+            self._data.extend(data)
+            self._cond.notify_all()
+
+    @property
+    def in_waiting(self) -> int:
+        with self._cond:
+            return len(self._data)
+
+    def read(self, size: int = 1) -> bytes:
+        with self._cond:
+            if not self._data:
+                self._cond.wait(self.timeout)
+            b = bytes(self._data[:size])
+            del self._data[:size]
+            return b
+
+    def write(self, data: bytes):
+        self.writes.append(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+def start_reader_session(port: FakePort) -> SerialSession:
+    session = SerialSession("unused", timeout=port.timeout, background_reader=True)
+    session.ser = port
+    session.write_delay = 0
+    session._start_reader()
+    return session
+
+
+def test_background_reader_wakes_wait_for_on_arrival():
+    port = FakePort()
+    session = start_reader_session(port)
+    try:
+        threading.Timer(0.05, port.feed, args=(b"Switch#",)).start()
+        start = time.monotonic()
+        out = session.wait_for(re.compile(r"#\s*\Z"), timeout=5.0)
+        assert out == "Switch#"
+        assert time.monotonic() - start < 1.0
+    finally:
+        session.disconnect()
+
+    assert port.is_open is False
+
+
+def test_background_reader_keeps_read_api():
+    port = FakePort()
+    session = start_reader_session(port)
+    try:
+        port.feed(b"abcdef")
+        assert session.wait_for_data(1.0)
+        assert session.read(2) == "ab"
+        assert session.read_pending(max_bytes=3) == "cde"
+        assert session.read_available() == "f"
+        assert session.read_available() == ""
+    finally:
+        session.disconnect()
+
+
+def test_wait_for_data_quiet_waits_for_complete_burst():
+    port = FakePort()
+    session = start_reader_session(port)
+    try:
+        port.feed(b"Pass")
+        threading.Timer(0.05, port.feed, args=(b"word:",)).start()
+        assert session.wait_for_data(2.0, quiet=0.2)
+        assert session.read_pending() == "Password:"
+    finally:
+        session.disconnect()
@@ -0,0 +1,83 @@
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import settings_cache
+
+
+class FakeTable:
+    """Stand-in for the settings table; counts queries."""
+
+    def __init__(self, **values):
+        self.values = values
+        self.queries = 0
+
+    def session(self):
+        db = MagicMock()
+
+        def rows():
+            self.queries += 1
+            return [
+                types.SimpleNamespace(id=i, key=k, value=v, updated_at=None)
+                for i, (k, v) in enumerate(self.values.items(), 1)
+            ]
+
+        db.query.return_value.order_by.return_value.all.side_effect = rows
+        return db
+
+
+def make_cache(monkeypatch, table, tmp_path):
+    monkeypatch.setattr(settings_cache, "models", MagicMock())
+    return settings_cache.SettingsCache(table.session, version_file=str(tmp_path / "settings.version"))
+
+
+def test_values_load_once_until_invalidated(monkeypatch, tmp_path):
+    table = FakeTable(port_baud_rates={"1": 115200})
+    cache = make_cache(monkeypatch, table, tmp_path)
+    for _ in range(100):
+        assert cache.port_baud("~/port1") == 115200
+        assert cache.port_baud("~/port2") == 9600
+    assert table.queries == 1
+
+    table.values["port_baud_rates"] = {"1": 19200}
+    cache.invalidate()
+    assert cache.port_baud("~/port1") == 19200
+    assert table.queries == 2
+
+
+def test_invalidation_reaches_other_processes(monkeypatch, tmp_path):
+    table = FakeTable(port_baud_rates={"3": 9600})
+    api = make_cache(monkeypatch, table, tmp_path)
+    worker = make_cache(monkeypatch, table, tmp_path)
+    assert worker.port_baud(3) == 9600
+
+    table.values["port_baud_rates"] = {"3": 38400}
+    api.invalidate()
+    assert worker.port_baud("~/port3") == 38400
+    assert worker.port_baud("~/port3") == 38400
+    assert worker.loads == 2
+
+
+def test_per_port_settings(monkeypatch, tmp_path):
+    table = FakeTable(
+        port_baud_rates={"1": 9600},
+        port_settings={"1": {"baud": 115200, "device_profile": "cisco_ios"}},
+    )
+    cache = make_cache(monkeypatch, table, tmp_path)
+    assert cache.port_baud("~/port1") == 115200
+    assert cache.port_setting("~/port1", "device_profile") == "cisco_ios"
+    assert cache.port_setting("~/port2", "command_timeout", 15) == 15
+    assert cache.port_setting("/dev/ttyUSB0", "device_profile") is None
+
+
+def test_rows_keep_setting_records(monkeypatch, tmp_path):
+    table = FakeTable(port_baud_rates={"1": 9600}, port_settings={})
+    cache = make_cache(monkeypatch, table, tmp_path)
+    rows = cache.rows()
+    assert [(row.id, row.key) for row in rows.values()] == [(1, "port_baud_rates"), (2, "port_settings")]
+    assert rows["port_baud_rates"].value == {"1": 9600}
+    assert cache.values() == {"port_baud_rates": {"1": 9600}, "port_settings": {}}
+    assert table.queries == 1
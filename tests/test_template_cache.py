@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+from jinja2 import UndefinedError
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.template_cache import CompiledTemplateCache
+
+
+def test_each_source_compiles_once_per_scope():
+    cache = CompiledTemplateCache()
+    for hostname in ["sw1", "sw2", "sw3"]:
+        assert cache.render("hostname {{ hostname }}", {"hostname": hostname}, scope=1) == f"hostname {hostname}"
+    assert (cache.misses, cache.hits) == (1, 2)
+
+    cache.render("hostname {{ hostname }}", {"hostname": "sw4"}, scope=2)
+    assert cache.misses == 2
+
+
+def test_edited_template_gets_new_entry():
+    cache = CompiledTemplateCache()
+    assert cache.render("vlan {{ vlan }}", {"vlan": 10}, scope=1) == "vlan 10"
+    assert cache.render("vlan {{ vlan }}\n name users", {"vlan": 10}, scope=1) == "vlan 10\n name users"
+    assert len(cache) == 2
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache = CompiledTemplateCache(max_size=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    cache.get("a")
+    assert cache.hits == 2
+    cache.get("b")
+    assert cache.misses == 4
+
+
+def test_undefined_variables_still_raise():
+    cache = CompiledTemplateCache()
+    with pytest.raises(UndefinedError):
+        cache.render("interface {{ port }}", {})
@@ -1,41 +1,9 @@
 import os
 import sys
-import types
 from unittest.mock import MagicMock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-celery_stub = types.ModuleType("celery")
-
-
-class CeleryStub:
-    def __init__(self, *args, **kwargs):
-        pass
-
-    def task(self, *args, **kwargs):
-        def decorator(func):
-            return func
-
-        return decorator
-
-
-celery_stub.Celery = CeleryStub
-sys.modules.setdefault("celery", celery_stub)
-
-sqlalchemy_stub = types.ModuleType("sqlalchemy")
-sqlalchemy_orm_stub = types.ModuleType("sqlalchemy.orm")
-sqlalchemy_orm_stub.Session = object
-sys.modules.setdefault("sqlalchemy", sqlalchemy_stub)
-sys.modules.setdefault("sqlalchemy.orm", sqlalchemy_orm_stub)
-
-database_stub = types.ModuleType("backend.database")
-database_stub.SessionLocal = MagicMock()
-models_stub = types.ModuleType("backend.models")
-models_stub.Setting = object
-models_stub.JobTarget = object
-sys.modules.setdefault("backend.database", database_stub)
-sys.modules.setdefault("backend.models", models_stub)
-
 from backend.worker import run_verification_checks
 
 
@@ -0,0 +1,136 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import worker
+
+
+def make_target(target_id, port, status="running"):
+    target = MagicMock()
+    target.id = target_id
+    target.job_id = 1
+    target.port = port
+    target.status = status
+    return target
+
+
+def test_execute_job_dispatches_ports(monkeypatch):
+    job = MagicMock()
+    job.targets = [make_target(1, "~/port1", "queued")]
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = job
+    monkeypatch.setattr(worker, "get_db_session", lambda: db)
+    monkeypatch.setattr(worker, "models", MagicMock())
+    monkeypatch.setattr(worker, "dispatch_ports", lambda: [1])
+
+    assert worker.execute_job(None, 1) == [1]
+    db.close.assert_called_once()
+
+
+def test_dispatch_ports_starts_claimed_targets(monkeypatch):
+    db = MagicMock()
+    monkeypatch.setattr(worker, "get_db_session", lambda: db)
+    monkeypatch.setattr(worker.scheduler, "claim_next_targets", lambda db, max_active: [3, 4])
+    started = []
+    execute_target = MagicMock()
+    execute_target.delay.side_effect = started.append
+    monkeypatch.setattr(worker, "execute_target", execute_target)
+
+    assert worker.dispatch_ports() == [3, 4]
+    assert started == [3, 4]
+
+
+def test_execute_target_hands_port_on(monkeypatch):
+    target = make_target(7, "~/port1")
+    target.job.status = "queued"
+    target.job.template.verification = []
+    target.job.template.steps = [{"type": "command", "content": "show clock"}]
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = target
+    monkeypatch.setattr(worker, "get_db_session", lambda: db)
+    monkeypatch.setattr(worker, "models", MagicMock())
+
+    calls = []
+
+    def fake_process_target(db, target, template_steps, verification_checks):
+        calls.append(("process", target.job.status))
+        target.status = "success"
+        worker.finish_target(db, target)
+
+    monkeypatch.setattr(worker, "process_target", fake_process_target)
+    monkeypatch.setattr(worker.dashboard_stats, "invalidate", lambda: calls.append(("invalidate",)))
+    monkeypatch.setattr(
+        worker.dashboard_stats, "record_target_result", lambda db, t: calls.append(("record", t.status))
+    )
+    monkeypatch.setattr(worker.scheduler, "finalize_job", lambda db, job_id: calls.append(("finalize", job_id)))
+    monkeypatch.setattr(worker, "dispatch_ports", lambda: calls.append(("dispatch",)))
+
+    worker.execute_target(None, 7)
+
+    assert calls == [
+        ("invalidate",), ("process", "running"), ("record", "success"), ("finalize", 1), ("dispatch",)
+    ]
+    assert target.status == "success"
+    assert target.finished_at is not None
+
+
+def test_execute_target_never_leaves_port_running(monkeypatch):
+    target = make_target(8, "~/port2")
+    target.job.template.verification = []
+    target.job.template.steps = []
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = target
+    monkeypatch.setattr(worker, "get_db_session", lambda: db)
+    monkeypatch.setattr(worker, "models", MagicMock())
+
+    def crashing_process_target(*args):
+        raise RuntimeError("worker lost")
+
+    dispatched = []
+    monkeypatch.setattr(worker, "process_target", crashing_process_target)
+    monkeypatch.setattr(worker.dashboard_stats, "invalidate", lambda: None)
+    monkeypatch.setattr(worker.dashboard_stats, "record_target_result", lambda db, t: None)
+    monkeypatch.setattr(worker.scheduler, "finalize_job", lambda db, job_id: None)
+    monkeypatch.setattr(worker, "dispatch_ports", lambda: dispatched.append(True))
+
+    try:
+        worker.execute_target(None, 8)
+    except RuntimeError:
+        pass
+
+    assert target.status == "failed"
+    assert dispatched == [True]
+
+
+def test_execute_target_skips_target_given_up_by_scheduler(monkeypatch):
+    target = make_target(9, "~/port3", status="failed")
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = target
+    monkeypatch.setattr(worker, "get_db_session", lambda: db)
+    monkeypatch.setattr(worker, "models", MagicMock())
+    monkeypatch.setattr(worker, "process_target", MagicMock(side_effect=AssertionError("must not run")))
+    monkeypatch.setattr(worker, "dispatch_ports", lambda: None)
+
+    assert worker.execute_target(None, 9) == "Target no longer claimed"
+    assert target.status == "failed"
+
+
+def test_process_target_commits_final_status_with_stats(monkeypatch, tmp_path):
+    target = make_target(10, str(tmp_path / "missing-port"))
+    db = MagicMock()
+    calls = []
+    db.commit.side_effect = lambda: calls.append(("commit", target.status))
+    monkeypatch.setattr(worker, "clear_log", lambda db, target_id: None)
+    monkeypatch.setattr(worker, "TargetLogWriter", MagicMock())
+    monkeypatch.setattr(
+        worker.dashboard_stats, "record_target_result",
+        lambda db, t: calls.append(("record", t.status, t.finished_at is not None)),
+    )
+
+    worker.process_target(db, target, [{"type": "command", "content": "show clock"}], [])
+
+    # One commit while running, then the final status, finished_at and stats together.
+    assert calls == [("commit", "running"), ("record", "failed", True), ("commit", "failed")]
+    assert target.failure_category == worker.FailureCategory.FILE_NOT_FOUND